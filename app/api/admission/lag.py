@@ -0,0 +1,55 @@
+import asyncio
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop runs its callbacks.
+
+    A background task sleeps for `interval` seconds and records by how much it overslept. The
+    oversleep is the time its wakeup waited behind other ready callbacks, so it grows with the
+    depth of the loop's run queue whatever the loop implementation.
+
+    Attributes:
+        interval (float): Seconds between two probes.
+        lag (float): Seconds the last probe woke up late, 0.0 before the first probe.
+        max_lag (float): Largest lag seen since the monitor started.
+    """
+
+    def __init__(self, interval: float):
+        """Initialize the monitor without starting it.
+
+        Args:
+            interval (float): Seconds between two probes.
+        """
+        self.interval = interval
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def run(self) -> None:
+        """Probe every interval until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            interval = self.interval
+            start = loop.time()
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - start - interval)
+            self.lag = lag
+            if lag > self.max_lag:
+                self.max_lag = lag
+
+    def start(self) -> None:
+        """Start probing in a background task of the running event loop."""
+        if self._task is None:
+            self.lag = 0.0
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop probing and forget the last lag, which no longer describes any loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.lag = 0.0
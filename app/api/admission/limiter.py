@@ -0,0 +1,110 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+# Longest time between two evictions of idle buckets.
+EVICTION_INTERVAL_SECONDS = 1.0
+
+
+class TokenBucketLimiter:
+    """Per-client token buckets, refilled lazily when a client is seen.
+
+    Every client starts with `burst` tokens and earns `rate` tokens a second up to `burst`; a
+    request spends one token. A bucket is the pair (tokens, last refill), updated in O(1) on the
+    client's own request, with no timer per client.
+
+    Buckets are kept in least recently used order. A client idle for `burst / rate` seconds has a
+    full bucket again, exactly what a new client gets, so its bucket can be dropped without
+    changing any decision: at most every EVICTION_INTERVAL_SECONDS, an acquire pops such idle
+    buckets off the front, each of them once, which keeps the cost amortized O(1) per request.
+    `max_clients` bounds the memory if many clients are active at once; the least recently used
+    bucket is dropped first.
+
+    Attributes:
+        rate (float): Tokens earned per second, 0 disables the limiter.
+        burst (float): Bucket capacity, the longest burst a client may send.
+        max_clients (int): Maximum number of buckets kept.
+        evictions (int): Buckets dropped because of max_clients.
+        rejections (int): Requests refused for lack of a token.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        max_clients: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize a limiter without any bucket.
+
+        Args:
+            rate (float): Tokens earned per second, 0 disables the limiter.
+            burst (float): Bucket capacity, at least 1.
+            max_clients (int): Maximum number of buckets kept.
+            clock (Callable[[], float]): Monotonic clock, replaceable in tests.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.clock = clock
+        self.evictions = 0
+        self.rejections = 0
+        self._buckets: OrderedDict[Hashable, list[float]] = OrderedDict()
+        self._next_eviction = 0.0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def configure(self, rate: float, burst: float, max_clients: int) -> None:
+        """Apply new limits; existing buckets keep their tokens, capped by the new burst."""
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        if rate <= 0:
+            self._buckets.clear()
+
+    def acquire(self, key: Hashable) -> float:
+        """Spend one token of a client.
+
+        Args:
+            key (Hashable): The client key.
+
+        Returns:
+            float: 0.0 if the request may proceed, otherwise the seconds until the client earns
+            its next token.
+        """
+        rate = self.rate
+        if rate <= 0:
+            return 0.0
+        now = self.clock()
+        buckets = self._buckets
+        bucket = buckets.get(key)
+        if bucket is None:
+            if len(buckets) >= self.max_clients:
+                buckets.popitem(last=False)
+                self.evictions += 1
+            bucket = buckets[key] = [self.burst, now]
+        else:
+            buckets.move_to_end(key)
+            tokens = bucket[0] + (now - bucket[1]) * rate
+            bucket[0] = tokens if tokens < self.burst else self.burst
+            bucket[1] = now
+        if now >= self._next_eviction:
+            idle_after = self.burst / rate
+            self._evict_idle(now - idle_after)
+            self._next_eviction = now + min(idle_after, EVICTION_INTERVAL_SECONDS)
+
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            return 0.0
+        self.rejections += 1
+        return (1.0 - bucket[0]) / rate
+
+    def _evict_idle(self, idle_since: float) -> None:
+        """Drop the buckets last refilled before idle_since, which are full by now."""
+        buckets = self._buckets
+        while buckets:
+            bucket = next(iter(buckets.values()))
+            if bucket[1] > idle_since:
+                return
+            buckets.popitem(last=False)
@@ -0,0 +1,172 @@
+import math
+
+from app.config.settings import SETTINGS, Settings
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .lag import LoopLagMonitor
+from .limiter import TokenBucketLimiter
+
+# Only the API is limited; health probes and metric scrapes must keep working under load.
+ADMISSION_PATH_PREFIX = "/api/"
+
+RATE_LIMITED = 429
+OVERLOADED = 503
+REJECTION_BODIES = {
+    RATE_LIMITED: b'{"detail":"Too many requests"}',
+    OVERLOADED: b'{"detail":"Server overloaded, retry later"}',
+}
+
+
+class AdmissionController:
+    """Decides whether a request is served: the in-process state behind AdmissionMiddleware.
+
+    A request is shed with 503 while the event loop lags more than `max_loop_lag` seconds or
+    `max_in_flight` requests are being served, and refused with 429 when its client is out of
+    rate limit tokens. The overload checks come first, so a shed request does not cost its client
+    a token. Every limit is per worker process.
+
+    Attributes:
+        max_in_flight (int): Requests served at once before shedding, 0 disables the cap.
+        max_loop_lag (float): Event loop lag in seconds before shedding, 0 disables it.
+        key_header (bytes): Lower-case header naming the client, empty to key clients by address.
+        limiter (TokenBucketLimiter): The per-client token buckets.
+        lag_monitor (LoopLagMonitor): The event loop lag probe, run by the application lifespan.
+        in_flight (int): Requests admitted and not finished yet.
+        shed_in_flight (int): Requests shed because of max_in_flight.
+        shed_loop_lag (int): Requests shed because of max_loop_lag.
+    """
+
+    def __init__(self, settings: Settings):
+        """Initialize the controller with no request in flight.
+
+        Args:
+            settings (Settings): The settings to apply, see configure.
+        """
+        self.limiter = TokenBucketLimiter(0, 1, 1)
+        self.lag_monitor = LoopLagMonitor(settings.ADMISSION_LOOP_LAG_INTERVAL_SECONDS)
+        self.in_flight = 0
+        self.shed_in_flight = 0
+        self.shed_loop_lag = 0
+        self.configure(settings)
+
+    def configure(self, settings: Settings) -> None:
+        """Apply the admission settings, keeping the state of the buckets and requests in flight.
+
+        Args:
+            settings (Settings): The settings to apply.
+        """
+        self.max_in_flight = settings.ADMISSION_MAX_IN_FLIGHT
+        self.max_loop_lag = settings.ADMISSION_MAX_LOOP_LAG_SECONDS
+        self.key_header = settings.RATE_LIMIT_KEY_HEADER.lower().encode("latin-1")
+        self.lag_monitor.interval = settings.ADMISSION_LOOP_LAG_INTERVAL_SECONDS
+        self.limiter.configure(
+            settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST, settings.RATE_LIMIT_MAX_CLIENTS
+        )
+
+    def client_key(self, scope: Scope):
+        """Return the key a request is rate limited under.
+
+        Args:
+            scope (Scope): The ASGI scope of the request.
+
+        Returns:
+            The value of the key header if configured and sent, otherwise the client address,
+            None if the server does not report one.
+        """
+        if self.key_header:
+            for name, value in scope["headers"]:
+                if name == self.key_header:
+                    return value
+        client = scope.get("client")
+        return client[0] if client else None
+
+    def admit(self, scope: Scope) -> tuple[int, float] | None:
+        """Admit a request, counting it in flight, or reject it.
+
+        Args:
+            scope (Scope): The ASGI scope of the request.
+
+        Returns:
+            tuple[int, float] | None: None if the request is admitted, and the caller must call
+            release once it is done; otherwise the status code to reject it with and the seconds
+            the client should wait before retrying.
+        """
+        if self.max_loop_lag > 0 and self.lag_monitor.lag > self.max_loop_lag:
+            self.shed_loop_lag += 1
+            return OVERLOADED, 1.0
+        if self.max_in_flight > 0 and self.in_flight >= self.max_in_flight:
+            self.shed_in_flight += 1
+            return OVERLOADED, 1.0
+        if self.limiter.rate > 0:
+            wait = self.limiter.acquire(self.client_key(scope))
+            if wait:
+                return RATE_LIMITED, wait
+        self.in_flight += 1
+        return None
+
+    def release(self) -> None:
+        """Mark an admitted request as finished."""
+        self.in_flight -= 1
+
+
+def admission_metrics() -> list[tuple[str, str, str, float]]:
+    """Report the admission counters as metrics, see MetricsRegistry.add_collector.
+
+    Returns:
+        list[tuple[str, str, str, float]]: (name, kind, documentation, value) tuples.
+    """
+    controller = admission_controller
+    limiter = controller.limiter
+    return [
+        ("admission_rate_limited_total", "counter", "Requests refused with 429 by the rate limiter.", limiter.rejections),
+        ("admission_shed_in_flight_total", "counter", "Requests shed with 503 at the in-flight cap.", controller.shed_in_flight),
+        ("admission_shed_loop_lag_total", "counter", "Requests shed with 503 while the event loop lagged.", controller.shed_loop_lag),
+        ("admission_in_flight", "gauge", "Requests being served.", controller.in_flight),
+        ("event_loop_lag_seconds", "gauge", "Lateness of the last event loop probe.", controller.lag_monitor.lag),
+        ("rate_limit_clients", "gauge", "Clients with a token bucket.", len(limiter)),
+        ("rate_limit_evictions_total", "counter", "Token buckets dropped to respect the client limit.", limiter.evictions),
+    ]
+
+
+class AdmissionMiddleware:
+    """ASGI middleware rate limiting API requests per client and shedding them under overload.
+
+    Rejections are answered here, before routing, with a JSON `detail` like HTTPException's and
+    a Retry-After header, so a shed request costs next to nothing.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController | None = None):
+        self.app = app
+        self.controller = controller or admission_controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(ADMISSION_PATH_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        controller = self.controller
+        rejection = controller.admit(scope)
+        if rejection is not None:
+            status_code, retry_after = rejection
+            body = REJECTION_BODIES[status_code]
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": status_code,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode()),
+                        (b"retry-after", str(math.ceil(retry_after)).encode()),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release()
+
+
+admission_controller = AdmissionController(SETTINGS)
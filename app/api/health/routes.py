@@ -1,10 +1,8 @@
-import os
 import time
 
-import psutil
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
 
-from .schemas import DiskUsage, HealthStatus, SystemResources
+from .schemas import DiskUsage, HealthStatus, LivenessStatus, SystemResources
 
 router = APIRouter(
     prefix="/health",
@@ -12,7 +10,34 @@ router = APIRouter(
 )
 
 start_time = time.time()
-process = psutil.Process(os.getpid())
+
+LIVE_RESPONSE_BODY = LivenessStatus(status="OK").model_dump_json().encode()
+
+
+def cached_health_status(request: Request) -> HealthStatus:
+    """Build the health status from the latest background resource sample.
+
+    Args:
+        request (Request): The incoming request, used to reach the application's sampler.
+
+    Returns:
+        HealthStatus: The status, uptime, cached system resource usage, and application version.
+    """
+    snapshot = request.app.state.resource_sampler.read()
+    return HealthStatus(
+        application_version="0.1.0",
+        status="OK",
+        uptime_seconds=time.time() - start_time,
+        system_resources=SystemResources(
+            cpu_usage_percent=snapshot.cpu_usage_percent,
+            disk_usage=DiskUsage(
+                free_mb=snapshot.disk_free_mb,
+                total_mb=snapshot.disk_total_mb,
+                used_mb=snapshot.disk_used_mb,
+            ),
+            memory_usage_mb=snapshot.memory_usage_mb,
+        ),
+    )
 
 
 @router.get(
@@ -22,29 +47,44 @@ process = psutil.Process(os.getpid())
     response_description="Application health status",
     response_model=HealthStatus,
 )
-def get_health_status() -> HealthStatus:
+async def get_health_status(request: Request) -> HealthStatus:
     """Returns the current health status of the system.
 
+    Resource usage comes from the background sampler, so the probe makes no syscalls.
+
     Returns:
         A dictionary containing the status, uptime, system resource usage, and application version.
     """
-    current_time = time.time()
-    uptime = current_time - start_time
-    cpu_percent = psutil.cpu_percent()
-    memory_info = process.memory_info()
-    disk_usage = psutil.disk_usage("/")
+    return cached_health_status(request)
 
-    return HealthStatus(
-        application_version="0.1.0",
-        status="OK",
-        uptime_seconds=uptime,
-        system_resources=SystemResources(
-            cpu_usage_percent=cpu_percent,
-            disk_usage=DiskUsage(
-                free_mb=disk_usage.free / (1024 * 1024),
-                total_mb=disk_usage.total / (1024 * 1024),
-                used_mb=disk_usage.used / (1024 * 1024),
-            ),
-            memory_usage_mb=memory_info.rss / (1024 * 1024),
-        ),
-    )
\ No newline at end of file
+
+@router.get(
+    "/live",
+    summary="Get Liveness Status",
+    description="Cheap liveness probe that only confirms the event loop is serving requests",
+    response_description="Application liveness status",
+    response_model=LivenessStatus,
+)
+async def get_liveness_status() -> Response:
+    """Returns a constant liveness status.
+
+    Returns:
+        A prebuilt response with the status of the application.
+    """
+    return Response(content=LIVE_RESPONSE_BODY, media_type="application/json")
+
+
+@router.get(
+    "/ready",
+    summary="Get Readiness Status",
+    description="Readiness probe returning the cached system resource usage",
+    response_description="Application health status",
+    response_model=HealthStatus,
+)
+async def get_readiness_status(request: Request) -> HealthStatus:
+    """Returns the health status with the latest sampled resource usage.
+
+    Returns:
+        A dictionary containing the status, uptime, system resource usage, and application version.
+    """
+    return cached_health_status(request)
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+BYTES_PER_MB = 1024 * 1024
+
+
+class ResourceSnapshot:
+    """Resource usage at the time of the last sample, updated in place by ResourceSampler.
+
+    Attributes:
+        cpu_usage_percent (float): Percentage of CPU usage.
+        memory_usage_mb (float): Resident memory of the process in MB.
+        disk_total_mb (float): Total disk space in MB.
+        disk_used_mb (float): Used disk space in MB.
+        disk_free_mb (float): Free disk space in MB.
+        sampled_at (float): Unix time of the sample, 0.0 before the first one.
+    """
+
+    __slots__ = (
+        "cpu_usage_percent",
+        "memory_usage_mb",
+        "disk_total_mb",
+        "disk_used_mb",
+        "disk_free_mb",
+        "sampled_at",
+    )
+
+    def __init__(self):
+        self.cpu_usage_percent = 0.0
+        self.memory_usage_mb = 0.0
+        self.disk_total_mb = 0.0
+        self.disk_used_mb = 0.0
+        self.disk_free_mb = 0.0
+        self.sampled_at = 0.0
+
+
+class ResourceSampler:
+    """Samples CPU, memory and disk usage in the background so health probes only read memory.
+
+    The psutil calls run on a worker thread every `interval` seconds and write into one
+    preallocated ResourceSnapshot, so a probe never makes a syscall or waits for the threadpool.
+
+    Attributes:
+        interval (float): Seconds between two samples.
+        snapshot (ResourceSnapshot): The latest sample.
+    """
+
+    def __init__(self, interval: float):
+        """Initialize the sampler without taking a sample yet.
+
+        Args:
+            interval (float): Seconds between two samples.
+        """
+        self.interval = interval
+        self.snapshot = ResourceSnapshot()
+        self._process = None
+        self._task: asyncio.Task | None = None
+
+    def sample(self) -> None:
+        """Take a sample and store it in the snapshot.
+
+        psutil is imported by the first sample, on startup, rather than with the application, and
+        the process handle is created in the process that samples, so a worker forked from a
+        preloaded master reports its own memory.
+        """
+        import psutil
+
+        if self._process is None:
+            self._process = psutil.Process(os.getpid())
+        snapshot = self.snapshot
+        disk_usage = psutil.disk_usage("/")
+        snapshot.cpu_usage_percent = psutil.cpu_percent()
+        snapshot.memory_usage_mb = self._process.memory_info().rss / BYTES_PER_MB
+        snapshot.disk_total_mb = disk_usage.total / BYTES_PER_MB
+        snapshot.disk_used_mb = disk_usage.used / BYTES_PER_MB
+        snapshot.disk_free_mb = disk_usage.free / BYTES_PER_MB
+        snapshot.sampled_at = time.time()
+
+    def read(self) -> ResourceSnapshot:
+        """Return the latest sample without sampling, all zeros if none was taken yet.
+
+        The first sample is taken on startup, see app.server.setup.lifespan, so zeros are only
+        seen when the application runs without its lifespan.
+
+        Returns:
+            ResourceSnapshot: The latest resource usage.
+        """
+        return self.snapshot
+
+    async def run(self) -> None:
+        """Sample every interval until cancelled, surviving any error."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.sample)
+            except Exception:
+                logger.exception("Resource sampling failed")
+
+    def start(self) -> None:
+        """Start sampling in a background task of the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -53,6 +53,20 @@ class SystemResources(BaseAPISchema):
     )
 
 
+class LivenessStatus(BaseAPISchema):
+    """Represents the liveness of the application.
+
+    Attributes:
+        status (str): Liveness status.
+    """
+
+    status: str = Field(
+        ...,
+        example="OK",
+        description="Liveness status.",
+    )
+
+
 class HealthStatus(BaseAPISchema):
     """Represents the health status of the system.
 
@@ -1,6 +1,7 @@
 from app.main import app
 from fastapi.testclient import TestClient
 
+from .sampler import ResourceSampler
 from .schemas import HealthStatus
 
 client = TestClient(app)
@@ -40,3 +41,60 @@ def test_get_health_status():
     assert isinstance(disk_usage.free_mb, float)
     assert isinstance(disk_usage.total_mb, float)
     assert isinstance(disk_usage.used_mb, float)
+
+
+def test_get_liveness_status():
+    response = client.get("/health/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "OK"}
+
+
+def test_readiness_status_uses_cached_sample(monkeypatch):
+    sampler = app.state.resource_sampler
+    sampler.sample()
+
+    def fail():
+        raise AssertionError("probe must not sample resources")
+
+    monkeypatch.setattr("psutil.cpu_percent", fail)
+    monkeypatch.setattr("psutil.disk_usage", fail)
+
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    health_status = HealthStatus(**response.json())
+    assert health_status.system_resources.disk_usage.total_mb == sampler.snapshot.disk_total_mb
+
+
+def test_read_never_samples(monkeypatch):
+    def fail():
+        raise AssertionError("read must not sample resources")
+
+    monkeypatch.setattr("psutil.cpu_percent", fail)
+    monkeypatch.setattr("psutil.disk_usage", fail)
+
+    snapshot = ResourceSampler(interval=60).read()
+    assert snapshot.sampled_at == 0.0
+    assert snapshot.cpu_usage_percent == 0.0
+
+
+def test_sampler_updates_snapshot_in_place():
+    sampler = ResourceSampler(interval=60)
+    snapshot = sampler.snapshot
+    assert snapshot.sampled_at == 0.0
+
+    sampler.sample()
+    assert sampler.snapshot is snapshot
+    assert snapshot.sampled_at > 0.0
+    assert snapshot.disk_total_mb > 0.0
+    assert snapshot.memory_usage_mb > 0.0
+
+
+def test_lifespan_runs_sampler():
+    from app.server.setup import create_app
+
+    lifespan_app = create_app()
+    with TestClient(lifespan_app) as lifespan_client:
+        assert lifespan_app.state.resource_sampler._task is not None
+        assert lifespan_app.state.resource_sampler.snapshot.sampled_at > 0.0
+        assert lifespan_client.get("/health/ready").status_code == 200
+    assert lifespan_app.state.resource_sampler._task is None
@@ -0,0 +1,49 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .registry import (HTTP_REQUEST_DURATION, HTTP_REQUEST_ERRORS,
+                       HTTP_REQUESTS)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording the count, errors and latency of every HTTP request.
+
+    Requests are labelled with the path template of the route that handled them (for example
+    "/api/v1/delivery-fee-calculator/"), never the raw path, to keep the number of series bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            status_code = 500
+            raise
+        finally:
+            route = scope.get("route")
+            route_path = route.path if route is not None else UNMATCHED_ROUTE
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.labels(route_path, method).observe(
+                time.perf_counter() - start
+            )
+            HTTP_REQUESTS.labels(route_path, method, str(status_code)).inc()
+            if status_code >= 500:
+                HTTP_REQUEST_ERRORS.labels(route_path, method).inc()
@@ -0,0 +1,227 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from threading import get_ident
+from typing import Callable, Iterable
+
+# Latency buckets in seconds for whole requests.
+REQUEST_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+# Latency buckets in seconds for the sub-microsecond to sub-millisecond fee stages.
+STAGE_LATENCY_BUCKETS = (
+    1e-7, 2.5e-7, 5e-7, 1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 1e-3,
+)
+
+
+def format_labels(label_names: tuple[str, ...], label_values: tuple[str, ...]) -> str:
+    """Render label pairs in the Prometheus text format, e.g. {route="/",method="GET"}."""
+    if not label_names:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for name, value in zip(label_names, label_values)
+    )
+    return "{" + pairs + "}"
+
+
+class CounterChild:
+    """One labelled series of a Counter.
+
+    Every thread increments its own shard, so updates never contend or get lost, and the
+    shards are only summed when the metrics are scraped.
+    """
+
+    __slots__ = ("_shards",)
+
+    def __init__(self):
+        self._shards: dict[int, list[float]] = {}
+
+    def inc(self, amount: float = 1) -> None:
+        """Add `amount` to the counter."""
+        thread_id = get_ident()
+        shard = self._shards.get(thread_id)
+        if shard is None:
+            shard = self._shards[thread_id] = [0]
+        shard[0] += amount
+
+    def value(self) -> float:
+        """Return the total over all threads."""
+        return sum(shard[0] for shard in list(self._shards.values()))
+
+
+class HistogramChild:
+    """One labelled series of a Histogram, sharded per thread like CounterChild."""
+
+    __slots__ = ("_bounds", "_shards")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self._bounds = bounds
+        self._shards: dict[int, list[float]] = {}
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        thread_id = get_ident()
+        shard = self._shards.get(thread_id)
+        if shard is None:
+            # One count per bucket plus +Inf, followed by the sum and the count.
+            shard = self._shards[thread_id] = [0] * (len(self._bounds) + 3)
+        shard[bisect_left(self._bounds, value)] += 1
+        shard[-2] += value
+        shard[-1] += 1
+
+    def merged(self) -> list[float]:
+        """Return the per-bucket counts, the sum and the count over all threads."""
+        merged = [0] * (len(self._bounds) + 3)
+        for shard in list(self._shards.values()):
+            for index, value in enumerate(shard):
+                merged[index] += value
+        return merged
+
+
+class Metric(ABC):
+    """Base class of labelled metric families."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._children: dict[tuple[str, ...], object] = {}
+
+    @abstractmethod
+    def _new_child(self):
+        """Create the series for one combination of label values."""
+
+    def labels(self, *label_values: str):
+        """Return the series for the given label values, creating it on first use."""
+        child = self._children.get(label_values)
+        if child is None:
+            child = self._children.setdefault(label_values, self._new_child())
+        return child
+
+    @abstractmethod
+    def expose(self) -> list[str]:
+        """Render the metric family in the Prometheus text format."""
+
+
+class Counter(Metric):
+    """A monotonically increasing count."""
+
+    kind = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def expose(self) -> list[str]:
+        return [
+            f"{self.name}{format_labels(self.label_names, label_values)} {child.value()}"
+            for label_values, child in list(self._children.items())
+        ]
+
+
+class Histogram(Metric):
+    """A distribution of observations over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Iterable[str] = (),
+        buckets: tuple[float, ...] = REQUEST_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.buckets)
+
+    def expose(self) -> list[str]:
+        lines = []
+        bucket_label_names = self.label_names + ("le",)
+        for label_values, child in list(self._children.items()):
+            merged = child.merged()
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), merged):
+                cumulative += count
+                labels = format_labels(bucket_label_names, label_values + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {merged[-2]}")
+            lines.append(f"{self.name}_count{labels} {merged[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds the metric families of a process and renders them for scraping.
+
+    Besides metric families, callables can be registered as collectors; they are called on
+    scrape and return (name, kind, documentation, value) tuples for gauges read from other
+    components, such as the quote cache counters.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[Callable[[], Iterable[tuple[str, str, str, float]]]] = []
+
+    def counter(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Counter:
+        """Register a counter, or return the one already registered under `name`."""
+        return self._register(Counter(name, documentation, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Iterable[str] = (),
+        buckets: tuple[float, ...] = REQUEST_LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Register a histogram, or return the one already registered under `name`."""
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def _register(self, metric: Metric):
+        return self._metrics.setdefault(metric.name, metric)
+
+    def add_collector(
+        self, collector: Callable[[], Iterable[tuple[str, str, str, float]]]
+    ) -> None:
+        """Register a callable read on every scrape, once even if added again."""
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def expose(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.expose())
+        for collector in self._collectors:
+            for name, kind, documentation, value in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "Requests handled, by route, method and status.",
+    ("route", "method", "status"),
+)
+HTTP_REQUEST_ERRORS = REGISTRY.counter(
+    "http_request_errors_total", "Requests that failed with a 5xx status or an exception.",
+    ("route", "method"),
+)
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "Request latency, by route and method.",
+    ("route", "method"),
+)
+FEE_STAGE_DURATION = REGISTRY.histogram(
+    "fee_stage_duration_seconds", "Latency of each DeliveryFeeCalculator stage on sampled requests.",
+    ("stage",), STAGE_LATENCY_BUCKETS,
+)
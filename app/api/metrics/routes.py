@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Response
+
+from .registry import REGISTRY
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get(
+    "/metrics",
+    summary="Get Metrics",
+    description="Request counts, error counts and latency histograms in the Prometheus text format",
+    response_description="Metrics in the Prometheus text exposition format",
+    response_class=Response,
+)
+async def get_metrics() -> Response:
+    """Returns every metric of this worker, merged over its threads.
+
+    Returns:
+        The metrics in the Prometheus text exposition format.
+    """
+    return Response(content=REGISTRY.expose(), media_type=PROMETHEUS_CONTENT_TYPE)
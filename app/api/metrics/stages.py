@@ -0,0 +1,69 @@
+from app.config.settings import SETTINGS
+
+from .registry import FEE_STAGE_DURATION
+
+STAGES = ("timestamp_parse", "cart", "distance", "item", "rush_multiplier")
+
+
+class StageSampler:
+    """Times the individual stages of the fee calculation on a sample of the quotes.
+
+    Timing every stage of every quote would cost more than the stages themselves, so only one
+    quote in `every` is priced through the timed variant of the calculation, FeePlan.timed_fee,
+    keeping the overhead at a few percent. The timings come from serving that quote, not from
+    a replay, so the timestamp parse shows hour-bucket cache misses as they happen.
+
+    Attributes:
+        every (int): Sample one quote out of this many, 0 disables sampling.
+    """
+
+    __slots__ = ("every", "_countdown", "_histograms")
+
+    def __init__(self, every: int):
+        """Initialize the sampler.
+
+        Args:
+            every (int): Sample one quote out of this many, 0 disables sampling.
+        """
+        self.every = every
+        self._countdown = every
+        self._histograms = tuple(FEE_STAGE_DURATION.labels(stage) for stage in STAGES)
+
+    def configure(self, every: int) -> None:
+        """Change the sampling rate, e.g. after the settings were reloaded.
+
+        Args:
+            every (int): Sample one quote out of this many, 0 disables sampling.
+        """
+        self.every = every
+        self._countdown = every
+
+    def should_sample(self) -> bool:
+        """Count a quote and tell whether it is the one to sample.
+
+        Returns:
+            bool: True once every `every` calls.
+        """
+        if not self.every:
+            return False
+        self._countdown -= 1
+        if self._countdown:
+            return False
+        self._countdown = self.every
+        return True
+
+    def record(self, stage_times: list[float]) -> None:
+        """Record the stage durations measured while a sampled quote was served.
+
+        Args:
+            stage_times (list[float]): Seconds per stage in the order of STAGES, filled by
+                quote_key and DeliveryFeeCalculator.calculate_delivery_fee. A quote answered
+                from the cache only has the timestamp parse.
+        """
+        for histogram, seconds in zip(self._histograms, stage_times):
+            histogram.observe(seconds)
+
+
+stage_sampler = StageSampler(
+    SETTINGS.STAGE_TIMING_SAMPLE_RATE if SETTINGS.METRICS_ENABLED else 0
+)
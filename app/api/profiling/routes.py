@@ -0,0 +1,100 @@
+import secrets
+from typing import Literal
+
+import orjson
+from app.api.v1.delivery_fee_calculator.fee_plan import get_fee_plan
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+
+from .sampler import stack_sampler
+from .schemas import RouteTimingSchema
+from .timings import route_timings
+
+SPEEDSCOPE_CONTENT_TYPE = "application/json"
+COLLAPSED_CONTENT_TYPE = "text/plain; charset=utf-8"
+
+
+def require_admin(request: Request) -> None:
+    """Let a request through only if it carries the admin token.
+
+    The token of `ADMIN_TOKEN` is expected as "Authorization: Bearer <token>". Without a
+    configured token, the admin routes answer 404 as if they did not exist.
+
+    Args:
+        request (Request): The incoming request.
+
+    Raises:
+        HTTPException: 404 without a configured token, 401 with a missing or wrong one.
+    """
+    token = get_fee_plan().settings.ADMIN_TOKEN
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    supplied = request.headers.get("authorization", "")
+    if not secrets.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+        raise HTTPException(
+            status_code=401, detail="Invalid admin token", headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+
+@router.post(
+    "/profile",
+    summary="Profile this worker",
+    description="Samples the stacks of the worker serving the request for a number of seconds "
+    "and returns them as collapsed stacks, for flamegraph.pl and similar tools, or as a "
+    "speedscope profile. Requires the admin token.",
+    response_class=Response,
+    responses={
+        200: {"content": {COLLAPSED_CONTENT_TYPE: {}, SPEEDSCOPE_CONTENT_TYPE: {}}},
+        409: {"description": "The worker is already being profiled"},
+    },
+)
+async def profile(
+    seconds: float = Query(10.0, gt=0, description="How long to sample."),
+    interval: float | None = Query(
+        None, gt=0, description="Seconds between two samples, PROFILER_INTERVAL_SECONDS by default."
+    ),
+    output: Literal["collapsed", "speedscope"] = Query(
+        "collapsed", alias="format", description="The format of the profile."
+    ),
+) -> Response:
+    """Sample the stacks of this worker while it keeps serving requests.
+
+    Args:
+        seconds (float): How long to sample, at most PROFILER_MAX_SECONDS.
+        interval (float | None): Seconds between two samples.
+        output (str): "collapsed" or "speedscope".
+
+    Returns:
+        The profile.
+    """
+    settings = get_fee_plan().settings
+    if seconds > settings.PROFILER_MAX_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Profiling for {seconds} seconds exceeds the limit of {settings.PROFILER_MAX_SECONDS}",
+        )
+    if stack_sampler.running:
+        raise HTTPException(status_code=409, detail="The profiler is already running")
+    stack_sampler.interval = interval or settings.PROFILER_INTERVAL_SECONDS
+    await stack_sampler.run_for(seconds)
+    if output == "speedscope":
+        return Response(content=orjson.dumps(stack_sampler.speedscope()), media_type=SPEEDSCOPE_CONTENT_TYPE)
+    return Response(content=stack_sampler.collapsed(), media_type=COLLAPSED_CONTENT_TYPE)
+
+
+@router.get(
+    "/routes",
+    summary="Get the route timings",
+    description="Calls, total, mean and slowest time spent in each route handler of this "
+    "worker since it started. Requires the admin token.",
+    response_model=list[RouteTimingSchema],
+)
+async def get_route_timings() -> list[RouteTimingSchema]:
+    """Returns the cumulative handler timings of this worker.
+
+    Returns:
+        list[RouteTimingSchema]: One entry per route and method, the most time-consuming first.
+    """
+    return [RouteTimingSchema(**timing) for timing in route_timings.report()]
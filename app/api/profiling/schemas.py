@@ -0,0 +1,22 @@
+from app.api.schemas import BaseAPISchema
+from pydantic import Field
+
+
+class RouteTimingSchema(BaseAPISchema):
+    """Cumulative time spent in a route handler, see RouteTimings.
+
+    Attributes:
+        route (str): The path template of the route.
+        method (str): The HTTP method.
+        calls (int): Requests handled.
+        total_seconds (float): Total time spent in the handler.
+        mean_seconds (float): Mean time per request.
+        max_seconds (float): Slowest request.
+    """
+
+    route: str = Field(..., example="/api/v1/delivery-fee-calculator/", description="The path template of the route.")
+    method: str = Field(..., example="POST", description="The HTTP method.")
+    calls: int = Field(..., example=120433, description="Requests handled.")
+    total_seconds: float = Field(..., example=18.2, description="Total time spent in the handler.")
+    mean_seconds: float = Field(..., example=0.000151, description="Mean time per request.")
+    max_seconds: float = Field(..., example=0.0123, description="Slowest request.")
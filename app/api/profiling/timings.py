@@ -0,0 +1,90 @@
+import time
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class RouteTimings:
+    """Cumulative time spent in each route handler of the application.
+
+    Every APIRoute's ASGI app, the handler with its request parsing, dependencies and response
+    rendering, is wrapped in a timer, so the time is attributed to the route without the
+    middleware in front of it. A call costs two clock reads and a dict lookup, cheap enough to
+    stay on in production and tell which route a latency spike comes from before profiling it.
+
+    Attributes:
+        routes (dict[tuple[str, str], list]): [calls, total seconds, slowest call in seconds],
+            keyed by route path and HTTP method.
+    """
+
+    def __init__(self):
+        self.routes: dict[tuple[str, str], list] = {}
+
+    def instrument(self, app: FastAPI) -> None:
+        """Time every APIRoute registered on the application so far.
+
+        Args:
+            app (FastAPI): The application, once its routers are included.
+        """
+        for route in app.router.routes:
+            if isinstance(route, APIRoute):
+                route.app = self.wrap(route.path, route.app)
+
+    def wrap(self, path: str, app: ASGIApp) -> ASGIApp:
+        """Wrap the ASGI app of a route in a timer.
+
+        Args:
+            path (str): The path template of the route, such as "/api/v1/delivery-fee-calculator/".
+            app (ASGIApp): The ASGI app of the route.
+
+        Returns:
+            ASGIApp: The timed app.
+        """
+        routes = self.routes
+        clock = time.perf_counter
+
+        async def timed(scope: Scope, receive: Receive, send: Send) -> None:
+            start = clock()
+            try:
+                await app(scope, receive, send)
+            finally:
+                elapsed = clock() - start
+                key = (path, scope["method"])
+                timing = routes.get(key)
+                if timing is None:
+                    routes[key] = [1, elapsed, elapsed]
+                else:
+                    timing[0] += 1
+                    timing[1] += elapsed
+                    if elapsed > timing[2]:
+                        timing[2] = elapsed
+
+        return timed
+
+    def report(self) -> list[dict]:
+        """List the timings of every route called so far, the most time-consuming first.
+
+        Returns:
+            list[dict]: The route path, method, calls, total, mean and slowest call in seconds.
+        """
+        return [
+            {
+                "route": path,
+                "method": method,
+                "calls": calls,
+                "total_seconds": total,
+                "mean_seconds": total / calls,
+                "max_seconds": slowest,
+            }
+            for (path, method), (calls, total, slowest) in sorted(
+                self.routes.items(), key=lambda item: item[1][1], reverse=True
+            )
+        ]
+
+    def reset(self) -> None:
+        """Forget every timing."""
+        self.routes.clear()
+
+
+route_timings = RouteTimings()
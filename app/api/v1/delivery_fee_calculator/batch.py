@@ -0,0 +1,122 @@
+import json
+from functools import partial
+from typing import Any, Iterable
+
+from .geo import get_venue_index, resolve_delivery_distances
+from .helpers import DeliveryFeeCalculator
+from .schemas import (DeliveryFeeCalculatorBatchItemSchema,
+                      DeliveryFeeCalculatorInputSchema)
+from .zones import ZoneIndex, get_zone_index
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def is_ndjson(content_type: str) -> bool:
+    """
+    Check whether a Content-Type header announces newline-delimited JSON.
+
+    :param content_type: The raw Content-Type header value.
+    :return: True if the body holds one JSON document per line.
+    """
+    return content_type.split(";", 1)[0].strip().lower() in NDJSON_MEDIA_TYPES
+
+
+def parse_batch_body(body: bytes, content_type: str) -> list[Any]:
+    """
+    Split a batch request body into its individual cart payloads.
+
+    Rules:
+    - An NDJSON body yields one raw line per cart; blank lines are skipped and
+      each line is decoded later so a malformed line only fails its own item.
+    - Any other body must be a JSON array of cart objects.
+
+    :param body: The raw request body.
+    :param content_type: The Content-Type header of the request.
+    :return: The cart payloads, either decoded objects or raw JSON lines.
+    :raises ValueError: If a JSON body is malformed or is not an array.
+    """
+    if is_ndjson(content_type):
+        return [line for line in body.splitlines() if line.strip()]
+
+    items = json.loads(body)
+    if not isinstance(items, list):
+        raise ValueError("Batch request body must be a JSON array of carts")
+    return items
+
+
+def parse_item(item: Any) -> DeliveryFeeCalculatorInputSchema:
+    """
+    Validate a single cart of a batch.
+
+    :param item: A decoded cart object or a raw JSON line.
+    :return: The validated cart.
+    :raises ValueError: If the cart is invalid.
+    """
+    if isinstance(item, (bytes, str)):
+        return DeliveryFeeCalculatorInputSchema.model_validate_json(item)
+    return DeliveryFeeCalculatorInputSchema.model_validate(item)
+
+
+def quote_item(
+    calculator: DeliveryFeeCalculator,
+    data: DeliveryFeeCalculatorInputSchema,
+    delivery_distance: int | ValueError,
+    zones: ZoneIndex,
+) -> DeliveryFeeCalculatorBatchItemSchema:
+    """
+    Price a single validated cart of a batch.
+
+    Failures are reported on the returned item instead of being raised, so one
+    bad cart never fails the rest of the batch.
+
+    :param calculator: The calculator shared by the whole batch.
+    :param data: The validated cart.
+    :param delivery_distance: The resolved delivery distance of the cart, or the reason it has
+        none, see resolve_delivery_distances.
+    :param zones: The delivery zones looked up for carts sent with customer coordinates.
+    :return: The delivery fee of the cart, or the reason it could not be priced.
+    """
+    try:
+        if isinstance(delivery_distance, ValueError):
+            raise delivery_distance
+        location = data.customer_location
+        fee = calculator.calculate_delivery_fee(
+            data.cart_value,
+            delivery_distance,
+            data.number_of_items,
+            data.time,
+            zone=None if location is None else zones.lookup(location.lon, location.lat),
+        )
+        return DeliveryFeeCalculatorBatchItemSchema(delivery_fee=fee)
+    except Exception as error:
+        return DeliveryFeeCalculatorBatchItemSchema(error=str(error))
+
+
+def quote_batch(
+    calculator: DeliveryFeeCalculator, items: Iterable[Any]
+) -> list[DeliveryFeeCalculatorBatchItemSchema]:
+    """
+    Price every cart of a batch, preserving the input order.
+
+    Every cart is validated first, so the distances of the carts sent with coordinates are
+    computed together in one vectorized pass before pricing.
+
+    :param calculator: The calculator shared by the whole batch.
+    :param items: Decoded cart objects or raw JSON lines.
+    :return: One result per input cart.
+    """
+    orders = []
+    results: list[DeliveryFeeCalculatorBatchItemSchema | None] = []
+    for item in items:
+        try:
+            orders.append(parse_item(item))
+            results.append(None)
+        except Exception as error:
+            results.append(DeliveryFeeCalculatorBatchItemSchema(error=str(error)))
+
+    priced = map(
+        partial(quote_item, calculator, zones=get_zone_index()),
+        orders,
+        resolve_delivery_distances(orders, get_venue_index()),
+    )
+    return [next(priced) if result is None else result for result in results]
@@ -0,0 +1,217 @@
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Hashable
+
+from app.config.settings import SETTINGS
+from app.shared.counters import Counters
+
+from .timestamps import parse_weekday_and_hour
+from .zones import Zone
+
+if TYPE_CHECKING:
+    from app.shared.table import SharedTable
+
+QUOTE_CACHE_COUNTERS = ("hits", "misses", "evictions", "expirations")
+HITS, MISSES, EVICTIONS, EXPIRATIONS = range(len(QUOTE_CACHE_COUNTERS))
+
+
+class QuoteCache:
+    """
+    A bounded in-process cache of serialized fee quotes with LRU eviction and a TTL.
+
+    Entries belong to the settings version they were computed under. A lookup with a newer
+    version drops every entry, so a settings reload never serves a stale quote.
+
+    With a shared table attached (see share), the cache becomes the first level of a node-wide
+    cache: a quote missing here is looked up in the table every worker of the node reads and
+    writes, and stored quotes are written to both. The counters are then summed over the
+    workers, so every worker reports the hit rate of the node.
+
+    Attributes:
+    - max_size: Maximum number of entries, 0 disables the cache.
+    - ttl_seconds: Seconds an entry stays valid after it was stored.
+    - version: The settings version of the current entries.
+    - counters: The hits, misses, evictions and expirations counters, see QUOTE_CACHE_COUNTERS.
+    - shared: The table shared with the other workers, None if the cache is per process.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize an empty cache.
+
+        :param max_size: Maximum number of entries, 0 disables the cache.
+        :param ttl_seconds: Seconds an entry stays valid after it was stored.
+        :param clock: Monotonic clock used for expiry, replaceable in tests.
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.version: int | None = None
+        self.counters: Counters = Counters(QUOTE_CACHE_COUNTERS)
+        self.shared: SharedTable | None = None
+        self._entries: OrderedDict[Hashable, tuple[float, bytes]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hits(self) -> int:
+        return self.counters.totals()[HITS]
+
+    @property
+    def misses(self) -> int:
+        return self.counters.totals()[MISSES]
+
+    @property
+    def evictions(self) -> int:
+        return self.counters.totals()[EVICTIONS]
+
+    @property
+    def expirations(self) -> int:
+        return self.counters.totals()[EXPIRATIONS]
+
+    def share(self, table: "SharedTable", counters: Counters) -> None:
+        """
+        Back the cache with a table and counters shared by the workers of the node.
+
+        :param table: The shared table, see app.shared.table.
+        :param counters: Counters named after QUOTE_CACHE_COUNTERS, such as SharedCounters.
+        """
+        self.shared = table
+        self.counters = counters
+
+    def get(self, key: Hashable, version: int) -> bytes | None:
+        """
+        Look up a quote and mark it as recently used.
+
+        :param key: The normalized quote key, see quote_key.
+        :param version: The settings version the caller prices with.
+        :return: The cached response body, or None on a miss.
+        """
+        if version != self.version:
+            self.clear()
+            self.version = version
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > self.clock():
+                self._entries.move_to_end(key)
+                self.counters.row[HITS] += 1
+                return entry[1]
+            del self._entries[key]
+            self.counters.row[EXPIRATIONS] += 1
+        if self.shared is not None:
+            body = self.shared.get(repr(key).encode(), version, time.time())
+            if body is not None:
+                self._store(key, body)
+                self.counters.row[HITS] += 1
+                return body
+        self.counters.row[MISSES] += 1
+        return None
+
+    def put(self, key: Hashable, version: int, body: bytes) -> None:
+        """
+        Store a quote, evicting the least recently used one when the cache is full.
+
+        :param key: The normalized quote key, see quote_key.
+        :param version: The settings version the quote was computed under.
+        :param body: The serialized response body.
+        """
+        if self.max_size <= 0 or version != self.version:
+            return
+        self._store(key, body)
+        if self.shared is not None:
+            now = time.time()
+            self.shared.put(repr(key).encode(), body, version, now + self.ttl_seconds, now)
+
+    def _store(self, key: Hashable, body: bytes) -> None:
+        self._entries[key] = (self.clock() + self.ttl_seconds, body)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.counters.row[EVICTIONS] += 1
+
+    def clear(self) -> None:
+        """Drop every entry of this process, keeping the counters and the shared table."""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Summarize the cache state.
+
+        :return: The counters, the current size and the configured limits.
+        """
+        hits, misses, evictions, expirations = self.counters.totals()
+        return {
+            "hits": hits,
+            "misses": misses,
+            "evictions": evictions,
+            "expirations": expirations,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "version": self.version,
+        }
+
+
+def quote_key(
+    cart_value: int,
+    delivery_distance: int,
+    number_of_items: int,
+    delivery_time: str | datetime,
+    stage_times: list[float] | None = None,
+    zone: Zone | None = None,
+    surge: float = 1.0,
+) -> tuple | None:
+    """
+    Normalize a request to the inputs the fee actually depends on.
+
+    The delivery time only matters through its weekday and UTC hour, so every quote for the
+    same basket within an hour shares one key. The delivery zone is part of the key by identity,
+    so quotes priced with zones that were since reloaded are never served, and so is the surge
+    multiplier.
+
+    :param cart_value: The validated cart value.
+    :param delivery_distance: The validated delivery distance.
+    :param number_of_items: The validated number of items.
+    :param delivery_time: The validated delivery time.
+    :param stage_times: If given, receives the seconds spent parsing the delivery time. This is
+        the first parse of a request, so it shows the real cost, hour-bucket cache misses included.
+    :param zone: The delivery zone of the customer, None outside every zone.
+    :param surge: The surge multiplier the quote is priced with.
+    :return: The cache key, or None if the delivery time cannot be parsed.
+    """
+    try:
+        if stage_times is None:
+            day_of_week, utc_hour = parse_weekday_and_hour(delivery_time)
+        else:
+            start = time.perf_counter()
+            day_of_week, utc_hour = parse_weekday_and_hour(delivery_time)
+            stage_times.append(time.perf_counter() - start)
+    except ValueError:
+        return None
+    return (cart_value, delivery_distance, number_of_items, day_of_week, utc_hour, zone, surge)
+
+
+def quote_cache_metrics() -> list[tuple[str, str, str, float]]:
+    """
+    Report the quote cache counters as metrics, see MetricsRegistry.add_collector.
+
+    :return: (name, kind, documentation, value) tuples.
+    """
+    stats = quote_cache.stats()
+    return [
+        ("quote_cache_hits_total", "counter", "Quote cache lookups answered from the cache.", stats["hits"]),
+        ("quote_cache_misses_total", "counter", "Quote cache lookups that computed the fee.", stats["misses"]),
+        ("quote_cache_evictions_total", "counter", "Quotes evicted to respect the size limit.", stats["evictions"]),
+        ("quote_cache_expirations_total", "counter", "Quotes dropped after their TTL.", stats["expirations"]),
+        ("quote_cache_size", "gauge", "Quotes currently cached.", stats["size"]),
+    ]
+
+
+quote_cache = QuoteCache(SETTINGS.QUOTE_CACHE_MAX_SIZE, SETTINGS.QUOTE_CACHE_TTL_SECONDS)
@@ -0,0 +1,98 @@
+import asyncio
+import inspect
+from typing import Any, Callable, Hashable
+
+
+class LeaderCancelled(Exception):
+    """Set on a flight whose leader was cancelled, so its followers elect a new one."""
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent computations of the same key into one.
+
+    The first caller of a key, the leader, runs the computation; callers arriving while it is
+    in flight await the leader's result instead of computing their own, and share the very same
+    object. A computation that returns a plain value finished without yielding to the event loop,
+    so nobody could have joined it and no flight is registered: synchronous pricing pays one
+    dict lookup. A computation that returns an awaitable, such as a pricing stage that awaits a
+    lookup, is registered for as long as it is awaited.
+
+    An exception raised by the computation is raised to the leader and every follower. Followers
+    are shielded from each other: a cancelled follower leaves the flight alone, and if the leader
+    is cancelled, a waiting follower takes over and computes again.
+
+    Attributes:
+    - leaders: Computations run through a flight.
+    - coalesced: Calls answered with another call's result.
+    """
+
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        self._flights: dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def run(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Run a computation, or join the one already in flight for the same key.
+
+        :param key: Identifies computations with interchangeable results.
+        :param compute: Called without arguments; returns the result or an awaitable of it.
+        :return: The result of the computation.
+        """
+        while True:
+            flight = self._flights.get(key)
+            if flight is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(flight)
+            except LeaderCancelled:
+                self.coalesced -= 1
+
+        result = compute()
+        if not inspect.isawaitable(result):
+            return result
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        self.leaders += 1
+        try:
+            value = await result
+        except BaseException as error:
+            del self._flights[key]
+            # Followers share errors of the computation, but not the leader's cancellation.
+            flight.set_exception(error if isinstance(error, Exception) else LeaderCancelled())
+            # Marks the exception as retrieved, so a flight nobody joined is not logged as unhandled.
+            flight.exception()
+            raise
+        del self._flights[key]
+        flight.set_result(value)
+        return value
+
+    def stats(self) -> dict:
+        """
+        Summarize the coalescing counters.
+
+        :return: The counters and the number of computations in flight.
+        """
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._flights)}
+
+
+def quote_flight_metrics() -> list[tuple[str, str, str, float]]:
+    """
+    Report the quote coalescing counters as metrics, see MetricsRegistry.add_collector.
+
+    :return: (name, kind, documentation, value) tuples.
+    """
+    return [
+        ("quote_flights_total", "counter", "Quote computations that identical requests could join.", quote_flights.leaders),
+        ("quote_coalesced_total", "counter", "Quote requests answered by another request's computation.", quote_flights.coalesced),
+        ("quote_flights_in_flight", "gauge", "Quote computations currently in flight.", len(quote_flights)),
+    ]
+
+
+quote_flights = SingleFlight()
@@ -0,0 +1,171 @@
+import email.message
+import json
+from functools import lru_cache
+from typing import Annotated, Any
+
+import orjson
+from fastapi.exceptions import RequestValidationError
+from pydantic import AfterValidator, TypeAdapter, ValidationError
+from typing_extensions import NotRequired, TypedDict
+
+from .schemas import (DeliveryFeeCalculatorBreakdownOutputSchema,
+                      DeliveryFeeCalculatorInputSchema,
+                      DeliveryFeeCalculatorOutputSchema, check_distance_source)
+
+# Dict counterparts of the schemas, derived from their fields so the two can never drift apart.
+# Validating into a dict checks exactly the same field types as the models, without building a
+# model instance for every request. Fields with a default may be left out and are filled in
+# from QUOTE_INPUT_DEFAULTS.
+QuoteInput = TypedDict(
+    "QuoteInput",
+    {
+        name: field.annotation if field.is_required() else NotRequired[field.annotation]
+        for name, field in DeliveryFeeCalculatorInputSchema.model_fields.items()
+    },
+)
+QuoteOutput = TypedDict(
+    "QuoteOutput",
+    {name: field.annotation for name, field in DeliveryFeeCalculatorOutputSchema.model_fields.items()},
+)
+QUOTE_INPUT_DEFAULTS = {
+    name: field.default
+    for name, field in DeliveryFeeCalculatorInputSchema.model_fields.items()
+    if not field.is_required()
+}
+
+
+def check_quote_input(data: dict) -> dict:
+    """Apply the model validator of DeliveryFeeCalculatorInputSchema to a validated dict."""
+    data = {**QUOTE_INPUT_DEFAULTS, **data}
+    check_distance_source(
+        data["delivery_distance"], data["venue_id"], data["venue_location"], data["customer_location"]
+    )
+    return data
+
+
+quote_input_adapter = TypeAdapter(Annotated[QuoteInput, AfterValidator(check_quote_input)])
+quote_output_adapter = TypeAdapter(QuoteOutput)
+breakdown_output_adapter = TypeAdapter(DeliveryFeeCalculatorBreakdownOutputSchema)
+input_schema_adapter = TypeAdapter(DeliveryFeeCalculatorInputSchema)
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Encode a value as compact JSON with orjson, falling back to the standard library for
+    integers beyond 64 bits.
+
+    :param value: The value to encode.
+    :return: The encoded document.
+    """
+    try:
+        return orjson.dumps(value)
+    except orjson.JSONEncodeError:
+        return json.dumps(value, separators=(",", ":")).encode()
+
+
+@lru_cache(maxsize=64)
+def is_json(content_type: str | None) -> bool:
+    """
+    Check whether FastAPI would decode a body with this Content-Type as JSON.
+
+    Parsing the header costs more than validating the body, and clients send a handful of
+    distinct values, so the answers are cached.
+
+    :param content_type: The raw Content-Type header value, None if absent.
+    :return: True for a missing header, application/json and application/*+json.
+    """
+    if not content_type:
+        return True
+    message = email.message.Message()
+    message["content-type"] = content_type
+    if message.get_content_maintype() != "application":
+        return False
+    subtype = message.get_content_subtype()
+    return subtype == "json" or subtype.endswith("+json")
+
+
+def validate_quote_request(body: bytes, content_type: str | None) -> QuoteInput:
+    """
+    Decode and validate a quote request body the way FastAPI validates a
+    DeliveryFeeCalculatorInputSchema body parameter.
+
+    Rules:
+    - A JSON body is decoded and validated in one pass by the precompiled validator, with no
+      intermediate Python objects. Its JSON parser reads integers beyond 64 bits exactly, as the
+      json module FastAPI uses does.
+    - Any body that fails goes through FastAPI's own steps: decoded with the json module if the
+      Content-Type is JSON, kept as bytes otherwise, missing if empty or null, and validated
+      against the model. The errors, and the 422 response FastAPI renders from them, are exactly
+      those of a model body parameter.
+
+    :param body: The raw request body.
+    :param content_type: The Content-Type header of the request.
+    :return: The validated fields.
+    :raises RequestValidationError: If the body is not a valid DeliveryFeeCalculatorInputSchema.
+    """
+    if body and is_json(content_type):
+        try:
+            return quote_input_adapter.validate_json(body)
+        except ValidationError:
+            pass
+
+    value: Any = None
+    if body:
+        if is_json(content_type):
+            try:
+                value = json.loads(body)
+            except json.JSONDecodeError as error:
+                raise RequestValidationError(
+                    [
+                        {
+                            "type": "json_invalid",
+                            "loc": ("body", error.pos),
+                            "msg": "JSON decode error",
+                            "input": {},
+                            "ctx": {"error": error.msg},
+                        }
+                    ],
+                    body=error.doc,
+                ) from error
+        else:
+            value = body
+    if value is None:
+        error = ValidationError.from_exception_data(
+            "Field required", [{"type": "missing", "loc": ("body",), "input": {}}]
+        ).errors()[0]
+        error["input"] = None
+        raise RequestValidationError([error], body=value)
+    try:
+        return dict(input_schema_adapter.validate_python(value, from_attributes=True))
+    except ValidationError as error:
+        raise RequestValidationError(
+            [{**detail, "loc": ("body",) + detail["loc"]} for detail in error.errors()], body=value
+        ) from None
+
+
+def encode_quote(delivery_fee: Any) -> bytes:
+    """
+    Render the body of a quote response.
+
+    The fee is validated against DeliveryFeeCalculatorOutputSchema's field, so a fee the model
+    would reject still fails here.
+
+    :param delivery_fee: The calculated fee.
+    :return: The JSON body.
+    :raises ValidationError: If the fee is not a valid DeliveryFeeCalculatorOutputSchema fee.
+    """
+    return dumps(quote_output_adapter.validate_python({"delivery_fee": delivery_fee}))
+
+
+def encode_breakdown(breakdown: dict) -> bytes:
+    """
+    Render the body of a quote response with the breakdown of its fee.
+
+    Only quotes asking for a breakdown pay for the model validation, see encode_quote for the
+    others.
+
+    :param breakdown: The fee and its breakdown, see FeePlan.fee_breakdown.
+    :return: The JSON body.
+    :raises ValidationError: If the breakdown is not a valid DeliveryFeeCalculatorBreakdownOutputSchema.
+    """
+    return breakdown_output_adapter.dump_json(breakdown_output_adapter.validate_python(breakdown))
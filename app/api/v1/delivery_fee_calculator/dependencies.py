@@ -0,0 +1,23 @@
+from fastapi import Request
+
+from .fee_plan import get_fee_plan
+from .helpers import DeliveryFeeCalculator
+
+
+async def get_fee_calculator(request: Request) -> DeliveryFeeCalculator:
+    """
+    Provide the application-scoped DeliveryFeeCalculator created in create_app.
+
+    Declared async so FastAPI resolves it on the event loop instead of the threadpool.
+
+    If the fee plan was rebuilt since the calculator was created, a calculator bound to the new
+    plan replaces it, so the shared instance never prices with outdated settings.
+
+    :param request: The incoming request, used to reach the application state.
+    :return: The shared DeliveryFeeCalculator.
+    """
+    calculator = request.app.state.fee_calculator
+    plan = get_fee_plan()
+    if calculator.plan is not plan:
+        calculator = request.app.state.fee_calculator = DeliveryFeeCalculator(plan)
+    return calculator
@@ -0,0 +1,415 @@
+import zlib
+from time import perf_counter
+
+from app.config.schedule import parse_rush_schedule
+from app.config.settings import SETTINGS, Settings
+
+from .zones import Zone
+
+
+def rush_multipliers(settings: Settings) -> tuple[float, ...]:
+    """
+    Flatten the rush schedule into a weekday x hour table of multipliers.
+
+    Without a RUSH_SCHEDULE, the single window of FRIDAY_DAY_OF_WEEK from LOWER_THRESHOLD_UTC
+    to UPPER_THRESHOLD_UTC applies. Windows without a multiplier use FRIDAY_RUSH_MULTIPLIER.
+
+    :param settings: The Settings instance holding the rush schedule.
+    :return: The multiplier of every hour of the week, indexed by (ISO weekday - 1) * 24 + UTC
+        hour, 1.0 outside the rush windows.
+    """
+    windows = parse_rush_schedule(settings.RUSH_SCHEDULE) or [
+        (settings.FRIDAY_DAY_OF_WEEK, settings.LOWER_THRESHOLD_UTC, settings.UPPER_THRESHOLD_UTC, None)
+    ]
+    table = [1.0] * (7 * 24)
+    for day_of_week, first_hour, last_hour, multiplier in windows:
+        if not 1 <= day_of_week <= 7:
+            continue
+        for utc_hour in range(max(first_hour, 0), min(last_hour, 23) + 1):
+            table[(day_of_week - 1) * 24 + utc_hour] = (
+                settings.FRIDAY_RUSH_MULTIPLIER if multiplier is None else multiplier
+            )
+    return tuple(table)
+
+
+class FeePlan:
+    """
+    Fee rules compiled once from a Settings instance.
+
+    Everything that depends only on configuration is resolved up front: settings values are
+    bound to slots, item and distance fees are precomputed into lookup tables, and the rush
+    schedule is flattened into a weekday x hour table of multipliers. Pricing a cart is then a few index
+    operations instead of a chain of attribute lookups, divmods and branches.
+
+    A plan is never mutated after construction; use rebuild_fee_plan to swap in a new one.
+
+    Attributes:
+    - settings: The Settings instance the plan was compiled from.
+    - version: A fingerprint of the settings, equal for identical settings in every process.
+    - item_fees: Item fee for every item count from 0 to FEE_PLAN_MAX_ITEMS.
+    - distance_fees: Distance fee for every distance from 0 to FEE_PLAN_MAX_DISTANCE meters.
+    - rush_multipliers: The rush multiplier, 1.0 outside rush windows, indexed by
+      (ISO weekday - 1) * 24 + hour, see rush_multipliers.
+    """
+
+    __slots__ = (
+        "settings",
+        "version",
+        "min_cart_value_to_avoid_surcharge",
+        "min_cart_fee",
+        "distance_surcharge",
+        "item_surcharge",
+        "max_items_without_surcharge",
+        "bulk_item_fee",
+        "min_item_fee",
+        "max_delivery_fee",
+        "free_delivery_threshold",
+        "max_tabulated_items",
+        "max_tabulated_distance",
+        "item_fees",
+        "distance_fees",
+        "rush_multipliers",
+    )
+
+    def __init__(self, settings: Settings):
+        """
+        Compile the fee rules of the provided settings.
+
+        :param settings: The Settings instance holding the fee calculation parameters.
+        """
+        self.settings = settings
+        self.version = zlib.crc32(settings.model_dump_json().encode())
+        self.min_cart_value_to_avoid_surcharge = settings.MIN_CART_VALUE_TO_AVOID_SURCHARGE
+        self.min_cart_fee = settings.MIN_CART_FEE
+        self.distance_surcharge = settings.DISTANCE_SURCHARGE
+        self.item_surcharge = settings.ITEM_SURCHARGE
+        self.max_items_without_surcharge = settings.MAX_ITEMS_WITHOUT_SURCHARGE
+        self.bulk_item_fee = settings.BULK_ITEM_FEE
+        self.min_item_fee = settings.MIN_ITEM_FEE
+        self.max_delivery_fee = settings.MAX_DELIVERY_FEE
+        self.free_delivery_threshold = settings.FREE_DELIVERY_THRESHOLD
+
+        self.max_tabulated_items = settings.FEE_PLAN_MAX_ITEMS
+        self.max_tabulated_distance = settings.FEE_PLAN_MAX_DISTANCE
+        self.item_fees = tuple(
+            self.compute_item_fee(number_of_items)
+            for number_of_items in range(settings.FEE_PLAN_MAX_ITEMS + 1)
+        )
+        self.distance_fees = tuple(
+            self.compute_distance_fee(delivery_distance)
+            for delivery_distance in range(settings.FEE_PLAN_MAX_DISTANCE + 1)
+        )
+        self.rush_multipliers = rush_multipliers(settings)
+
+    def compute_distance_fee(self, delivery_distance: int) -> int:
+        """
+        Compute the distance fee without the lookup table.
+
+        Rules:
+        - Every started 500 meters adds one distance surcharge.
+
+        :param delivery_distance: The delivery distance in meters.
+        :return: The distance fee in cents.
+        """
+        quotient, remainder = divmod(delivery_distance, 500)
+        if remainder:
+            quotient += 1
+        return quotient * self.distance_surcharge
+
+    def compute_item_fee(self, number_of_items: int) -> int:
+        """
+        Compute the item fee without the lookup table.
+
+        Rules:
+        - From the fifth item on, every item above MAX_ITEMS_WITHOUT_SURCHARGE adds an item surcharge.
+        - More than 12 items add the bulk item fee on top.
+
+        :param number_of_items: The number of items in the cart.
+        :return: The item fee in cents.
+        """
+        if 5 <= number_of_items <= 12:
+            return (number_of_items - self.max_items_without_surcharge) * self.item_surcharge
+        elif number_of_items > 12:
+            return (
+                number_of_items - self.max_items_without_surcharge
+            ) * self.item_surcharge + self.bulk_item_fee
+        else:
+            return self.min_item_fee
+
+    def cart_fee(self, cart_value: int) -> int:
+        """
+        Look up the cart fee.
+
+        :param cart_value: The value of the items in the cart in cents.
+        :return: The cart fee in cents.
+        """
+        return max(self.min_cart_value_to_avoid_surcharge - cart_value, self.min_cart_fee)
+
+    def distance_fee(self, delivery_distance: int, zone: Zone | None = None) -> int:
+        """
+        Look up the distance fee, computing it for distances beyond the table.
+
+        :param delivery_distance: The delivery distance in meters.
+        :param zone: The delivery zone of the customer, whose own distance pricing applies
+            instead of the global one.
+        :return: The distance fee in cents.
+        """
+        if zone is not None:
+            return zone.distance_fee(delivery_distance)
+        if 0 <= delivery_distance <= self.max_tabulated_distance:
+            return self.distance_fees[delivery_distance]
+        return self.compute_distance_fee(delivery_distance)
+
+    def item_fee(self, number_of_items: int) -> int:
+        """
+        Look up the item fee, computing it for item counts beyond the table.
+
+        :param number_of_items: The number of items in the cart.
+        :return: The item fee in cents.
+        """
+        if 0 <= number_of_items <= self.max_tabulated_items:
+            return self.item_fees[number_of_items]
+        return self.compute_item_fee(number_of_items)
+
+    def apply_rush_and_cap(
+        self, base_fee: int, day_of_week: int, utc_hour: int, surge: float = 1.0
+    ) -> int:
+        """
+        Apply the rush multiplier of the delivery hour and the surge multiplier, then the
+        maximum delivery fee.
+
+        :param base_fee: The base delivery fee in cents.
+        :param day_of_week: The ISO weekday of the delivery.
+        :param utc_hour: The UTC hour of the delivery.
+        :param surge: The surge multiplier, see SurgeMeter.
+        :return: The capped delivery fee in cents.
+        """
+        multiplier = self.rush_multipliers[(day_of_week - 1) * 24 + utc_hour] * surge
+        if multiplier != 1.0:
+            base_fee = base_fee * multiplier
+        return min(base_fee, self.max_delivery_fee)
+
+    def fee(
+        self,
+        cart_value: int,
+        delivery_distance: int,
+        number_of_items: int,
+        day_of_week: int,
+        utc_hour: int,
+        zone: Zone | None = None,
+        surge: float = 1.0,
+    ) -> int:
+        """
+        Price a cart in a single pass over the precomputed tables.
+
+        :param cart_value: The value of the items in the cart in cents.
+        :param delivery_distance: The delivery distance in meters.
+        :param number_of_items: The number of items in the cart.
+        :param day_of_week: The ISO weekday of the delivery.
+        :param utc_hour: The UTC hour of the delivery.
+        :param zone: The delivery zone of the customer, whose distance fee replaces the global
+            one, see Zone.distance_fee.
+        :param surge: The surge multiplier, applied on top of the rush multiplier.
+        :return: The final delivery fee in cents.
+        """
+        if cart_value >= self.free_delivery_threshold:
+            return 0
+        # Conditional expressions instead of min()/max() and bounds kept in slots
+        # avoid the builtin call overhead that dominates such short arithmetic.
+        cart_fee = self.min_cart_value_to_avoid_surcharge - cart_value
+        base_fee = (
+            (cart_fee if cart_fee > self.min_cart_fee else self.min_cart_fee)
+            + (
+                self.distance_fees[delivery_distance]
+                if zone is None and 0 <= delivery_distance <= self.max_tabulated_distance
+                else self.distance_fee(delivery_distance, zone)
+            )
+            + (
+                self.item_fees[number_of_items]
+                if 0 <= number_of_items <= self.max_tabulated_items
+                else self.compute_item_fee(number_of_items)
+            )
+        )
+        multiplier = self.rush_multipliers[(day_of_week - 1) * 24 + utc_hour] * surge
+        if multiplier != 1.0:
+            base_fee = base_fee * multiplier
+        return base_fee if base_fee <= self.max_delivery_fee else self.max_delivery_fee
+
+    def timed_fee(
+        self,
+        cart_value: int,
+        delivery_distance: int,
+        number_of_items: int,
+        day_of_week: int,
+        utc_hour: int,
+        stage_times: list[float],
+        zone: Zone | None = None,
+        surge: float = 1.0,
+    ) -> int:
+        """
+        Price a cart exactly like fee, timing each stage of the calculation.
+
+        Used instead of fee on the quotes sampled for stage metrics, see StageSampler.
+
+        :param cart_value: The value of the items in the cart in cents.
+        :param delivery_distance: The delivery distance in meters.
+        :param number_of_items: The number of items in the cart.
+        :param day_of_week: The ISO weekday of the delivery.
+        :param utc_hour: The UTC hour of the delivery.
+        :param stage_times: Receives the seconds spent on the cart, distance and item fees and
+            on the rush and surge multipliers and cap, appended in that order.
+        :param zone: The delivery zone of the customer, see fee.
+        :param surge: The surge multiplier, see fee.
+        :return: The final delivery fee in cents.
+        """
+        if cart_value >= self.free_delivery_threshold:
+            return 0
+        start = perf_counter()
+        cart_fee = self.min_cart_value_to_avoid_surcharge - cart_value
+        cart_fee = cart_fee if cart_fee > self.min_cart_fee else self.min_cart_fee
+        carted = perf_counter()
+        distance_fee = (
+            self.distance_fees[delivery_distance]
+            if zone is None and 0 <= delivery_distance <= self.max_tabulated_distance
+            else self.distance_fee(delivery_distance, zone)
+        )
+        distanced = perf_counter()
+        item_fee = (
+            self.item_fees[number_of_items]
+            if 0 <= number_of_items <= self.max_tabulated_items
+            else self.compute_item_fee(number_of_items)
+        )
+        itemized = perf_counter()
+        base_fee = cart_fee + distance_fee + item_fee
+        multiplier = self.rush_multipliers[(day_of_week - 1) * 24 + utc_hour] * surge
+        if multiplier != 1.0:
+            base_fee = base_fee * multiplier
+        fee = base_fee if base_fee <= self.max_delivery_fee else self.max_delivery_fee
+        end = perf_counter()
+        stage_times.extend((carted - start, distanced - carted, itemized - distanced, end - itemized))
+        return fee
+
+    def fee_breakdown(
+        self,
+        cart_value: int,
+        delivery_distance: int,
+        number_of_items: int,
+        day_of_week: int,
+        utc_hour: int,
+        zone: Zone | None = None,
+        surge: float = 1.0,
+    ) -> dict:
+        """
+        Price a cart exactly like fee, keeping each component and the rules that fired.
+
+        Used instead of fee on the quotes that ask for a breakdown; each component is looked up
+        once, as in fee, and kept rather than summed away.
+
+        Rules reported:
+        - free_delivery: The cart value reaches FREE_DELIVERY_THRESHOLD; no fee is computed.
+        - small_order_surcharge: The cart value is below MIN_CART_VALUE_TO_AVOID_SURCHARGE.
+        - item_surcharge, bulk_item_fee: The cart has 5 or more, or more than 12, items.
+        - zone_pricing: The distance fee is the delivery zone's.
+        - rush_hour: The delivery hour is in a rush window.
+        - surge: A surge multiplier applies.
+        - max_delivery_fee: The fee is capped at MAX_DELIVERY_FEE.
+
+        :param cart_value: The value of the items in the cart in cents.
+        :param delivery_distance: The delivery distance in meters.
+        :param number_of_items: The number of items in the cart.
+        :param day_of_week: The ISO weekday of the delivery.
+        :param utc_hour: The UTC hour of the delivery.
+        :param zone: The delivery zone of the customer, see fee.
+        :param surge: The surge multiplier, see fee.
+        :return: The final fee under delivery_fee, and its cart, distance and item fees, their
+            sum as base_fee, the rush and surge multipliers, the zone ID and the fired rules
+            under breakdown.
+        """
+        if cart_value >= self.free_delivery_threshold:
+            return {
+                "delivery_fee": 0,
+                "breakdown": {
+                    "cart_fee": 0,
+                    "distance_fee": 0,
+                    "item_fee": 0,
+                    "base_fee": 0,
+                    "rush_multiplier": 1.0,
+                    "surge_multiplier": 1.0,
+                    "zone": None,
+                    "rules": ["free_delivery"],
+                },
+            }
+        rules = []
+        cart_fee = self.min_cart_value_to_avoid_surcharge - cart_value
+        if cart_fee > 0:
+            rules.append("small_order_surcharge")
+        cart_fee = cart_fee if cart_fee > self.min_cart_fee else self.min_cart_fee
+        distance_fee = (
+            self.distance_fees[delivery_distance]
+            if zone is None and 0 <= delivery_distance <= self.max_tabulated_distance
+            else self.distance_fee(delivery_distance, zone)
+        )
+        item_fee = (
+            self.item_fees[number_of_items]
+            if 0 <= number_of_items <= self.max_tabulated_items
+            else self.compute_item_fee(number_of_items)
+        )
+        if number_of_items >= 5:
+            rules.append("item_surcharge")
+        if number_of_items > 12:
+            rules.append("bulk_item_fee")
+        if zone is not None:
+            rules.append("zone_pricing")
+        base_fee = cart_fee + distance_fee + item_fee
+        rush_multiplier = self.rush_multipliers[(day_of_week - 1) * 24 + utc_hour]
+        if rush_multiplier != 1.0:
+            rules.append("rush_hour")
+        if surge != 1.0:
+            rules.append("surge")
+        fee = base_fee
+        multiplier = rush_multiplier * surge
+        if multiplier != 1.0:
+            fee = base_fee * multiplier
+        if fee > self.max_delivery_fee:
+            fee = self.max_delivery_fee
+            rules.append("max_delivery_fee")
+        return {
+            "delivery_fee": fee,
+            "breakdown": {
+                "cart_fee": cart_fee,
+                "distance_fee": distance_fee,
+                "item_fee": item_fee,
+                "base_fee": base_fee,
+                "rush_multiplier": rush_multiplier,
+                "surge_multiplier": surge,
+                "zone": None if zone is None else zone.id,
+                "rules": rules,
+            },
+        }
+
+_fee_plan = FeePlan(SETTINGS)
+
+
+def get_fee_plan() -> FeePlan:
+    """
+    Return the fee plan currently in effect.
+
+    :return: The active FeePlan.
+    """
+    return _fee_plan
+
+
+def rebuild_fee_plan(settings: Settings) -> FeePlan:
+    """
+    Compile a new fee plan and make it the active one.
+
+    The new plan is fully built before it replaces the old one with a single reference
+    assignment, so callers only ever see a complete plan.
+
+    :param settings: The Settings instance to compile.
+    :return: The new active FeePlan.
+    """
+    global _fee_plan
+    plan = FeePlan(settings)
+    _fee_plan = plan
+    return plan
@@ -0,0 +1,224 @@
+import csv
+import json
+import math
+from pathlib import Path
+from typing import Iterable, Sequence
+
+from .schemas import GeoPointSchema
+
+# Mean radius of the Earth (IUGG), the usual choice for haversine distances.
+EARTH_RADIUS_METERS = 6_371_008.8
+
+
+def haversine_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Calculate the great-circle distance between two points.
+
+    :param lat1: Latitude of the first point in degrees.
+    :param lon1: Longitude of the first point in degrees.
+    :param lat2: Latitude of the second point in degrees.
+    :param lon2: Longitude of the second point in degrees.
+    :return: The distance in meters.
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def haversine_meters_array(lat1, lon1, lat2, lon2):
+    """
+    Calculate the great-circle distances between two arrays of points, element-wise.
+
+    NumPy is imported by the first call, so applications that never price a batch of
+    coordinates do not load it.
+
+    :param lat1: Latitudes of the first points in degrees.
+    :param lon1: Longitudes of the first points in degrees.
+    :param lat2: Latitudes of the second points in degrees.
+    :param lon2: Longitudes of the second points in degrees.
+    :return: A float64 array of distances in meters.
+    """
+    import numpy as np
+
+    phi1 = np.radians(np.asarray(lat1, dtype=np.float64))
+    phi2 = np.radians(np.asarray(lat2, dtype=np.float64))
+    delta_lambda = np.radians(np.asarray(lon2, dtype=np.float64) - np.asarray(lon1, dtype=np.float64))
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(delta_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class VenueIndex:
+    """
+    Venue coordinates loaded from a local file, looked up by venue ID in O(1).
+
+    IDs map to a row of two parallel coordinate columns, so a venue resolves with one dict
+    lookup however many venues are loaded.
+
+    Attributes:
+    - path: The file the venues were loaded from, empty for an empty index.
+    - latitudes, longitudes: The venue coordinates in degrees, one row per venue.
+    """
+
+    def __init__(self, venues: Iterable[tuple[str, float, float]] = (), path: str = ""):
+        """
+        Build an index of venues.
+
+        :param venues: (venue ID, latitude, longitude) tuples.
+        :param path: The file the venues were loaded from.
+        :raises ValueError: If a venue ID is repeated or a coordinate is out of range.
+        """
+        self.path = path
+        self.latitudes: list[float] = []
+        self.longitudes: list[float] = []
+        self._rows: dict[str, int] = {}
+        for venue_id, latitude, longitude in venues:
+            if venue_id in self._rows:
+                raise ValueError(f"Venue '{venue_id}' is listed twice")
+            point = GeoPointSchema(lat=latitude, lon=longitude)
+            self._rows[venue_id] = len(self.latitudes)
+            self.latitudes.append(point.lat)
+            self.longitudes.append(point.lon)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @classmethod
+    def from_file(cls, path: str) -> "VenueIndex":
+        """
+        Load venues from a CSV file with id, lat and lon columns, or from a GeoJSON
+        FeatureCollection of Point features whose "id" or "properties.id" is the venue ID.
+
+        :param path: The .csv, .json or .geojson file.
+        :return: The index.
+        :raises ValueError: If the file is malformed.
+        """
+        file = Path(path)
+        try:
+            if file.suffix.lower() == ".csv":
+                with file.open(newline="") as rows:
+                    venues = [(row["id"], float(row["lat"]), float(row["lon"])) for row in csv.DictReader(rows)]
+            else:
+                venues = []
+                for feature in json.loads(file.read_text())["features"]:
+                    geometry = feature["geometry"]
+                    if geometry["type"] != "Point":
+                        raise ValueError(f"Venue geometries must be points, not {geometry['type']}")
+                    venue_id = feature.get("id", feature.get("properties", {}).get("id"))
+                    longitude, latitude = geometry["coordinates"][:2]
+                    venues.append((str(venue_id), float(latitude), float(longitude)))
+        except (KeyError, IndexError, TypeError) as error:
+            raise ValueError(f"Malformed venues file {path}: {error!r}") from error
+        return cls(venues, path)
+
+    def coordinates(self, venue_id: str) -> tuple[float, float]:
+        """
+        Look up the coordinates of a venue.
+
+        :param venue_id: The venue ID.
+        :return: The latitude and longitude in degrees.
+        :raises ValueError: If the venue is unknown.
+        """
+        try:
+            row = self._rows[venue_id]
+        except KeyError:
+            raise ValueError(f"Unknown venue '{venue_id}'") from None
+        return self.latitudes[row], self.longitudes[row]
+
+
+def resolve_delivery_distance(
+    delivery_distance: int | None,
+    venue_id: str | None,
+    venue_location: GeoPointSchema | None,
+    customer_location: GeoPointSchema | None,
+    venues: VenueIndex,
+) -> int:
+    """
+    Return the delivery distance of a validated quote, computing it from coordinates if needed.
+
+    :param delivery_distance: The distance sent by the client, None to compute it.
+    :param venue_id: The venue to look up, if venue_location is not given.
+    :param venue_location: The coordinates of the venue.
+    :param customer_location: The coordinates of the delivery address.
+    :param venues: The venues venue_id is looked up in.
+    :return: The delivery distance, rounded to the nearest meter.
+    :raises ValueError: If the venue is unknown.
+    """
+    if delivery_distance is not None:
+        return delivery_distance
+    if venue_location is not None:
+        latitude, longitude = venue_location.lat, venue_location.lon
+    else:
+        latitude, longitude = venues.coordinates(venue_id)
+    return round(haversine_meters(latitude, longitude, customer_location.lat, customer_location.lon))
+
+
+def resolve_delivery_distances(orders: Sequence, venues: VenueIndex) -> list[int | ValueError]:
+    """
+    Resolve the delivery distances of many validated quotes, see resolve_delivery_distance.
+
+    The venues are gathered first and every computed distance then comes from a single
+    vectorized haversine over all the quotes that need one.
+
+    :param orders: Validated DeliveryFeeCalculatorInputSchema instances.
+    :param venues: The venues venue IDs are looked up in.
+    :return: One distance per order in input order, or the ValueError explaining why it has none.
+    """
+    distances: list[int | ValueError] = [order.delivery_distance for order in orders]
+    positions = []
+    venue_latitudes = []
+    venue_longitudes = []
+    customer_latitudes = []
+    customer_longitudes = []
+    for position, order in enumerate(orders):
+        if order.delivery_distance is not None:
+            continue
+        if order.venue_location is not None:
+            latitude, longitude = order.venue_location.lat, order.venue_location.lon
+        else:
+            try:
+                latitude, longitude = venues.coordinates(order.venue_id)
+            except ValueError as error:
+                distances[position] = error
+                continue
+        positions.append(position)
+        venue_latitudes.append(latitude)
+        venue_longitudes.append(longitude)
+        customer_latitudes.append(order.customer_location.lat)
+        customer_longitudes.append(order.customer_location.lon)
+    if positions:
+        computed = haversine_meters_array(
+            venue_latitudes, venue_longitudes, customer_latitudes, customer_longitudes
+        ).round()
+        for position, distance in zip(positions, computed.tolist()):
+            distances[position] = int(distance)
+    return distances
+
+
+_venue_index = VenueIndex()
+
+
+def get_venue_index() -> VenueIndex:
+    """
+    Return the venues loaded from VENUES_FILE.
+
+    :return: The active venue index, empty if no file is configured.
+    """
+    return _venue_index
+
+
+def load_venue_index(path: str) -> VenueIndex:
+    """
+    Load the venues of a file and make them the active index.
+
+    :param path: The venues file, empty for no venues.
+    :return: The new index.
+    :raises ValueError: If the file is malformed; the active index is kept.
+    :raises OSError: If the file cannot be read; the active index is kept.
+    """
+    global _venue_index
+    _venue_index = VenueIndex.from_file(path) if path else VenueIndex()
+    return _venue_index
@@ -1,6 +1,8 @@
 from datetime import datetime
 
-from app.config.settings import SETTINGS
+from .fee_plan import FeePlan, get_fee_plan
+from .timestamps import parse_weekday_and_hour
+from .zones import Zone
 
 
 class DeliveryFeeCalculator:
@@ -11,19 +13,35 @@ class DeliveryFeeCalculator:
     - Cart fee is calculated based on cart value.
     - Distance fee is calculated based on delivery distance.
     - Item fee is calculated based on the number of items in the cart.
-    - Friday rush multiplier is applied during specific hours.
+    - Friday rush multiplier is applied during specific hours, or the multipliers of the rush
+      schedule when one is configured.
+    - A surge multiplier may be applied on top under heavy quote volume.
+
+    One instance is shared by the whole application (see create_app), so the values used on
+    every call are bound to slots once instead of being looked up per request.
 
     Attributes:
+    - plan: The FeePlan compiled from the settings, holding the precomputed fee tables.
     - settings: An instance of the SETTINGS class containing fee calculation parameters.
+    - free_delivery_threshold: Cart value from which delivery is free, bound from the plan.
+    - price: The plan's single-pass FeePlan.fee, bound once.
     """
 
-    def __init__(self):
+    __slots__ = ("plan", "settings", "free_delivery_threshold", "price")
+
+    def __init__(self, plan: FeePlan | None = None):
         """
-        Initialize the DeliveryFeeCalculator with the provided settings.
+        Initialize the DeliveryFeeCalculator with the provided fee plan.
+
+        The plan is compiled from settings containing constant parameters such as minimum cart value,
+        distance fees, item fees, and Friday rush details.
 
-        The settings contain constant parameters such as minimum cart value, distance fees, item fees, and Friday rush details.
+        :param plan: The fee plan to price with, defaults to the active plan.
         """
-        self.settings = SETTINGS
+        self.plan = plan or get_fee_plan()
+        self.settings = self.plan.settings
+        self.free_delivery_threshold = self.plan.free_delivery_threshold
+        self.price = self.plan.fee
 
     def calculate_cart_fee(self, cart_value: int) -> int:
         """
@@ -36,34 +54,22 @@ class DeliveryFeeCalculator:
         :param cart_value: The value of the items in the cart in cents.
         :return: The calculated cart fee in cents.
         """
-        return max(
-            self.settings.MIN_CART_VALUE_TO_AVOID_SURCHARGE - cart_value,
-            self.settings.MIN_CART_FEE,
-        )
+        return self.plan.cart_fee(cart_value)
 
-    def calculate_distance_fee(self, delivery_distance: int) -> int:
+    def calculate_distance_fee(self, delivery_distance: int, zone: Zone | None = None) -> int:
         """
         Calculate the distance fee based on the provided delivery distance.
 
         Rules:
         - A delivery fee of 2€ is applied for the first 1000 meters.
         - For distances longer than 1000 meters, 1€ is added for every additional 500 meters.
+        - Inside a delivery zone, the zone's base fee and surcharge apply instead.
 
         :param delivery_distance: The delivery distance in meters.
+        :param zone: The delivery zone of the customer, None outside every zone.
         :return: The calculated distance fee in cents.
         """
-        if delivery_distance % 500 == 0:
-            distance_fee_mod_500 = (
-                delivery_distance // 500
-            ) * self.settings.DISTANCE_SURCHARGE
-            return distance_fee_mod_500
-        else:
-            quotient, remainder = divmod(delivery_distance, 500)
-            rounded_distance = (delivery_distance + 500) - remainder
-            distance_fee_rounded = (
-                rounded_distance // 500
-            ) * self.settings.DISTANCE_SURCHARGE
-            return distance_fee_rounded
+        return self.plan.distance_fee(delivery_distance, zone)
 
     def calculate_item_fee(self, number_of_items: int) -> int:
         """
@@ -76,51 +82,35 @@ class DeliveryFeeCalculator:
         :param number_of_items: The number of items in the cart.
         :return: The calculated item fee in cents.
         """
-        if 5 <= number_of_items <= 12:
-            return (
-                number_of_items - self.settings.MAX_ITEMS_WITHOUT_SURCHARGE
-            ) * self.settings.ITEM_SURCHARGE
-        elif number_of_items > 12:
-            return (
-                number_of_items - self.settings.MAX_ITEMS_WITHOUT_SURCHARGE
-            ) * self.settings.ITEM_SURCHARGE + self.settings.BULK_ITEM_FEE
-        else:
-            return self.settings.MIN_ITEM_FEE
-
-    def apply_friday_rush_multiplier(self, base_fee: int, delivery_time: str) -> int:
+        return self.plan.item_fee(number_of_items)
+
+    def apply_friday_rush_multiplier(
+        self, base_fee: int, delivery_time: str | datetime
+    ) -> int:
         """
         Apply the Friday rush multiplier to the base fee during the specified time.
 
         Rules:
         - During the Friday rush (3 - 7 PM UTC), the delivery fee is multiplied by 1.2x.
+        - With a RUSH_SCHEDULE, each scheduled window applies its own multiplier instead.
         - The fee cannot exceed the maximum of 15€.
 
         :param base_fee: The base delivery fee in cents.
-        :param delivery_time: The delivery time in ISO format.
+        :param delivery_time: The delivery time as an ISO string or a datetime.
         :return: The final delivery fee after applying the Friday rush rules in cents.
         """
-        date_time = datetime.strptime(delivery_time, "%Y-%m-%dT%H:%M:%SZ")
-        day_of_week, utc_hour = date_time.isoweekday(), date_time.hour
-
-        if (
-            day_of_week == self.settings.FRIDAY_DAY_OF_WEEK
-            and self.settings.LOWER_THRESHOLD_UTC
-            <= utc_hour
-            <= self.settings.UPPER_THRESHOLD_UTC
-        ):
-            return min(
-                base_fee * self.settings.FRIDAY_RUSH_MULTIPLIER,
-                self.settings.MAX_DELIVERY_FEE,
-            )
-        else:
-            return min(base_fee, self.settings.MAX_DELIVERY_FEE)
+        day_of_week, utc_hour = parse_weekday_and_hour(delivery_time)
+        return self.plan.apply_rush_and_cap(base_fee, day_of_week, utc_hour)
 
     def calculate_delivery_fee(
         self,
         cart_value: int,
         delivery_distance: int,
         number_of_items: int,
-        delivery_time: str,
+        delivery_time: str | datetime,
+        stage_times: list[float] | None = None,
+        zone: Zone | None = None,
+        surge: float = 1.0,
     ) -> int:
         """
         Calculate the total delivery fee based on cart value, delivery distance, items, and delivery time.
@@ -128,14 +118,58 @@ class DeliveryFeeCalculator:
         :param cart_value: The value of the items in the cart in cents.
         :param delivery_distance: The delivery distance in meters.
         :param number_of_items: The number of items in the cart.
-        :param delivery_time: The delivery time in ISO format.
+        :param delivery_time: The delivery time as an ISO string or a datetime.
+        :param stage_times: If given, receives the duration of each pricing stage, see
+            FeePlan.timed_fee.
+        :param zone: The delivery zone of the customer, whose distance pricing replaces the
+            global one, see ZoneIndex.lookup.
+        :param surge: The surge multiplier, applied on top of the rush multiplier, see
+            SurgeMeter.multiplier.
         :return: The final calculated delivery fee in cents.
         """
-        if cart_value >= self.settings.FREE_DELIVERY_THRESHOLD:
+        if cart_value >= self.free_delivery_threshold:
             return 0
-        cart_fee = self.calculate_cart_fee(cart_value)
-        distance_fee = self.calculate_distance_fee(delivery_distance)
-        item_fee = self.calculate_item_fee(number_of_items)
-        total_fee = cart_fee + distance_fee + item_fee
-        final_fee = self.apply_friday_rush_multiplier(total_fee, delivery_time)
-        return final_fee
+        day_of_week, utc_hour = parse_weekday_and_hour(delivery_time)
+        if stage_times is not None:
+            return self.plan.timed_fee(
+                cart_value,
+                delivery_distance,
+                number_of_items,
+                day_of_week,
+                utc_hour,
+                stage_times,
+                zone,
+                surge,
+            )
+        return self.price(
+            cart_value, delivery_distance, number_of_items, day_of_week, utc_hour, zone, surge
+        )
+
+    def calculate_delivery_fee_breakdown(
+        self,
+        cart_value: int,
+        delivery_distance: int,
+        number_of_items: int,
+        delivery_time: str | datetime,
+        zone: Zone | None = None,
+        surge: float = 1.0,
+    ) -> dict:
+        """
+        Calculate the total delivery fee like calculate_delivery_fee, along with its components
+        and the rules that fired, in the same single pass.
+
+        :param cart_value: The value of the items in the cart in cents.
+        :param delivery_distance: The delivery distance in meters.
+        :param number_of_items: The number of items in the cart.
+        :param delivery_time: The delivery time as an ISO string or a datetime.
+        :param zone: The delivery zone of the customer, see calculate_delivery_fee.
+        :param surge: The surge multiplier, see calculate_delivery_fee.
+        :return: The fee and its breakdown, see FeePlan.fee_breakdown.
+        """
+        if cart_value >= self.free_delivery_threshold:
+            # Free carts are not priced, so their delivery time is not parsed either.
+            return self.plan.fee_breakdown(cart_value, delivery_distance, number_of_items, 1, 0)
+        day_of_week, utc_hour = parse_weekday_and_hour(delivery_time)
+        return self.plan.fee_breakdown(
+            cart_value, delivery_distance, number_of_items, day_of_week, utc_hour, zone, surge
+        )
@@ -0,0 +1,271 @@
+import asyncio
+import gzip
+import logging
+import os
+import time
+from pathlib import Path
+from typing import BinaryIO
+
+from app.config.settings import Settings
+
+from .codec import dumps
+
+logger = logging.getLogger(__name__)
+
+# The fields of a quote record, in the order of its tuple; the served response body follows.
+RECORD_FIELDS = (
+    "logged_at",
+    "settings_version",
+    "cart_value",
+    "delivery_distance",
+    "number_of_items",
+    "time",
+    "zone",
+    "surge",
+)
+
+
+def encode_record(record: tuple) -> bytes:
+    """
+    Encode a quote record as one NDJSON line.
+
+    The response body is already JSON, so it is spliced into the line as it was served rather
+    than decoded and encoded again.
+
+    :param record: The values of RECORD_FIELDS followed by the response body.
+    :return: The line, newline included.
+    """
+    line = dumps(dict(zip(RECORD_FIELDS, record)))
+    return line[:-1] + b',"quote":' + record[-1] + b"}\n"
+
+
+class QuoteLog:
+    """
+    Records every fee quote to local NDJSON files without writing on the event loop.
+
+    Requests append a tuple of the quote's inputs, settings version and response body to an
+    in-memory buffer of at most queue_size records, which costs a list append. A background
+    task swaps the buffer for an empty one whenever it holds batch_size records, and at least
+    every flush_interval seconds, and writes the batch on a worker thread in one write call.
+    Files are named after their creation time and the process, so each worker writes its own,
+    and a new file is started once the current one has max_file_bytes of records, counted
+    before compression. With compress, files are gzip streams flushed after every batch, so a
+    crash loses no flushed record.
+
+    When the buffer is full, a new record is dropped and counted with the drop overflow policy,
+    and with the block policy the request waits for the next flush.
+
+    Attributes:
+    - directory: The directory of the log files.
+    - queue_size: The most records buffered before the overflow policy applies.
+    - overflow: "drop" or "block".
+    - batch_size: Buffered records that trigger a flush before the interval.
+    - flush_interval: The most seconds a record waits in the buffer.
+    - max_file_bytes: The size at which a new file is started.
+    - compress: Whether new files are gzip compressed.
+    - active: Whether the writer runs and records are accepted.
+    - written: Records written to files.
+    - dropped: Records lost to a full buffer or a failed write.
+    - blocked: Requests that waited for room in the buffer.
+    - flushes: Batches written.
+    - flush_seconds: Total time spent writing batches.
+    - last_flush_seconds: Time spent writing the last batch.
+    """
+
+    def __init__(
+        self,
+        directory: str = "",
+        queue_size: int = 10_000,
+        overflow: str = "drop",
+        batch_size: int = 1_000,
+        flush_interval: float = 1.0,
+        max_file_bytes: int = 64 * 1024 * 1024,
+        compress: bool = False,
+    ):
+        """
+        Initialize a stopped log with an empty buffer.
+
+        :param directory: The directory of the log files.
+        :param queue_size: The most records buffered before the overflow policy applies.
+        :param overflow: "drop" to count and drop records while the buffer is full, "block" to
+            make requests wait for the next flush.
+        :param batch_size: Buffered records that trigger a flush before the interval.
+        :param flush_interval: The most seconds a record waits in the buffer.
+        :param max_file_bytes: The size at which a new file is started.
+        :param compress: Whether new files are gzip compressed.
+        """
+        self.directory = directory
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.compress = compress
+        self.active = False
+        self.written = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.flushes = 0
+        self.flush_seconds = 0.0
+        self.last_flush_seconds = 0.0
+        self._pending: list[tuple] = []
+        self._file: BinaryIO | None = None
+        self._file_bytes = 0
+        self._file_count = 0
+        self._wakeup = asyncio.Event()
+        self._room = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def configure(self, settings: Settings) -> None:
+        """
+        Apply the quote log settings, except the directory, which is given to start. Compression
+        applies from the next file.
+
+        :param settings: The settings to apply.
+        """
+        self.queue_size = settings.QUOTE_LOG_QUEUE_SIZE
+        self.overflow = settings.QUOTE_LOG_OVERFLOW
+        self.batch_size = settings.QUOTE_LOG_BATCH_SIZE
+        self.flush_interval = settings.QUOTE_LOG_FLUSH_INTERVAL_SECONDS
+        self.max_file_bytes = settings.QUOTE_LOG_MAX_FILE_BYTES
+        self.compress = settings.QUOTE_LOG_COMPRESS
+
+    @property
+    def depth(self) -> int:
+        """The number of buffered records."""
+        return len(self._pending)
+
+    def offer(self, record: tuple) -> bool:
+        """
+        Buffer a record if there is room, or apply the drop policy.
+
+        :param record: The values of RECORD_FIELDS followed by the response body.
+        :return: False if the buffer is full and the block policy applies, see put.
+        """
+        pending = self._pending
+        if len(pending) < self.queue_size:
+            pending.append(record)
+            if len(pending) == self.batch_size:
+                self._wakeup.set()
+            return True
+        if self.overflow == "block":
+            return False
+        self.dropped += 1
+        return True
+
+    async def put(self, record: tuple) -> None:
+        """
+        Buffer a record, waiting for flushes until there is room.
+
+        :param record: The values of RECORD_FIELDS followed by the response body.
+        """
+        self.blocked += 1
+        while len(self._pending) >= self.queue_size and self.active:
+            self._wakeup.set()
+            await self._room.wait()
+        if not self.active:
+            # The log stopped while the request waited; its last flush is done.
+            self.dropped += 1
+            return
+        self._pending.append(record)
+
+    async def flush(self) -> None:
+        """Write the buffered records and wake the requests waiting for room."""
+        batch, self._pending = self._pending, []
+        # Requests waiting on the previous event are woken; later ones wait for the next flush.
+        room, self._room = self._room, asyncio.Event()
+        room.set()
+        if not batch:
+            return
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._write, batch)
+        except Exception:
+            logger.exception("Writing %d quote records failed", len(batch))
+            self.dropped += len(batch)
+        else:
+            self.written += len(batch)
+        self.last_flush_seconds = time.perf_counter() - started
+        self.flush_seconds += self.last_flush_seconds
+        self.flushes += 1
+
+    def _write(self, batch: list[tuple]) -> None:
+        """Append a batch to the current file, starting a new one when it is full."""
+        data = b"".join(map(encode_record, batch))
+        if self._file is None or self._file_bytes >= self.max_file_bytes:
+            self._open()
+        self._file.write(data)
+        self._file.flush()
+        self._file_bytes += len(data)
+
+    def _open(self) -> None:
+        """Close the current file and start a new one."""
+        self._close()
+        directory = Path(self.directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        self._file_count += 1
+        name = f"quotes-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{self._file_count}.ndjson"
+        if self.compress:
+            self._file = gzip.open(directory / f"{name}.gz", "ab")
+        else:
+            self._file = open(directory / name, "ab")
+        self._file_bytes = 0
+
+    def _close(self) -> None:
+        """Close the current file, if any."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    async def run(self) -> None:
+        """Flush every interval, or as soon as a batch is buffered, until the log is stopped."""
+        while self.active:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self, directory: str) -> None:
+        """
+        Start writing in a background task of the running event loop and accept records.
+
+        :param directory: The directory of the log files, created if needed.
+        """
+        if self._task is None:
+            self.directory = directory
+            self.active = True
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop accepting records, write the buffered ones and close the file."""
+        if self._task is not None:
+            # The writer is woken rather than cancelled, so a batch being written is never cut
+            # short, then what is left is written.
+            self.active = False
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            await self.flush()
+            await asyncio.to_thread(self._close)
+
+
+def quote_log_metrics() -> list[tuple[str, str, str, float]]:
+    """
+    Report the quote log's buffer and writes as metrics, see MetricsRegistry.add_collector.
+
+    :return: (name, kind, documentation, value) tuples.
+    """
+    return [
+        ("quote_log_queue_depth", "gauge", "Quote records waiting to be written.", quote_log.depth),
+        ("quote_log_records_written_total", "counter", "Quote records written to the log.", quote_log.written),
+        ("quote_log_records_dropped_total", "counter", "Quote records lost to a full buffer or a failed write.", quote_log.dropped),
+        ("quote_log_blocked_total", "counter", "Quotes that waited for room in the log buffer.", quote_log.blocked),
+        ("quote_log_flushes_total", "counter", "Batches of quote records written.", quote_log.flushes),
+        ("quote_log_flush_seconds_total", "counter", "Time spent writing batches of quote records.", quote_log.flush_seconds),
+        ("quote_log_last_flush_seconds", "gauge", "Time spent writing the last batch of quote records.", quote_log.last_flush_seconds),
+    ]
+
+
+quote_log = QuoteLog()
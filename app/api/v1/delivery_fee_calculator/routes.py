@@ -1,8 +1,76 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import time
+from functools import lru_cache
+from urllib.parse import parse_qsl
 
+from app.api.metrics.stages import stage_sampler
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+
+from .batch import parse_batch_body, quote_batch
+from .cache import quote_cache, quote_key
+from .coalescing import quote_flights
+from .codec import encode_breakdown, encode_quote, validate_quote_request
+from .dependencies import get_fee_calculator
+from .geo import get_venue_index, resolve_delivery_distance
 from .helpers import DeliveryFeeCalculator
-from .schemas import (DeliveryFeeCalculatorInputSchema,
-                      DeliveryFeeCalculatorOutputSchema)
+from .quote_log import quote_log
+from .schemas import (DeliveryFeeCalculatorBatchOutputSchema,
+                      DeliveryFeeCalculatorInputSchema,
+                      DeliveryFeeCalculatorOutputSchema,
+                      DeliveryFeeCalculatorSimulationInputSchema,
+                      DeliveryFeeCalculatorSimulationOutputSchema,
+                      QuoteCacheStatsSchema)
+from .streaming import RequestStreamingResponse, stream_quotes
+from .surge import surge_meter
+from .zones import get_zone_index
+
+SETTINGS_VERSION_HEADER = "X-Settings-Version"
+BREAKDOWN_HEADER = "X-Fee-Breakdown"
+# ASGI header names are lowercase bytes.
+RAW_BREAKDOWN_HEADER = BREAKDOWN_HEADER.lower().encode()
+BREAKDOWN_PARAMETER = "breakdown"
+TRUE_VALUES = frozenset(("1", "true", "yes", "on"))
+
+
+@lru_cache(maxsize=8)
+def version_headers(version: int) -> dict[str, str]:
+    """
+    Build the response headers announcing a settings version, once per version.
+
+    Responses only read the mapping, so every request priced under the same version shares it.
+
+    :param version: The FeePlan.version the response was priced with.
+    :return: The headers to add to the response.
+    """
+    return {SETTINGS_VERSION_HEADER: str(version)}
+
+
+def read_quote_options(scope: dict) -> tuple[str | None, bool]:
+    """
+    Read the Content-Type of a quote request and whether it asks for a fee breakdown.
+
+    A breakdown is asked for with the breakdown query parameter or the X-Fee-Breakdown header set
+    to a true value. The raw headers are scanned once for both, which costs less than the one
+    Content-Type lookup through request.headers it replaces, so quotes without a breakdown pay
+    nothing for the option.
+
+    :param scope: The ASGI scope of the request.
+    :return: The Content-Type, None if missing, and whether a breakdown is asked for.
+    """
+    content_type = None
+    breakdown = False
+    for name, value in scope["headers"]:
+        if name == b"content-type":
+            content_type = value.decode("latin-1")
+        elif name == RAW_BREAKDOWN_HEADER:
+            breakdown = value.decode("latin-1").lower() in TRUE_VALUES
+    query_string = scope["query_string"]
+    if query_string:
+        for name, value in parse_qsl(query_string.decode("latin-1")):
+            if name == BREAKDOWN_PARAMETER:
+                breakdown = value.lower() in TRUE_VALUES
+    return content_type, breakdown
+
 
 router = APIRouter(prefix="/delivery-fee-calculator", tags=["Delivery Fee Calculator"])
 
@@ -12,7 +80,10 @@ router = APIRouter(prefix="/delivery-fee-calculator", tags=["Delivery Fee Calcul
     summary="Calculates the delivery fee based on the information in the request payload (JSON)",
     description="""
         The delivery price depends on the cart value, the number of items in the cart, 
-        the time of the order, and the delivery distance.
+        the time of the order, and the delivery distance. With ?breakdown=true or an
+        X-Fee-Breakdown: true header, the response also holds the cart, distance and item
+        fees, the rush and surge multipliers, the zone and the rules that fired under
+        "breakdown" (DeliveryFeeCalculatorBreakdownOutputSchema).
 
             :param data: 
                 DeliveryFeeCalculatorInputSchema: The JSON request payload
@@ -20,15 +91,327 @@ router = APIRouter(prefix="/delivery-fee-calculator", tags=["Delivery Fee Calcul
             :return:
                 DeliveryFeeCalculatorOutputSchema: The response JSON data 
     """,
+    response_model=DeliveryFeeCalculatorOutputSchema,
+    # The body is read and validated by validate_quote_request rather than by FastAPI, so the
+    # request body and the 422 response are documented by hand, as FastAPI would generate them.
+    responses={
+        422: {
+            "description": "Validation Error",
+            "content": {
+                "application/json": {
+                    "schema": {"$ref": "#/components/schemas/HTTPValidationError"}
+                }
+            },
+        }
+    },
+    openapi_extra={
+        "parameters": [
+            {
+                "name": BREAKDOWN_PARAMETER,
+                "in": "query",
+                "required": False,
+                "description": "Include the breakdown of the fee in the response.",
+                "schema": {"type": "boolean", "default": False},
+            },
+            {
+                "name": BREAKDOWN_HEADER,
+                "in": "header",
+                "required": False,
+                "description": "Include the breakdown of the fee in the response.",
+                "schema": {"type": "boolean", "default": False},
+            },
+        ],
+        "requestBody": {
+            "content": {
+                "application/json": {
+                    "schema": {"$ref": "#/components/schemas/DeliveryFeeCalculatorInputSchema"}
+                }
+            },
+            "required": True,
+        },
+    },
 )
 async def calculate_delivery_fee_endpoint(
-    data: DeliveryFeeCalculatorInputSchema,
-) -> DeliveryFeeCalculatorOutputSchema:
+    request: Request,
+    calculator: DeliveryFeeCalculator = Depends(get_fee_calculator),
+) -> Response:
+    # The hot path: orjson and a precompiled validator instead of FastAPI's body model, and a
+    # pre-rendered body instead of response_model serialization. Same validation, same errors.
+    content_type, breakdown = read_quote_options(request.scope)
+    data = validate_quote_request(await request.body(), content_type)
     try:
-        calculator = DeliveryFeeCalculator()
-        fee = calculator.calculate_delivery_fee(
-            data.cart_value, data.delivery_distance, data.number_of_items, data.time
+        delivery_distance = resolve_delivery_distance(
+            data["delivery_distance"],
+            data["venue_id"],
+            data["venue_location"],
+            data["customer_location"],
+            get_venue_index(),
+        )
+        customer_location = data["customer_location"]
+        zone = (
+            None
+            if customer_location is None
+            else get_zone_index().lookup(customer_location.lon, customer_location.lat)
+        )
+        surge = surge_meter.record()
+        version = calculator.plan.version
+        if breakdown:
+            # Asked for by support tooling rather than checkout, so priced every time, never cached.
+            body = encode_breakdown(
+                calculator.calculate_delivery_fee_breakdown(
+                    data["cart_value"],
+                    delivery_distance,
+                    data["number_of_items"],
+                    data["time"],
+                    zone=zone,
+                    surge=surge,
+                )
+            )
+        else:
+            stage_times = [] if stage_sampler.should_sample() else None
+            key = quote_key(
+                data["cart_value"],
+                delivery_distance,
+                data["number_of_items"],
+                data["time"],
+                stage_times,
+                zone,
+                surge,
+            )
+            body = None if key is None else quote_cache.get(key, version)
+            if body is None:
+
+                def price() -> bytes:
+                    fee = calculator.calculate_delivery_fee(
+                        data["cart_value"],
+                        delivery_distance,
+                        data["number_of_items"],
+                        data["time"],
+                        stage_times=stage_times,
+                        zone=zone,
+                        surge=surge,
+                    )
+                    body = encode_quote(fee)
+                    if key is not None:
+                        quote_cache.put(key, version, body)
+                    return body
+
+                # Identical quotes priced concurrently share one computation and one body. A
+                # sampled request times its own stages, so it never joins another request's
+                # computation.
+                if key is None or stage_times is not None:
+                    body = price()
+                else:
+                    body = await quote_flights.run((key, version), price)
+            if stage_times is not None:
+                stage_sampler.record(stage_times)
+        if quote_log.active:
+            record = (
+                time.time(),
+                version,
+                data["cart_value"],
+                delivery_distance,
+                data["number_of_items"],
+                data["time"],
+                None if zone is None else zone.id,
+                surge,
+                body,
+            )
+            if not quote_log.offer(record):
+                await quote_log.put(record)
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers=version_headers(version),
         )
-        return DeliveryFeeCalculatorOutputSchema(delivery_fee=fee)
-    except Exception as error:
+    except (TypeError, ValueError) as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+
+@router.get(
+    "/cache",
+    summary="Get the fee quote cache statistics",
+    description="Hit and miss counters, size and limits of the in-process fee quote cache.",
+    response_model=QuoteCacheStatsSchema,
+)
+async def get_quote_cache_stats() -> QuoteCacheStatsSchema:
+    return QuoteCacheStatsSchema(**quote_cache.stats())
+
+
+@router.post(
+    "/batch",
+    summary="Calculates the delivery fees of many carts in a single request",
+    description="""
+        Accepts either a JSON array of carts or an NDJSON body
+        (Content-Type: application/x-ndjson) with one cart per line.
+        Fees are returned in input order; a cart that fails validation or
+        pricing gets an error entry instead of failing the whole batch.
+
+            :param request:
+                A list of DeliveryFeeCalculatorInputSchema payloads
+
+            :return:
+                DeliveryFeeCalculatorBatchOutputSchema: The response JSON data
+    """,
+    response_model=DeliveryFeeCalculatorBatchOutputSchema,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {
+                            "$ref": "#/components/schemas/DeliveryFeeCalculatorInputSchema"
+                        },
+                    }
+                },
+                "application/x-ndjson": {
+                    "schema": {
+                        "type": "string",
+                        "description": "One DeliveryFeeCalculatorInputSchema object per line.",
+                    }
+                },
+            },
+        }
+    },
+)
+async def calculate_delivery_fee_batch_endpoint(
+    request: Request,
+    calculator: DeliveryFeeCalculator = Depends(get_fee_calculator),
+) -> Response:
+    try:
+        items = parse_batch_body(
+            await request.body(), request.headers.get("content-type", "")
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+    max_batch_size = calculator.settings.MAX_BATCH_SIZE
+    if len(items) > max_batch_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch size {len(items)} exceeds the limit of {max_batch_size}",
+        )
+
+    output = DeliveryFeeCalculatorBatchOutputSchema(
+        results=quote_batch(calculator, items)
+    )
+    # The results are already validated models, so skip FastAPI's re-validation
+    # and jsonable_encoder pass, which dominate the cost of large batches.
+    return Response(
+        content=output.model_dump_json(),
+        media_type="application/json",
+        headers=version_headers(calculator.plan.version),
+    )
+
+
+@router.post(
+    "/stream",
+    summary="Streams the delivery fees of an NDJSON stream of carts",
+    description="""
+        Accepts a chunked NDJSON body (Content-Type: application/x-ndjson) with one cart
+        per line and streams back one NDJSON result line per cart, in input order, as
+        the carts are priced in fixed-size chunks. Memory use stays constant however
+        large the input is. The last line is {"summary": {...}} with the row count,
+        error count and throughput in rows per second.
+
+            :param request:
+                DeliveryFeeCalculatorInputSchema payloads, one per line
+
+            :return:
+                DeliveryFeeCalculatorBatchItemSchema lines followed by a
+                DeliveryFeeCalculatorStreamTrailerSchema line
+    """,
+    response_class=RequestStreamingResponse,
+    responses={
+        200: {
+            "content": {
+                "application/x-ndjson": {
+                    "schema": {
+                        "type": "string",
+                        "description": "One DeliveryFeeCalculatorBatchItemSchema object per line, "
+                        "then a DeliveryFeeCalculatorStreamTrailerSchema object.",
+                    }
+                }
+            }
+        }
+    },
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {
+                    "schema": {
+                        "type": "string",
+                        "description": "One DeliveryFeeCalculatorInputSchema object per line.",
+                    }
+                }
+            },
+        }
+    },
+)
+async def stream_delivery_fees_endpoint(
+    request: Request,
+    calculator: DeliveryFeeCalculator = Depends(get_fee_calculator),
+) -> RequestStreamingResponse:
+    settings = calculator.settings
+    return RequestStreamingResponse(
+        stream_quotes(
+            calculator,
+            request.stream(),
+            settings.STREAM_CHUNK_SIZE,
+            settings.STREAM_MAX_LINE_BYTES,
+        ),
+        media_type="application/x-ndjson",
+        headers=version_headers(calculator.plan.version),
+    )
+
+
+@router.post(
+    "/simulate",
+    summary="Compares the delivery fees of a set of orders under alternative settings",
+    description="""
+        Reprices every order under the active settings and under each variant,
+        a set of settings overrides such as {"DISTANCE_SURCHARGE": 120}, and
+        returns the total, mean, percentiles and capped share of the fees for
+        each. Orders with an invalid delivery time or an unknown venue are left
+        out and counted.
+
+            :param data:
+                DeliveryFeeCalculatorSimulationInputSchema: The orders and variants
+
+            :return:
+                DeliveryFeeCalculatorSimulationOutputSchema: The response JSON data
+    """,
+    response_model=DeliveryFeeCalculatorSimulationOutputSchema,
+)
+async def simulate_delivery_fees_endpoint(
+    data: DeliveryFeeCalculatorSimulationInputSchema,
+    calculator: DeliveryFeeCalculator = Depends(get_fee_calculator),
+) -> Response:
+    settings = calculator.settings
+    if len(data.orders) > settings.SIMULATION_MAX_ORDERS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{len(data.orders)} orders exceed the limit of {settings.SIMULATION_MAX_ORDERS}",
+        )
+    if len(data.variants) > settings.SIMULATION_MAX_VARIANTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{len(data.variants)} variants exceed the limit of {settings.SIMULATION_MAX_VARIANTS}",
+        )
+
+    # NumPy is only imported by the first simulation, so it stays off the application's startup.
+    from .simulation import simulate
+
+    try:
+        # Pricing a large dataset takes a while; keep the event loop serving other requests.
+        output = await asyncio.to_thread(simulate, settings, data.orders, data.variants)
+    except ValueError as error:
         raise HTTPException(status_code=400, detail=str(error))
+    return Response(
+        content=DeliveryFeeCalculatorSimulationOutputSchema(**output).model_dump_json(),
+        media_type="application/json",
+        headers=version_headers(calculator.plan.version),
+    )
@@ -1,16 +1,51 @@
 from datetime import datetime
 
 from app.api.schemas import BaseAPISchema
-from pydantic import Field
+from pydantic import Field, model_validator
+
+
+class GeoPointSchema(BaseAPISchema):
+    lat: float = Field(..., ge=-90, le=90, description="Latitude in degrees (WGS 84).", example=60.17012)
+    lon: float = Field(..., ge=-180, le=180, description="Longitude in degrees (WGS 84).", example=24.92813)
+
+
+def check_distance_source(
+    delivery_distance: int | None,
+    venue_id: str | None,
+    venue_location: GeoPointSchema | None,
+    customer_location: GeoPointSchema | None,
+) -> None:
+    """
+    Check that a quote gives its delivery distance in exactly one way.
+
+    Rules:
+    - Either delivery_distance is given, and no coordinates or venue,
+    - or customer_location is given with exactly one of venue_id and venue_location.
+
+    :param delivery_distance: The delivery distance in meters.
+    :param venue_id: The venue the order is delivered from.
+    :param venue_location: The coordinates of the venue.
+    :param customer_location: The coordinates of the delivery address.
+    :raises ValueError: If the distance is missing, ambiguous, or given twice.
+    """
+    if delivery_distance is not None:
+        if venue_id is not None or venue_location is not None or customer_location is not None:
+            raise ValueError("delivery_distance cannot be combined with venue or customer coordinates")
+        return
+    if customer_location is None or (venue_id is None) == (venue_location is None):
+        raise ValueError(
+            "Either delivery_distance, or customer_location with one of venue_id and venue_location, is required"
+        )
 
 
 class DeliveryFeeCalculatorInputSchema(BaseAPISchema):
     cart_value: int = Field(
         ..., description="Value of the shopping cart in cents.", example=790
     )
-    delivery_distance: int = Field(
-        ...,
-        description="The distance between the store and customer’s location in meters.",
+    delivery_distance: int | None = Field(
+        None,
+        description="The distance between the store and customer’s location in meters. "
+        "Omit it to have the distance computed from customer_location and the venue.",
         example=2235,
     )
     number_of_items: int = Field(
@@ -23,6 +58,28 @@ class DeliveryFeeCalculatorInputSchema(BaseAPISchema):
         description="Order time in UTC in ISO format.",
         example="2024-01-15T13:00:00Z",
     )
+    venue_id: str | None = Field(
+        None,
+        description="Venue the order is delivered from, as listed in the VENUES_FILE.",
+        example=None,
+    )
+    venue_location: GeoPointSchema | None = Field(
+        None,
+        description="Coordinates of the venue, instead of venue_id.",
+        example=None,
+    )
+    customer_location: GeoPointSchema | None = Field(
+        None,
+        description="Coordinates of the delivery address, instead of delivery_distance.",
+        example=None,
+    )
+
+    @model_validator(mode="after")
+    def check_distance(self) -> "DeliveryFeeCalculatorInputSchema":
+        check_distance_source(
+            self.delivery_distance, self.venue_id, self.venue_location, self.customer_location
+        )
+        return self
 
 
 class  DeliveryFeeCalculatorOutputSchema(BaseAPISchema):
@@ -31,3 +88,150 @@ class  DeliveryFeeCalculatorOutputSchema(BaseAPISchema):
         description="Calculated delivery fee in cents.",
         example=710,
     )
+
+
+class DeliveryFeeBreakdownSchema(BaseAPISchema):
+    cart_fee: int = Field(..., description="Small order surcharge in cents.", example=210)
+    distance_fee: int = Field(..., description="Distance fee in cents.", example=500)
+    item_fee: int = Field(..., description="Item and bulk fees in cents.", example=0)
+    base_fee: int = Field(
+        ..., description="Sum of the cart, distance and item fees in cents.", example=710
+    )
+    rush_multiplier: float = Field(
+        ..., description="Rush multiplier of the delivery hour, 1.0 outside rush windows.", example=1.2
+    )
+    surge_multiplier: float = Field(
+        ..., description="Surge multiplier applied on top of the rush multiplier.", example=1.0
+    )
+    zone: str | None = Field(
+        ..., description="Delivery zone whose distance pricing applied, null outside every zone.", example=None
+    )
+    rules: list[str] = Field(
+        ...,
+        description="Rules that fired: free_delivery, small_order_surcharge, item_surcharge, "
+        "bulk_item_fee, zone_pricing, rush_hour, surge and max_delivery_fee.",
+        example=["small_order_surcharge", "rush_hour"],
+    )
+
+
+class DeliveryFeeCalculatorBreakdownOutputSchema(DeliveryFeeCalculatorOutputSchema):
+    breakdown: DeliveryFeeBreakdownSchema = Field(
+        ..., description="Components of the delivery fee and the rules that fired."
+    )
+
+
+class DeliveryFeeCalculatorBatchItemSchema(BaseAPISchema):
+    delivery_fee: int | None = Field(
+        None,
+        description="Calculated delivery fee in cents, absent if the item failed.",
+        example=710,
+    )
+    error: str | None = Field(
+        None,
+        description="Reason the item could not be priced, absent on success.",
+        example=None,
+    )
+
+
+class DeliveryFeeCalculatorBatchOutputSchema(BaseAPISchema):
+    results: list[DeliveryFeeCalculatorBatchItemSchema] = Field(
+        ...,
+        description="One result per input cart, in request order.",
+    )
+
+
+class QuoteCacheStatsSchema(BaseAPISchema):
+    hits: int = Field(..., description="Lookups answered from the cache.", example=9120)
+    misses: int = Field(..., description="Lookups that had to compute the fee.", example=880)
+    evictions: int = Field(
+        ..., description="Entries dropped to respect the size limit.", example=0
+    )
+    expirations: int = Field(
+        ..., description="Entries dropped because their TTL elapsed.", example=42
+    )
+    size: int = Field(..., description="Entries currently cached.", example=838)
+    max_size: int = Field(..., description="Maximum number of entries.", example=10000)
+    ttl_seconds: float = Field(
+        ..., description="Seconds an entry stays valid.", example=60.0
+    )
+    version: int | None = Field(
+        ..., description="Settings version of the cached entries.", example=3735928559
+    )
+
+
+class DeliveryFeeCalculatorStreamSummarySchema(BaseAPISchema):
+    rows: int = Field(..., description="Carts read from the request body.", example=1000000)
+    errors: int = Field(..., description="Carts that could not be priced.", example=12)
+    elapsed_seconds: float = Field(
+        ..., description="Seconds from the first byte read to the last result.", example=21.7
+    )
+    rows_per_second: float = Field(
+        ..., description="Throughput of the stream.", example=46082.9
+    )
+    error: str | None = Field(
+        None,
+        description="Reason the stream stopped early, absent if all input was read.",
+        example=None,
+    )
+
+
+class DeliveryFeeCalculatorStreamTrailerSchema(BaseAPISchema):
+    summary: DeliveryFeeCalculatorStreamSummarySchema = Field(
+        ..., description="Trailing line of the result stream."
+    )
+
+
+class DeliveryFeeCalculatorSimulationVariantSchema(BaseAPISchema):
+    name: str = Field(..., description="Label of the variant in the results.", example="surcharge_120")
+    overrides: dict[str, int | float | str] = Field(
+        ...,
+        description="Settings to change from the active ones, by setting name.",
+        example={"DISTANCE_SURCHARGE": 120, "FRIDAY_RUSH_MULTIPLIER": 1.3},
+    )
+
+
+class DeliveryFeeCalculatorSimulationInputSchema(BaseAPISchema):
+    orders: list[DeliveryFeeCalculatorInputSchema] = Field(
+        ..., description="The orders to reprice under every variant."
+    )
+    variants: list[DeliveryFeeCalculatorSimulationVariantSchema] = Field(
+        ..., description="The settings variants to compare with the active settings."
+    )
+
+
+class DeliveryFeeCalculatorSimulationStatisticsSchema(BaseAPISchema):
+    total_fees: float = Field(..., description="Sum of the delivery fees in cents.", example=712340.0)
+    mean_fee: float = Field(..., description="Mean delivery fee in cents.", example=712.34)
+    percentiles: dict[str, float] = Field(
+        ...,
+        description="Delivery fee percentiles in cents, keyed p50, p90, p95 and p99.",
+        example={"p50": 700.0, "p90": 1100.0, "p95": 1300.0, "p99": 1500.0},
+    )
+    capped_share: float = Field(
+        ..., description="Share of the orders whose fee is capped at MAX_DELIVERY_FEE.", example=0.013
+    )
+
+
+class DeliveryFeeCalculatorSimulationResultSchema(BaseAPISchema):
+    name: str = Field(..., description="Label of the variant.", example="surcharge_120")
+    overrides: dict[str, int | float | str] = Field(
+        ..., description="Settings changed by the variant.", example={"DISTANCE_SURCHARGE": 120}
+    )
+    statistics: DeliveryFeeCalculatorSimulationStatisticsSchema = Field(
+        ..., description="Fee statistics of the orders under the variant."
+    )
+
+
+class DeliveryFeeCalculatorSimulationOutputSchema(BaseAPISchema):
+    orders: int = Field(..., description="Orders priced under every variant.", example=1000)
+    errors: int = Field(
+        ...,
+        description="Orders left out because their delivery time is invalid or their venue unknown.",
+        example=0,
+    )
+    baseline: DeliveryFeeCalculatorSimulationStatisticsSchema = Field(
+        ..., description="Fee statistics of the orders under the active settings."
+    )
+    variants: list[DeliveryFeeCalculatorSimulationResultSchema] = Field(
+        ..., description="Fee statistics under each variant, in request order."
+    )
@@ -0,0 +1,116 @@
+import time
+from typing import AsyncIterator
+
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from .batch import quote_batch
+from .helpers import DeliveryFeeCalculator
+from .schemas import (DeliveryFeeCalculatorStreamSummarySchema,
+                      DeliveryFeeCalculatorStreamTrailerSchema)
+
+
+async def iter_ndjson_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int
+) -> AsyncIterator[bytes]:
+    """
+    Split a chunked body into its non-blank lines as the chunks arrive.
+
+    Only the current partial line is kept in memory, so memory use is bounded by
+    max_line_bytes no matter how large the body is.
+
+    :param chunks: The request body chunks.
+    :param max_line_bytes: The longest line accepted.
+    :return: An async iterator of lines without their newline.
+    :raises ValueError: If a line is longer than max_line_bytes.
+    """
+    pending = b""
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if len(line) > max_line_bytes:
+                raise ValueError(f"NDJSON line exceeds {max_line_bytes} bytes")
+            if line.strip():
+                yield line
+        if len(pending) > max_line_bytes:
+            raise ValueError(f"NDJSON line exceeds {max_line_bytes} bytes")
+    if pending.strip():
+        yield pending
+
+
+async def stream_quotes(
+    calculator: DeliveryFeeCalculator,
+    chunks: AsyncIterator[bytes],
+    chunk_size: int,
+    max_line_bytes: int,
+) -> AsyncIterator[bytes]:
+    """
+    Price an NDJSON stream of carts chunk by chunk, yielding NDJSON results as they are ready.
+
+    Rules:
+    - Carts are priced in chunks of chunk_size, each chunk emitted as soon as it is priced,
+      one result line per input line and in input order.
+    - The body is only read as fast as the results are consumed, which gives backpressure:
+      a slow client slows down reading of its own upload.
+    - A trailing line {"summary": {...}} reports rows, errors and rows per second, and the
+      reason the stream stopped if the input was malformed.
+
+    :param calculator: The calculator shared by the whole stream.
+    :param chunks: The request body chunks.
+    :param chunk_size: Carts priced per chunk.
+    :param max_line_bytes: The longest NDJSON line accepted.
+    :return: An async iterator of NDJSON encoded result chunks.
+    """
+    rows = errors = 0
+    stream_error = None
+    start = time.perf_counter()
+    pending: list[bytes] = []
+
+    def render(lines: list[bytes]) -> bytes:
+        nonlocal rows, errors
+        results = quote_batch(calculator, lines)
+        rows += len(results)
+        errors += sum(result.error is not None for result in results)
+        return b"".join(result.model_dump_json().encode() + b"\n" for result in results)
+
+    try:
+        async for line in iter_ndjson_lines(chunks, max_line_bytes):
+            pending.append(line)
+            if len(pending) >= chunk_size:
+                yield render(pending)
+                pending = []
+    except ValueError as error:
+        stream_error = str(error)
+    if pending:
+        yield render(pending)
+
+    elapsed = time.perf_counter() - start
+    trailer = DeliveryFeeCalculatorStreamTrailerSchema(
+        summary=DeliveryFeeCalculatorStreamSummarySchema(
+            rows=rows,
+            errors=errors,
+            elapsed_seconds=elapsed,
+            rows_per_second=rows / elapsed if elapsed > 0 else 0.0,
+            error=stream_error,
+        )
+    )
+    yield trailer.model_dump_json().encode() + b"\n"
+
+
+class RequestStreamingResponse(StreamingResponse):
+    """
+    A StreamingResponse whose body is produced while the request body is still being read.
+
+    StreamingResponse listens for the client disconnecting by reading from the same receive
+    channel as Request.stream(), which would swallow the request body. Here only the body
+    iterator reads from it; a disconnect surfaces as ClientDisconnect from Request.stream()
+    or as a failed send, and ends the response either way.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,132 @@
+import time
+from typing import Callable
+
+from app.config.settings import Settings
+
+
+class SurgeMeter:
+    """
+    Turns the recent quote volume of the worker into a surge multiplier.
+
+    The quotes of the current second are counted in a plain integer. When the second changes,
+    the count is written to a ring buffer of one-second buckets covering the window, the bucket
+    it overwrites leaves the running total of the window, and the multiplier is recomputed.
+    Recording a quote therefore costs a clock read, a comparison and an increment, and the ring
+    is touched once per second whatever the load.
+
+    The multiplier is the quote rate over the window divided by the threshold once the rate
+    exceeds it, capped at max_multiplier and rounded to hundredths, so quotes within the same
+    second share it and the quote cache keeps hitting under a steady load.
+
+    Attributes:
+    - threshold: Quotes per second above which fees surge, 0 disables the meter.
+    - max_multiplier: Largest multiplier.
+    - window: Seconds of volume the rate is computed over.
+    - multiplier: The surge multiplier, 1.0 below the threshold.
+    - rate: Quotes per second over the last full window.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.0,
+        max_multiplier: float = 2.0,
+        window: int = 60,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize a meter with no recorded quotes.
+
+        :param threshold: Quotes per second above which fees surge, 0 disables the meter.
+        :param max_multiplier: Largest multiplier.
+        :param window: Seconds of volume the rate is computed over.
+        :param clock: Monotonic clock in seconds, replaceable in tests.
+        """
+        self.clock = clock
+        self.threshold = threshold
+        self.max_multiplier = max_multiplier
+        self.multiplier = 1.0
+        self.rate = 0.0
+        self._reset(window)
+
+    def _reset(self, window: int) -> None:
+        """Forget every recorded quote and start a window of the given size."""
+        self.window = window
+        self._buckets = [0] * window
+        self._total = 0
+        self._current = 0
+        self._second = int(self.clock())
+        self._next_second = self._second + 1
+
+    def configure(self, settings: Settings) -> None:
+        """
+        Apply the surge settings. A new window size, or disabling the meter, starts counting
+        from scratch.
+
+        :param settings: The settings to apply.
+        """
+        self.threshold = settings.SURGE_ORDER_RATE_THRESHOLD
+        self.max_multiplier = settings.SURGE_MAX_MULTIPLIER
+        if settings.SURGE_WINDOW_SECONDS != self.window or self.threshold <= 0:
+            self._reset(settings.SURGE_WINDOW_SECONDS)
+        self._update()
+
+    def record(self, count: int = 1) -> float:
+        """
+        Count quotes and return the multiplier they are priced with.
+
+        :param count: The number of quotes.
+        :return: The surge multiplier, always 1.0 while the meter is disabled.
+        """
+        if self.threshold <= 0:
+            return 1.0
+        now = self.clock()
+        if now >= self._next_second:
+            self._advance(int(now))
+        self._current += count
+        return self.multiplier
+
+    def _advance(self, second: int) -> None:
+        """Close the current second and move the window to a new one."""
+        buckets = self._buckets
+        window = self.window
+        if second - self._second > window:
+            # Not a single quote in the whole window.
+            buckets[:] = [0] * window
+            self._total = 0
+        else:
+            # The bucket of each closed second held the second a window earlier, which leaves
+            # the window; the closed seconds after the current one had no quotes.
+            index = self._second % window
+            self._total += self._current - buckets[index]
+            buckets[index] = self._current
+            for skipped in range(self._second + 1, second):
+                index = skipped % window
+                self._total -= buckets[index]
+                buckets[index] = 0
+        self._current = 0
+        self._second = second
+        self._next_second = second + 1
+        self._update()
+
+    def _update(self) -> None:
+        """Recompute the rate and multiplier from the total of the last full window."""
+        self.rate = self._total / self.window
+        if self.threshold > 0 and self.rate > self.threshold:
+            self.multiplier = round(min(self.rate / self.threshold, self.max_multiplier), 2)
+        else:
+            self.multiplier = 1.0
+
+
+def surge_metrics() -> list[tuple[str, str, str, float]]:
+    """
+    Report the surge state as metrics, see MetricsRegistry.add_collector.
+
+    :return: (name, kind, documentation, value) tuples.
+    """
+    return [
+        ("quote_surge_multiplier", "gauge", "Surge multiplier applied to fee quotes.", surge_meter.multiplier),
+        ("quote_rate_per_second", "gauge", "Fee quotes per second over the surge window.", surge_meter.rate),
+    ]
+
+
+surge_meter = SurgeMeter()
@@ -0,0 +1,94 @@
+from datetime import date, datetime, timezone
+from functools import lru_cache
+
+# Distinct hours kept by the hour-bucket cache, about half a year of traffic.
+HOUR_BUCKET_CACHE_SIZE = 4096
+
+
+def _invalid_delivery_time(delivery_time) -> ValueError:
+    """Build the error raised for a delivery time that cannot be parsed."""
+    return ValueError(
+        f"Invalid delivery time {delivery_time!r}, "
+        "expected an ISO 8601 timestamp such as 2024-01-15T13:00:00Z"
+    )
+
+
+@lru_cache(maxsize=HOUR_BUCKET_CACHE_SIZE)
+def weekday_and_hour_of_bucket(hour_bucket: str) -> tuple[int, int]:
+    """
+    Resolve an hour-truncated timestamp ("YYYY-MM-DDTHH") to its weekday and hour.
+
+    Most requests in a given minute share their hour bucket, so the calendar work is cached.
+
+    :param hour_bucket: The first 13 characters of a fixed-width ISO timestamp.
+    :return: The ISO weekday (1 = Monday) and the hour.
+    :raises ValueError: If the bucket is not a valid date and hour.
+    """
+    if not (
+        hour_bucket[:4].isdigit()
+        and hour_bucket[4] == "-"
+        and hour_bucket[5:7].isdigit()
+        and hour_bucket[7] == "-"
+        and hour_bucket[8:10].isdigit()
+        and hour_bucket[10] == "T"
+        and hour_bucket[11:13].isdigit()
+    ):
+        raise _invalid_delivery_time(hour_bucket)
+    utc_hour = int(hour_bucket[11:13])
+    if utc_hour > 23:
+        raise _invalid_delivery_time(hour_bucket)
+    try:
+        day = date(int(hour_bucket[:4]), int(hour_bucket[5:7]), int(hour_bucket[8:10]))
+    except ValueError:
+        raise _invalid_delivery_time(hour_bucket) from None
+    return day.isoweekday(), utc_hour
+
+
+def parse_weekday_and_hour(delivery_time: str | datetime) -> tuple[int, int]:
+    """
+    Extract the ISO weekday and UTC hour of a delivery time.
+
+    Rules:
+    - The fixed-width layout "YYYY-MM-DDTHH:MM:SSZ" is read directly by position, and its
+      date and hour are resolved through the hour-bucket cache.
+    - Any other ISO 8601 string, with a "Z" or a UTC offset, is parsed with
+      datetime.fromisoformat and converted to UTC.
+    - datetime objects are converted to UTC; naive ones are taken to already be in UTC.
+
+    :param delivery_time: The delivery time as an ISO string or a datetime.
+    :return: The ISO weekday (1 = Monday) and the UTC hour.
+    :raises ValueError: If the delivery time is not a valid ISO 8601 timestamp.
+    """
+    if isinstance(delivery_time, str):
+        if (
+            len(delivery_time) == 20
+            and delivery_time[19] == "Z"
+            and delivery_time[10] == "T"
+            and delivery_time[13] == ":"
+            and delivery_time[16] == ":"
+            and delivery_time.isascii()
+            and delivery_time[14:16].isdigit()
+            and delivery_time[17:19].isdigit()
+            and delivery_time[14:16] < "60"
+            and delivery_time[17:19] < "62"
+        ):
+            try:
+                return weekday_and_hour_of_bucket(delivery_time[:13])
+            except ValueError:
+                raise _invalid_delivery_time(delivery_time) from None
+        iso_time = delivery_time
+        if iso_time.endswith(("Z", "z")):
+            # datetime.fromisoformat only understands "Z" from Python 3.11 on.
+            iso_time = iso_time[:-1] + "+00:00"
+        try:
+            date_time = datetime.fromisoformat(iso_time)
+        except ValueError:
+            raise _invalid_delivery_time(delivery_time) from None
+    elif isinstance(delivery_time, datetime):
+        date_time = delivery_time
+    else:
+        raise _invalid_delivery_time(delivery_time)
+
+    if date_time.tzinfo is not None:
+        date_time = date_time.astimezone(timezone.utc)
+    return date_time.isoweekday(), date_time.hour
@@ -0,0 +1,313 @@
+import json
+import math
+import zlib
+from pathlib import Path
+from typing import Sequence
+
+# Bounds of the number of grid cells along each side of a ZoneIndex.
+MIN_GRID_SIDE = 16
+MAX_GRID_SIDE = 1024
+
+Edge = tuple[float, float, float, float]
+
+
+class Zone:
+    """
+    A delivery zone: an area of the map priced with its own distance fee.
+
+    The area is a set of rings, the outer rings and holes of one or more polygons, and a point
+    is inside when a ray from it crosses the rings an odd number of times. Coordinates are
+    (longitude, latitude) degrees, as in GeoJSON, treated as planar, which is exact enough at
+    city scale.
+
+    Attributes:
+    - id: The zone ID.
+    - base_fee: Distance fee in cents before the first interval.
+    - distance_surcharge: Fee in cents added for every started distance interval.
+    - distance_interval: Length of a distance interval in meters.
+    - edges: The (x1, y1, x2, y2) segments of every ring.
+    - bbox: The (min_x, min_y, max_x, max_y) bounding box.
+    - fingerprint: A checksum of the zone's ID, pricing and edges, equal in every process for
+      identical zones, which the repr and so the shared quote cache keys rely on.
+    """
+
+    __slots__ = (
+        "id",
+        "base_fee",
+        "distance_surcharge",
+        "distance_interval",
+        "edges",
+        "bbox",
+        "fingerprint",
+    )
+
+    def __init__(
+        self,
+        zone_id: str,
+        rings: Sequence[Sequence[Sequence[float]]],
+        base_fee: int,
+        distance_surcharge: int,
+        distance_interval: int = 500,
+    ):
+        """
+        Build a zone.
+
+        :param zone_id: The zone ID.
+        :param rings: The rings of the area, each a sequence of (longitude, latitude) points.
+        :param base_fee: Distance fee in cents before the first interval.
+        :param distance_surcharge: Fee in cents added for every started distance interval.
+        :param distance_interval: Length of a distance interval in meters.
+        :raises ValueError: If a ring has fewer than three points or the interval is not positive.
+        """
+        if distance_interval <= 0:
+            raise ValueError(f"Zone '{zone_id}' needs a positive distance_interval")
+        self.id = zone_id
+        self.base_fee = base_fee
+        self.distance_surcharge = distance_surcharge
+        self.distance_interval = distance_interval
+        edges = []
+        for ring in rings:
+            points = [(float(point[0]), float(point[1])) for point in ring]
+            if len(points) < 3:
+                raise ValueError(f"Zone '{zone_id}' has a ring with fewer than 3 points")
+            # Rings may or may not repeat their first point at the end; close them either way.
+            for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]):
+                if (x1, y1) != (x2, y2):
+                    edges.append((x1, y1, x2, y2))
+        if not edges:
+            raise ValueError(f"Zone '{zone_id}' has no area")
+        self.edges = edges
+        xs = [edge[0] for edge in edges]
+        ys = [edge[1] for edge in edges]
+        self.bbox = (min(xs), min(ys), max(xs), max(ys))
+        self.fingerprint = zlib.crc32(
+            repr((zone_id, base_fee, distance_surcharge, distance_interval, edges)).encode()
+        )
+
+    def __repr__(self) -> str:
+        return f"Zone({self.id!r}, {self.fingerprint})"
+
+    def distance_fee(self, delivery_distance: int) -> int:
+        """
+        Compute the distance fee inside the zone.
+
+        Rules:
+        - The base fee, plus one distance surcharge for every started distance interval.
+
+        :param delivery_distance: The delivery distance in meters.
+        :return: The distance fee in cents.
+        """
+        quotient, remainder = divmod(delivery_distance, self.distance_interval)
+        if remainder:
+            quotient += 1
+        return self.base_fee + quotient * self.distance_surcharge
+
+    def contains(self, x: float, y: float) -> bool:
+        """
+        Test whether a point is inside the zone by casting a ray over every edge.
+
+        :param x: The longitude of the point.
+        :param y: The latitude of the point.
+        :return: True if the point is inside.
+        """
+        min_x, min_y, max_x, max_y = self.bbox
+        if not (min_x <= x <= max_x and min_y <= y <= max_y):
+            return False
+        return crosses_odd(self.edges, x, y)
+
+
+def crosses_odd(edges: Sequence[Edge], x: float, y: float) -> bool:
+    """
+    Count the edges a ray from a point towards +x crosses.
+
+    :param edges: The (x1, y1, x2, y2) segments.
+    :param x: The longitude of the point.
+    :param y: The latitude of the point.
+    :return: True if the count is odd, that is if the point is inside the rings.
+    """
+    inside = False
+    for x1, y1, x2, y2 in edges:
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+    return inside
+
+
+class ZoneIndex:
+    """
+    Delivery zones indexed by a uniform grid for point lookups in microseconds.
+
+    The grid covers the bounding box of all zones. Every cell lists, in zone order, the zones
+    that may contain its points:
+    - a zone that covers the whole cell is listed without edges, and answers at once;
+    - a zone whose boundary may cross the cell is listed with the only edges a ray from the cell
+      can cross: those spanning the cell's row and reaching right of its left side;
+    - a zone that only overlaps the cell with its bounding box is left out.
+    A lookup is then one cell computation and a ray cast over a handful of edges, whatever the
+    number of zones and vertices. Where zones overlap, the first one in the file wins.
+
+    Attributes:
+    - zones: The zones, in priority order.
+    - path: The file the zones were loaded from, empty for an empty index.
+    - side: The number of grid cells along each side.
+    """
+
+    def __init__(self, zones: Sequence[Zone] = (), path: str = "", side: int | None = None):
+        """
+        Build the grid of a set of zones.
+
+        :param zones: The zones, in priority order.
+        :param path: The file the zones were loaded from.
+        :param side: The number of grid cells along each side, by default the square root of
+            the number of edges, within MIN_GRID_SIDE and MAX_GRID_SIDE.
+        """
+        self.zones = list(zones)
+        self.path = path
+        edge_count = sum(len(zone.edges) for zone in self.zones)
+        self.side = side or min(max(math.isqrt(edge_count), MIN_GRID_SIDE), MAX_GRID_SIDE)
+        self._cells: list[tuple] = [()] * (self.side * self.side) if self.zones else []
+        if not self.zones:
+            self.min_x = self.min_y = 0.0
+            self.cell_width = self.cell_height = 1.0
+            return
+
+        self.min_x = min(zone.bbox[0] for zone in self.zones)
+        self.min_y = min(zone.bbox[1] for zone in self.zones)
+        max_x = max(zone.bbox[2] for zone in self.zones)
+        max_y = max(zone.bbox[3] for zone in self.zones)
+        # A degenerate extent still needs a cell size; any positive one will do.
+        self.cell_width = (max_x - self.min_x) / self.side or 1.0
+        self.cell_height = (max_y - self.min_y) / self.side or 1.0
+
+        cells: list[list] = [[] for _ in range(self.side * self.side)]
+        for zone in self.zones:
+            self._add(cells, zone)
+        self._cells = [tuple(cell) for cell in cells]
+
+    def _column(self, x: float) -> int:
+        return min(int((x - self.min_x) / self.cell_width), self.side - 1)
+
+    def _row(self, y: float) -> int:
+        return min(int((y - self.min_y) / self.cell_height), self.side - 1)
+
+    def _add(self, cells: list[list], zone: Zone) -> None:
+        """List a zone in the cells it covers or whose boundary it may cross."""
+        min_x, min_y, max_x, max_y = zone.bbox
+        first_column, last_column = self._column(min_x), self._column(max_x)
+        first_row, last_row = self._row(min_y), self._row(max_y)
+
+        # Rows and cells each edge may pass through, judged by its bounding box.
+        band_edges: dict[int, list[Edge]] = {}
+        boundary: set[tuple[int, int]] = set()
+        for edge in zone.edges:
+            x1, y1, x2, y2 = edge
+            columns = range(self._column(min(x1, x2)), self._column(max(x1, x2)) + 1)
+            for row in range(self._row(min(y1, y2)), self._row(max(y1, y2)) + 1):
+                band_edges.setdefault(row, []).append(edge)
+                boundary.update((row, column) for column in columns)
+
+        for row in range(first_row, last_row + 1):
+            edges = band_edges.get(row, [])
+            # Where the row's center line crosses the rings: the cells between an odd and an
+            # even crossing are inside, unless an edge passes through them.
+            y = self.min_y + (row + 0.5) * self.cell_height
+            crossings = sorted(
+                x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+                for x1, y1, x2, y2 in edges
+                if (y1 > y) != (y2 > y)
+            )
+            for column in range(first_column, last_column + 1):
+                left = self.min_x + column * self.cell_width
+                if (row, column) in boundary:
+                    entry = (zone, tuple(edge for edge in edges if max(edge[0], edge[2]) >= left))
+                else:
+                    x = left + 0.5 * self.cell_width
+                    if sum(crossing > x for crossing in crossings) % 2 == 0:
+                        continue
+                    entry = (zone, None)
+                cells[row * self.side + column].append(entry)
+
+    def __len__(self) -> int:
+        return len(self.zones)
+
+    @classmethod
+    def from_file(cls, path: str) -> "ZoneIndex":
+        """
+        Load zones from a GeoJSON FeatureCollection of Polygon and MultiPolygon features.
+
+        Each feature's properties give its "base_fee" and "distance_surcharge" in cents, and
+        optionally its "distance_interval" in meters (500 by default); its "id", or
+        "properties.id", names it. Features are in priority order.
+
+        :param path: The GeoJSON file.
+        :return: The index.
+        :raises ValueError: If the file is malformed.
+        """
+        zones = []
+        try:
+            for position, feature in enumerate(json.loads(Path(path).read_text())["features"]):
+                geometry = feature["geometry"]
+                properties = feature.get("properties") or {}
+                if geometry["type"] == "Polygon":
+                    rings = geometry["coordinates"]
+                elif geometry["type"] == "MultiPolygon":
+                    rings = [ring for polygon in geometry["coordinates"] for ring in polygon]
+                else:
+                    raise ValueError(f"Zone geometries must be polygons, not {geometry['type']}")
+                zones.append(
+                    Zone(
+                        str(feature.get("id", properties.get("id", position))),
+                        rings,
+                        int(properties["base_fee"]),
+                        int(properties["distance_surcharge"]),
+                        int(properties.get("distance_interval", 500)),
+                    )
+                )
+        except (KeyError, IndexError, TypeError) as error:
+            raise ValueError(f"Malformed zones file {path}: {error!r}") from error
+        return cls(zones, path)
+
+    def lookup(self, x: float, y: float) -> Zone | None:
+        """
+        Find the zone containing a point.
+
+        :param x: The longitude of the point.
+        :param y: The latitude of the point.
+        :return: The first zone containing the point, None if it is in no zone.
+        """
+        column = (x - self.min_x) / self.cell_width
+        row = (y - self.min_y) / self.cell_height
+        side = self.side
+        if not (0 <= column <= side and 0 <= row <= side) or not self._cells:
+            return None
+        column = int(column) if column < side else side - 1
+        row = int(row) if row < side else side - 1
+        for zone, edges in self._cells[row * side + column]:
+            if edges is None or crosses_odd(edges, x, y):
+                return zone
+        return None
+
+
+_zone_index = ZoneIndex()
+
+
+def get_zone_index() -> ZoneIndex:
+    """
+    Return the zones loaded from ZONES_FILE.
+
+    :return: The active zone index, empty if no file is configured.
+    """
+    return _zone_index
+
+
+def load_zone_index(path: str) -> ZoneIndex:
+    """
+    Load the zones of a file and make them the active index.
+
+    :param path: The GeoJSON zones file, empty for no zones.
+    :return: The new index.
+    :raises ValueError: If the file is malformed; the active index is kept.
+    :raises OSError: If the file cannot be read; the active index is kept.
+    """
+    global _zone_index
+    _zone_index = ZoneIndex.from_file(path) if path else ZoneIndex()
+    return _zone_index
@@ -0,0 +1,53 @@
+"""Run the benchmark suite.
+
+Usage::
+
+    python -m app.benchmarks --output results.json
+    python -m app.benchmarks --baseline results.json --threshold 0.2
+
+With --baseline the run fails (exit status 1) if any benchmark is slower than the baseline by
+more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+from .suite import compare, run_suite
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.benchmarks", description=__doc__.split("\n")[0])
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2,
+        help="allowed relative slowdown against the baseline (default: 0.2)",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="fewer iterations, for a smoke test"
+    )
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        report = run_suite(micro_number=5_000, requests=200, concurrency_levels=(1, 8))
+    else:
+        report = run_suite()
+
+    for name, measured in report["results"].items():
+        print(f"{name:<48} {measured['value']:>12,.3f} {measured['unit']}")
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(report, json.load(file), args.threshold)
+        if regressions:
+            print("\nRegressions:", *regressions, sep="\n  ")
+            return 1
+        print("\nNo regressions against", args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Measure the per-request overhead of the admission middleware.
+
+The middleware wraps an ASGI app that answers immediately, so the difference with the bare app is
+the cost of admission alone: the overload checks, the token bucket of the client, with rate
+limiting on and a new client every few requests, and the in-flight accounting.
+
+Run with ``python -m app.benchmarks.admission [requests]``.
+"""
+import asyncio
+import sys
+import time
+
+from app.api.admission.middleware import (AdmissionController,
+                                          AdmissionMiddleware)
+from app.config.settings import Settings
+
+# Seconds of admission work per request that test_admission allows.
+ADMISSION_OVERHEAD_BUDGET_SECONDS = 10e-6
+
+CLIENTS = 10_000
+
+
+async def empty_app(scope, receive, send) -> None:
+    pass
+
+
+async def receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message: dict) -> None:
+    pass
+
+
+async def seconds_per_request(app, scopes: list[dict]) -> float:
+    start = time.perf_counter()
+    for scope in scopes:
+        await app(scope, receive, send)
+    return (time.perf_counter() - start) / len(scopes)
+
+
+def overhead(requests: int = 200_000, repeat: int = 5) -> dict[str, float]:
+    """Time the bare app and the admission middleware over the same requests.
+
+    Args:
+        requests (int): Requests per timing run.
+        repeat (int): Timing runs; the fastest of each is kept.
+
+    Returns:
+        dict[str, float]: Seconds per request of the bare app and the middleware, and the
+        overhead of the middleware.
+    """
+    settings = Settings(RATE_LIMIT_PER_SECOND=100, RATE_LIMIT_BURST=1_000, RATE_LIMIT_MAX_CLIENTS=CLIENTS // 2)
+    middleware = AdmissionMiddleware(empty_app, AdmissionController(settings))
+    scopes = [
+        {
+            "type": "http",
+            "path": "/api/v1/delivery-fee-calculator/",
+            "headers": [],
+            "client": (f"10.0.{i // 256 % 256}.{i % 256}", 50000),
+        }
+        for i in range(CLIENTS)
+    ]
+    scopes = [scopes[i % CLIENTS] for i in range(requests)]
+
+    async def measure() -> tuple[float, float]:
+        await seconds_per_request(middleware, scopes[: requests // 10])
+        bare = min([await seconds_per_request(empty_app, scopes) for _ in range(repeat)])
+        admitted = min([await seconds_per_request(middleware, scopes) for _ in range(repeat)])
+        return bare, admitted
+
+    bare, admitted = asyncio.run(measure())
+    return {"bare": bare, "middleware": admitted, "overhead": admitted - bare}
+
+
+def main(requests: int = 200_000) -> None:
+    result = overhead(requests)
+    print(f"bare app:             {result['bare'] * 1e9:>7.0f} ns/request")
+    print(f"admission middleware: {result['middleware'] * 1e9:>7.0f} ns/request")
+    print(
+        f"overhead:             {result['overhead'] * 1e9:>7.0f} ns/request "
+        f"(budget {ADMISSION_OVERHEAD_BUDGET_SECONDS * 1e9:.0f} ns)"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
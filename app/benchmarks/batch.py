@@ -0,0 +1,47 @@
+"""Compare per-cart requests against the batch endpoint.
+
+Run with ``python -m app.benchmarks.batch [batch_size ...]``.
+"""
+import sys
+import time
+
+from app.main import app
+from fastapi.testclient import TestClient
+
+CART = {
+    "cart_value": 790,
+    "delivery_distance": 2235,
+    "number_of_items": 4,
+    "time": "2024-01-15T13:00:00Z",
+}
+
+
+def carts_per_second_single(client: TestClient, count: int) -> float:
+    """Price ``count`` carts with one request per cart."""
+    start = time.perf_counter()
+    for _ in range(count):
+        client.post("/api/v1/delivery-fee-calculator/", json=CART)
+    return count / (time.perf_counter() - start)
+
+
+def carts_per_second_batch(client: TestClient, count: int) -> float:
+    """Price ``count`` carts with a single batch request."""
+    payload = [CART] * count
+    start = time.perf_counter()
+    response = client.post("/api/v1/delivery-fee-calculator/batch", json=payload)
+    elapsed = time.perf_counter() - start
+    assert len(response.json()["results"]) == count
+    return count / elapsed
+
+
+def main(batch_sizes: list[int]) -> None:
+    client = TestClient(app)
+    single = carts_per_second_single(client, 1_000)
+    print(f"single requests: {single:>12,.0f} carts/s")
+    for size in batch_sizes:
+        batch = carts_per_second_batch(client, size)
+        print(f"batch of {size:>7,}: {batch:>12,.0f} carts/s ({batch / single:.1f}x)")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000])
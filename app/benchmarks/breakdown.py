@@ -0,0 +1,106 @@
+"""Measure what the fee breakdown option costs the quotes that do not ask for it.
+
+The only work a compact quote does for the option is read_quote_options, which scans the raw
+headers once for the Content-Type and the X-Fee-Breakdown header; it is compared with the
+request.headers lookup of the Content-Type it replaced. FeePlan.fee and FeePlan.fee_breakdown
+are then timed on the same cart, and compact and breakdown quotes are driven through the full
+ASGI stack with the quote cache disabled, so every request is priced.
+
+Run with ``python -m app.benchmarks.breakdown [requests]``.
+"""
+import asyncio
+import statistics
+import sys
+import time
+import timeit
+
+from app.api.v1.delivery_fee_calculator.cache import quote_cache
+from app.api.v1.delivery_fee_calculator.fee_plan import get_fee_plan
+from app.api.v1.delivery_fee_calculator.routes import read_quote_options
+from app.server.setup import create_app
+from starlette.datastructures import Headers
+
+from .fast_path import BODY
+from .suite import ENDPOINT, HEADERS
+
+
+def request_scope(query_string: bytes = b"") -> dict:
+    """Build the ASGI scope of a quote request."""
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": ENDPOINT,
+        "raw_path": ENDPOINT.encode(),
+        "query_string": query_string,
+        "root_path": "",
+        "headers": HEADERS,
+        "client": ("127.0.0.1", 50000),
+        "server": ("benchmark", 80),
+    }
+
+
+def time_per_call(function, number: int) -> float:
+    """Best-of-5 time of one call to `function`, in nanoseconds."""
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e9
+
+
+async def call(app, scope: dict) -> float:
+    """Send one quote request straight to the ASGI app and return its latency in seconds."""
+    status = []
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": BODY, "more_body": False}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    elapsed = time.perf_counter() - start
+    if status != [200]:
+        raise RuntimeError(f"The quote answered {status}")
+    return elapsed
+
+
+async def measure(app, scope: dict, requests: int) -> list[float]:
+    for _ in range(requests // 10):
+        await call(app, scope)
+    return [await call(app, scope) for _ in range(requests)]
+
+
+def main(requests: int = 20_000) -> None:
+    scope = request_scope()
+    number = requests * 10
+    options = time_per_call(lambda: read_quote_options(scope), number)
+    # What the first request.headers.get of a request does.
+    lookup = time_per_call(lambda: Headers(scope=scope).get("content-type"), number)
+    print(f"Content-Type lookup      {lookup:>8.0f} ns")
+    print(f"read_quote_options       {options:>8.0f} ns  ({options - lookup:+.0f} ns)")
+
+    plan = get_fee_plan()
+    fee = time_per_call(lambda: plan.fee(790, 2235, 4, 5, 16), number)
+    breakdown = time_per_call(lambda: plan.fee_breakdown(790, 2235, 4, 5, 16), number)
+    print(f"FeePlan.fee              {fee:>8.0f} ns")
+    print(f"FeePlan.fee_breakdown    {breakdown:>8.0f} ns")
+
+    app = create_app()
+    max_size = quote_cache.max_size
+    quote_cache.max_size = 0
+    try:
+        rows = [
+            (name, asyncio.run(measure(app, request_scope(query_string), requests)))
+            for name, query_string in (("compact", b""), ("breakdown", b"breakdown=true"))
+        ]
+    finally:
+        quote_cache.max_size = max_size
+    for name, latencies in rows:
+        quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        print(f"{name:<10} p50 {quantiles[49] * 1e6:>7.1f} us  p99 {quantiles[98] * 1e6:>7.1f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
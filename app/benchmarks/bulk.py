@@ -0,0 +1,46 @@
+"""Measure how the bulk repricing CLI scales with worker processes.
+
+Writes a random order file in each input format, then prices it with 1, 2, 4, ... workers up to
+the CPU count. Run with ``python -m app.benchmarks.bulk [rows]``.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from app.benchmarks.vectorized import random_orders
+from app.bulk.formats import write_columnar
+from app.bulk.pricing import reprice_file
+
+
+def write_inputs(directory: Path, rows: int) -> dict[str, Path]:
+    cart_values, distances, items, times = random_orders(rows)
+    columnar = directory / "orders.col"
+    write_columnar(
+        columnar,
+        {"cart_value": cart_values, "delivery_distance": distances, "number_of_items": items, "time": times},
+    )
+    reprice_file(columnar, directory / "orders.csv", "columnar", "csv", workers=1)
+    return {"columnar": columnar, "csv": directory / "orders.csv"}
+
+
+def main(rows: int) -> None:
+    worker_counts = [1]
+    while worker_counts[-1] * 2 <= (os.cpu_count() or 1):
+        worker_counts.append(worker_counts[-1] * 2)
+    with tempfile.TemporaryDirectory() as directory:
+        inputs = write_inputs(Path(directory), rows)
+        for input_format, path in inputs.items():
+            baseline = None
+            for workers in worker_counts:
+                summary = reprice_file(path, Path(directory) / "out.col", input_format, "columnar", workers)
+                rate = summary["rows"] / summary["elapsed_seconds"]
+                baseline = baseline or rate
+                print(
+                    f"{input_format:<9} {workers:>3} workers {rate:>12,.0f} orders/s "
+                    f"(x{rate / baseline:.2f}, {rate / baseline / workers:.0%} of linear)"
+                )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,103 @@
+"""Measure what one quote request costs in the route handler, with and without the shared calculator.
+
+"per-request" replays the original endpoint: the body decoded with the json module into a model, a
+new DeliveryFeeCalculator for every request and a response model serialized by FastAPI. "shared" runs the real route handler with its dependency,
+the quote cache disabled so every request is priced; "cached" is the same with the cache on.
+
+Latency is measured with timeit. Allocations are measured with tracemalloc over many requests:
+the peak shows the transient memory of a request, the retained bytes what stays behind per request.
+Run with ``python -m app.benchmarks.calculator``.
+"""
+import json
+import timeit
+import tracemalloc
+
+from app.api.v1.delivery_fee_calculator.cache import quote_cache
+from app.api.v1.delivery_fee_calculator.dependencies import get_fee_calculator
+from app.api.v1.delivery_fee_calculator.helpers import DeliveryFeeCalculator
+from app.api.v1.delivery_fee_calculator.routes import \
+    calculate_delivery_fee_endpoint
+from app.api.v1.delivery_fee_calculator.schemas import (
+    DeliveryFeeCalculatorInputSchema, DeliveryFeeCalculatorOutputSchema)
+from app.server.setup import create_app
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+BODY = json.dumps(
+    {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}
+).encode()
+APP = create_app()
+
+
+async def receive() -> dict:
+    return {"type": "http.request", "body": BODY, "more_body": False}
+
+
+def run(coroutine):
+    """Run a coroutine that never suspends, without the overhead of an event loop."""
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("The coroutine suspended")
+
+
+def per_request() -> JSONResponse:
+    data = DeliveryFeeCalculatorInputSchema.model_validate(json.loads(BODY))
+    calculator = DeliveryFeeCalculator()
+    fee = calculator.calculate_delivery_fee(
+        data.cart_value, data.delivery_distance, data.number_of_items, data.time
+    )
+    return JSONResponse(jsonable_encoder(DeliveryFeeCalculatorOutputSchema(delivery_fee=fee)))
+
+
+def shared():
+    request = Request(
+        {"type": "http", "app": APP, "headers": [(b"content-type", b"application/json")]}, receive
+    )
+    calculator = run(get_fee_calculator(request))
+    return run(calculate_delivery_fee_endpoint(request, calculator))
+
+
+def allocations(function, number: int) -> tuple[float, int]:
+    """
+    Trace `number` calls of `function`.
+
+    :return: The bytes retained per call and the peak bytes held during the calls.
+    """
+    function()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for _ in range(number):
+        function()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / number, peak - before
+
+
+def measure(function, number: int) -> tuple[float, float, int]:
+    seconds = min(timeit.repeat(function, number=number, repeat=5))
+    retained, peak = allocations(function, number)
+    return seconds / number * 1e9, retained, peak
+
+
+def main(number: int = 50_000) -> None:
+    max_size = quote_cache.max_size
+    quote_cache.max_size = 0
+    try:
+        rows = [("per-request", *measure(per_request, number)), ("shared", *measure(shared, number))]
+    finally:
+        quote_cache.max_size = max_size
+    quote_cache.clear()
+    rows.append(("cached", *measure(shared, number)))
+    for name, nanoseconds, retained, peak in rows:
+        print(
+            f"{name:<12} {nanoseconds:>7.0f} ns/request "
+            f"{retained:>7.1f} B retained/request {peak:>7} B peak over {number} requests"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Measure request coalescing under highly duplicated load.
+
+Many concurrent quotes for a handful of distinct carts are priced by a computation that awaits
+a lookup and then spends CPU time on it, as a zone lookup or a surge pricing stage would.
+"direct" runs one computation per request; "coalesced" runs them through SingleFlight, so
+concurrent identical quotes share one computation and one body.
+
+Run with ``python -m app.benchmarks.coalescing [requests] [distinct]``.
+"""
+import asyncio
+import sys
+import time
+
+from app.api.v1.delivery_fee_calculator.codec import encode_quote
+from app.api.v1.delivery_fee_calculator.coalescing import SingleFlight
+from app.api.v1.delivery_fee_calculator.helpers import DeliveryFeeCalculator
+
+from .suite import CART
+
+# CPU time of the lookup stage of one computation, in seconds.
+LOOKUP_CPU_SECONDS = 0.0002
+
+
+async def duplicated_load(requests: int, distinct: int, flights: SingleFlight | None) -> dict:
+    """Price `requests` concurrent quotes for `distinct` carts.
+
+    Args:
+        requests (int): Concurrent quote requests.
+        distinct (int): Distinct carts among them.
+        flights (SingleFlight | None): Coalesces the computations, None runs every one.
+
+    Returns:
+        dict: The number of computations run, the wall time in seconds and the throughput.
+    """
+    calculator = DeliveryFeeCalculator()
+    computations = 0
+
+    async def price(distance: int) -> bytes:
+        nonlocal computations
+        computations += 1
+        await asyncio.sleep(0)
+        deadline = time.perf_counter() + LOOKUP_CPU_SECONDS
+        while time.perf_counter() < deadline:
+            pass
+        fee = calculator.calculate_delivery_fee(
+            CART["cart_value"], distance, CART["number_of_items"], CART["time"]
+        )
+        return encode_quote(fee)
+
+    async def quote(distance: int) -> bytes:
+        if flights is None:
+            return await price(distance)
+        return await flights.run(distance, lambda: price(distance))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(quote(1000 + i % distinct) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    return {"computations": computations, "seconds": elapsed, "throughput": requests / elapsed}
+
+
+def main(requests: int = 10_000, distinct: int = 10) -> None:
+    for name, flights in (("direct", None), ("coalesced", SingleFlight())):
+        result = asyncio.run(duplicated_load(requests, distinct, flights))
+        coalesced = f", {flights.coalesced} coalesced" if flights is not None else ""
+        print(
+            f"{name:<10} {result['throughput']:>9,.0f} quotes/s  "
+            f"{result['computations']:>6} computations{coalesced}"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
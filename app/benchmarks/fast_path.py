@@ -0,0 +1,105 @@
+"""Compare the quote route with the model-based route it replaced.
+
+"model" is the previous implementation of POST /delivery-fee-calculator/: FastAPI decodes the
+body with the json module, builds a DeliveryFeeCalculatorInputSchema, and the handler renders a
+DeliveryFeeCalculatorOutputSchema. "fast" is the current route: orjson, a precompiled TypeAdapter
+and a pre-rendered body. Both are driven through the full ASGI stack, middleware and dependency
+included, with the quote cache disabled so every request is priced.
+
+Run with ``python -m app.benchmarks.fast_path [requests]``.
+"""
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from app.api.v1.delivery_fee_calculator.cache import quote_cache
+from app.api.v1.delivery_fee_calculator.dependencies import get_fee_calculator
+from app.api.v1.delivery_fee_calculator.helpers import DeliveryFeeCalculator
+from app.api.v1.delivery_fee_calculator.schemas import (
+    DeliveryFeeCalculatorInputSchema, DeliveryFeeCalculatorOutputSchema)
+from app.server.setup import create_app
+from fastapi import Depends, HTTPException, Response
+
+from .suite import CART, ENDPOINT
+
+MODEL_ENDPOINT = "/benchmark/model-route"
+BODY = json.dumps(CART).encode()
+
+
+async def model_route(
+    data: DeliveryFeeCalculatorInputSchema,
+    calculator: DeliveryFeeCalculator = Depends(get_fee_calculator),
+) -> DeliveryFeeCalculatorOutputSchema:
+    try:
+        fee = calculator.calculate_delivery_fee(
+            data.cart_value, data.delivery_distance, data.number_of_items, data.time
+        )
+        return Response(
+            content=DeliveryFeeCalculatorOutputSchema(delivery_fee=fee).model_dump_json(),
+            media_type="application/json",
+        )
+    except (TypeError, ValueError) as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+
+async def call(app, path: str) -> float:
+    """Send one quote request straight to the ASGI app and return its latency in seconds."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(BODY)).encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("benchmark", 80),
+    }
+    status = []
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": BODY, "more_body": False}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    elapsed = time.perf_counter() - start
+    if status != [200]:
+        raise RuntimeError(f"{path} answered {status}")
+    return elapsed
+
+
+async def measure(app, path: str, requests: int) -> list[float]:
+    for _ in range(requests // 10):
+        await call(app, path)
+    return [await call(app, path) for _ in range(requests)]
+
+
+def main(requests: int = 20_000) -> None:
+    app = create_app()
+    app.post(MODEL_ENDPOINT)(model_route)
+    max_size = quote_cache.max_size
+    quote_cache.max_size = 0
+    try:
+        rows = [(name, asyncio.run(measure(app, path, requests))) for name, path in (("model", MODEL_ENDPOINT), ("fast", ENDPOINT))]
+    finally:
+        quote_cache.max_size = max_size
+    baseline = statistics.median(rows[0][1])
+    for name, latencies in rows:
+        quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        print(
+            f"{name:<6} p50 {quantiles[49] * 1e6:>7.1f} us  p99 {quantiles[98] * 1e6:>7.1f} us  "
+            f"({baseline / statistics.median(latencies):.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
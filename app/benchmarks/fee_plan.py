@@ -0,0 +1,65 @@
+"""Compare the compiled FeePlan fast path against the settings-driven method chain.
+
+Both sides skip timestamp parsing so only the fee rules are measured.
+Run with ``python -m app.benchmarks.fee_plan``.
+"""
+import timeit
+
+from app.api.v1.delivery_fee_calculator.fee_plan import get_fee_plan
+from app.config.settings import SETTINGS
+
+ARGS = (790, 2235, 4, 5, 16)
+
+
+def settings_method_chain(
+    cart_value: int,
+    delivery_distance: int,
+    number_of_items: int,
+    day_of_week: int,
+    utc_hour: int,
+) -> int:
+    """The fee rules as DeliveryFeeCalculator evaluated them before the FeePlan."""
+    settings = SETTINGS
+    if cart_value >= settings.FREE_DELIVERY_THRESHOLD:
+        return 0
+    cart_fee = max(
+        settings.MIN_CART_VALUE_TO_AVOID_SURCHARGE - cart_value, settings.MIN_CART_FEE
+    )
+    if delivery_distance % 500 == 0:
+        distance_fee = (delivery_distance // 500) * settings.DISTANCE_SURCHARGE
+    else:
+        quotient, remainder = divmod(delivery_distance, 500)
+        distance_fee = (
+            (delivery_distance + 500 - remainder) // 500
+        ) * settings.DISTANCE_SURCHARGE
+    if 5 <= number_of_items <= 12:
+        item_fee = (
+            number_of_items - settings.MAX_ITEMS_WITHOUT_SURCHARGE
+        ) * settings.ITEM_SURCHARGE
+    elif number_of_items > 12:
+        item_fee = (
+            number_of_items - settings.MAX_ITEMS_WITHOUT_SURCHARGE
+        ) * settings.ITEM_SURCHARGE + settings.BULK_ITEM_FEE
+    else:
+        item_fee = settings.MIN_ITEM_FEE
+    total_fee = cart_fee + distance_fee + item_fee
+    if (
+        day_of_week == settings.FRIDAY_DAY_OF_WEEK
+        and settings.LOWER_THRESHOLD_UTC <= utc_hour <= settings.UPPER_THRESHOLD_UTC
+    ):
+        return min(total_fee * settings.FRIDAY_RUSH_MULTIPLIER, settings.MAX_DELIVERY_FEE)
+    return min(total_fee, settings.MAX_DELIVERY_FEE)
+
+
+def main(number: int = 200_000) -> None:
+    plan = get_fee_plan()
+    assert plan.fee(*ARGS) == settings_method_chain(*ARGS)
+
+    chain = min(timeit.repeat(lambda: settings_method_chain(*ARGS), number=number, repeat=5))
+    fast = min(timeit.repeat(lambda: plan.fee(*ARGS), number=number, repeat=5))
+    print(f"settings method chain: {chain / number * 1e9:>7.0f} ns/call")
+    print(f"FeePlan.fee:           {fast / number * 1e9:>7.0f} ns/call ({chain / fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
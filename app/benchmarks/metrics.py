@@ -0,0 +1,65 @@
+"""Measure the overhead of the metrics middleware and stage sampling.
+
+Run with ``python -m app.benchmarks.metrics``.
+"""
+import time
+
+from app.api.metrics.middleware import MetricsMiddleware
+from app.api.metrics.stages import StageSampler
+from app.api.v1.delivery_fee_calculator.helpers import DeliveryFeeCalculator
+from app.server.setup import create_app
+from fastapi.testclient import TestClient
+
+CART = {
+    "cart_value": 790,
+    "delivery_distance": 2235,
+    "number_of_items": 4,
+    "time": "2024-01-15T13:00:00Z",
+}
+
+
+def without_metrics_middleware():
+    app = create_app()
+    app.user_middleware = [
+        middleware for middleware in app.user_middleware if middleware.cls is not MetricsMiddleware
+    ]
+    return app
+
+
+def requests_per_second(app, count: int) -> float:
+    client = TestClient(app)
+    for _ in range(100):
+        client.get("/health/live")
+    start = time.perf_counter()
+    for _ in range(count):
+        client.get("/health/live")
+    return count / (time.perf_counter() - start)
+
+
+def stage_sampling_ns(every: int, number: int = 200_000) -> float:
+    sampler = StageSampler(every)
+    calculator = DeliveryFeeCalculator()
+    args = (CART["cart_value"], CART["delivery_distance"], CART["number_of_items"], CART["time"])
+    start = time.perf_counter()
+    for _ in range(number):
+        stage_times = [] if sampler.should_sample() else None
+        calculator.calculate_delivery_fee(*args, stage_times=stage_times)
+        if stage_times is not None:
+            sampler.record(stage_times)
+    return (time.perf_counter() - start) / number * 1e9
+
+
+def main(count: int = 3_000) -> None:
+    plain = requests_per_second(without_metrics_middleware(), count)
+    instrumented = requests_per_second(create_app(), count)
+    print(f"without metrics middleware: {plain:>9,.0f} req/s")
+    print(f"with metrics middleware:    {instrumented:>9,.0f} req/s ({(plain / instrumented - 1) * 100:+.1f}% time)")
+
+    baseline = stage_sampling_ns(0)
+    sampled = stage_sampling_ns(64)
+    print(f"quote without stage timing: {baseline:>7.0f} ns")
+    print(f"quote with 1/64 sampling:   {sampled:>7.0f} ns ({(sampled / baseline - 1) * 100:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Reprice a dataset under many settings variants, one vectorized pass per variant.
+
+"independent" prices each variant from scratch with VectorizedDeliveryFeeCalculator, converting
+the delivery times every time; "simulation" shares the parsing and the fee components between
+the variants with FeeSimulation. Run with ``python -m app.benchmarks.simulation [rows] [variants]``.
+"""
+import sys
+import time
+
+from app.api.v1.delivery_fee_calculator.simulation import (FeeSimulation,
+                                                           apply_overrides)
+from app.api.v1.delivery_fee_calculator.vectorized import \
+    VectorizedDeliveryFeeCalculator
+from app.config.settings import Settings
+
+from .vectorized import random_orders
+
+
+def variants(count: int) -> list[dict]:
+    """Vary the settings analysts ask about, one at a time."""
+    grid = []
+    for step in range(count):
+        if step % 3 == 0:
+            grid.append({"DISTANCE_SURCHARGE": 50 + step})
+        elif step % 3 == 1:
+            grid.append({"FRIDAY_RUSH_MULTIPLIER": 1.0 + step / 100})
+        else:
+            grid.append({"FREE_DELIVERY_THRESHOLD": 10_000 + step * 100})
+    return grid
+
+
+def main(rows: int, count: int) -> None:
+    cart_values, distances, items, times = random_orders(rows)
+    settings = [apply_overrides(Settings(), overrides) for overrides in variants(count)]
+
+    sample = max(count // 10, 1)
+    start = time.perf_counter()
+    for variant in settings[:sample]:
+        VectorizedDeliveryFeeCalculator(variant).calculate_delivery_fees(cart_values, distances, items, times)
+    independent = (time.perf_counter() - start) / sample * count
+
+    start = time.perf_counter()
+    weekdays, hours = VectorizedDeliveryFeeCalculator.to_weekday_and_hour(times)
+    simulation = FeeSimulation(cart_values, distances, items, weekdays, hours)
+    for variant in settings:
+        simulation.statistics(variant)
+    shared = time.perf_counter() - start
+
+    print(f"{rows:,} orders x {count} variants")
+    print(f"independent: {independent:>8.2f} s (extrapolated from {sample} variants, fees only)")
+    print(f"simulation:  {shared:>8.2f} s (fees and statistics, {independent / shared:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100,
+    )
@@ -0,0 +1,201 @@
+"""Benchmark suite for the fee API: micro-benchmarks and in-process end-to-end load tests.
+
+Everything runs inside the current process, with no server or external service: the ASGI app
+is driven through httpx's ASGI transport. Results are plain dicts so runs can be stored as JSON
+and compared against a baseline with `compare`.
+"""
+import asyncio
+import itertools
+import json
+import platform
+import statistics
+import time
+import timeit
+from datetime import datetime, timezone
+
+import httpx
+from app.api.v1.delivery_fee_calculator.cache import quote_cache
+from app.api.v1.delivery_fee_calculator.codec import validate_quote_request
+from app.api.v1.delivery_fee_calculator.helpers import DeliveryFeeCalculator
+from app.api.v1.delivery_fee_calculator.quote_log import (QuoteLog,
+                                                          encode_record)
+from app.api.v1.delivery_fee_calculator.routes import read_quote_options
+from app.api.v1.delivery_fee_calculator.schemas import \
+    DeliveryFeeCalculatorInputSchema
+from app.api.v1.delivery_fee_calculator.surge import SurgeMeter
+from app.server.setup import create_app
+
+CART = {
+    "cart_value": 790,
+    "delivery_distance": 2235,
+    "number_of_items": 4,
+    "time": "2024-01-19T16:00:00Z",
+}
+ENDPOINT = "/api/v1/delivery-fee-calculator/"
+# The headers of a typical client quote request, Content-Type last as httpx sends it.
+HEADERS = [
+    (b"host", b"testserver"),
+    (b"accept", b"*/*"),
+    (b"accept-encoding", b"gzip, deflate"),
+    (b"connection", b"keep-alive"),
+    (b"user-agent", b"python-httpx/0.26.0"),
+    (b"content-length", str(len(json.dumps(CART))).encode()),
+    (b"content-type", b"application/json"),
+]
+
+# Whether a larger value of a unit is better, used to tell regressions from improvements.
+HIGHER_IS_BETTER = {"ns/op": False, "ms": False, "req/s": True}
+
+
+def result(value: float, unit: str) -> dict:
+    return {"value": round(value, 3), "unit": unit}
+
+
+def time_per_call(function, number: int, repeat: int = 5) -> dict:
+    """Best-of-`repeat` time of one call to `function`, in nanoseconds."""
+    best = min(timeit.repeat(function, number=number, repeat=repeat))
+    return result(best / number * 1e9, "ns/op")
+
+
+def micro_benchmarks(number: int) -> dict:
+    """Time each DeliveryFeeCalculator method, the surge meter, the quote log record, the quote
+    options read from the headers and the input validation, model and fast path."""
+    calculator = DeliveryFeeCalculator()
+    surge = SurgeMeter(threshold=1_000.0)
+    body = json.dumps(CART).encode()
+    cart_value, distance, items, delivery_time = CART.values()
+    # Room for every timed record, so each call buffers one rather than dropping it.
+    quote_log = QuoteLog(queue_size=number * 5)
+    record = (time.time(), 1, cart_value, distance, items, delivery_time, None, 1.0, b'{"delivery_fee":710}')
+    return {
+        "micro.calculate_cart_fee": time_per_call(
+            lambda: calculator.calculate_cart_fee(cart_value), number
+        ),
+        "micro.calculate_distance_fee": time_per_call(
+            lambda: calculator.calculate_distance_fee(distance), number
+        ),
+        "micro.calculate_item_fee": time_per_call(
+            lambda: calculator.calculate_item_fee(items), number
+        ),
+        "micro.apply_friday_rush_multiplier": time_per_call(
+            lambda: calculator.apply_friday_rush_multiplier(1000, delivery_time), number
+        ),
+        "micro.calculate_delivery_fee": time_per_call(
+            lambda: calculator.calculate_delivery_fee(cart_value, distance, items, delivery_time),
+            number,
+        ),
+        "micro.surge_record": time_per_call(surge.record, number),
+        "micro.quote_log_offer": time_per_call(lambda: quote_log.offer(record), number),
+        "micro.quote_log_encode": time_per_call(lambda: encode_record(record), number),
+        "micro.input_schema_validation": time_per_call(
+            lambda: DeliveryFeeCalculatorInputSchema.model_validate(CART), number // 10 or 1
+        ),
+        "micro.read_quote_options": time_per_call(
+            lambda: read_quote_options({"headers": HEADERS, "query_string": b""}), number
+        ),
+        "micro.quote_request_validation": time_per_call(
+            lambda: validate_quote_request(body, "application/json"), number // 10 or 1
+        ),
+    }
+
+
+async def load_test(app, requests: int, concurrency: int, unique: bool) -> dict:
+    """Send `requests` quotes over `concurrency` concurrent connections.
+
+    With `unique` the quote cache is cleared first and every payload has its own delivery
+    distance, so the cache never answers; otherwise all requests share one payload and, after
+    the first, are served from the cache. The distance is varied rather than the cart value
+    because with the cart's Friday rush time every distance still yields a whole-cent fee.
+    """
+    distances = itertools.count(1)
+    latencies: list[float] = []
+    remaining = iter(range(requests))
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        for _ in remaining:
+            payload = {**CART, "delivery_distance": next(distances)} if unique else CART
+            start = time.perf_counter()
+            response = await client.post(ENDPOINT, json=payload)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        await client.post(ENDPOINT, json=CART)
+        if unique:
+            quote_cache.clear()
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "throughput": result(requests / elapsed, "req/s"),
+        "p50": result(quantiles[49] * 1e3, "ms"),
+        "p99": result(quantiles[98] * 1e3, "ms"),
+    }
+
+
+def end_to_end_benchmarks(requests: int, concurrency_levels: tuple[int, ...]) -> dict:
+    """Load-test the quote endpoint at each concurrency level, cached and uncached."""
+    app = create_app()
+    results = {}
+    for concurrency in concurrency_levels:
+        for mode, unique in (("uncached", True), ("cached", False)):
+            measured = asyncio.run(load_test(app, requests, concurrency, unique))
+            for name, value in measured.items():
+                results[f"e2e.{mode}.c{concurrency}.{name}"] = value
+    return results
+
+
+def run_suite(
+    micro_number: int = 100_000,
+    requests: int = 2_000,
+    concurrency_levels: tuple[int, ...] = (1, 8, 32),
+) -> dict:
+    """Run every benchmark and return the report.
+
+    Returns:
+        dict: Run metadata under "meta" and one {"value", "unit"} entry per benchmark under
+        "results".
+    """
+    results = micro_benchmarks(micro_number)
+    results.update(end_to_end_benchmarks(requests, concurrency_levels))
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "micro_number": micro_number,
+            "requests": requests,
+            "concurrency_levels": list(concurrency_levels),
+        },
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list[str]:
+    """List the benchmarks of `report` that regressed by more than `threshold` against `baseline`.
+
+    Args:
+        report (dict): The current run, as returned by run_suite.
+        baseline (dict): An earlier run to compare against.
+        threshold (float): Allowed relative slowdown, e.g. 0.2 for 20%.
+
+    Returns:
+        list[str]: One human-readable line per regression; empty if there is none.
+    """
+    regressions = []
+    for name, current in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or previous["unit"] != current["unit"] or not previous["value"]:
+            continue
+        change = current["value"] / previous["value"] - 1
+        if HIGHER_IS_BETTER[current["unit"]]:
+            change = -change
+        if change > threshold:
+            regressions.append(
+                f"{name}: {previous['value']} -> {current['value']} {current['unit']} "
+                f"({change:+.0%} worse, threshold {threshold:.0%})"
+            )
+    return regressions
@@ -0,0 +1,31 @@
+"""Compare datetime.strptime against the fixed-width timestamp parser.
+
+Run with ``python -m app.benchmarks.timestamps``.
+"""
+import timeit
+from datetime import datetime
+
+from app.api.v1.delivery_fee_calculator.timestamps import parse_weekday_and_hour
+
+DELIVERY_TIME = "2024-01-19T16:42:17Z"
+
+
+def strptime_weekday_and_hour(delivery_time: str) -> tuple[int, int]:
+    date_time = datetime.strptime(delivery_time, "%Y-%m-%dT%H:%M:%SZ")
+    return date_time.isoweekday(), date_time.hour
+
+
+def main(number: int = 100_000) -> None:
+    assert parse_weekday_and_hour(DELIVERY_TIME) == strptime_weekday_and_hour(DELIVERY_TIME)
+    baseline = min(
+        timeit.repeat(lambda: strptime_weekday_and_hour(DELIVERY_TIME), number=number, repeat=5)
+    )
+    fast = min(
+        timeit.repeat(lambda: parse_weekday_and_hour(DELIVERY_TIME), number=number, repeat=5)
+    )
+    print(f"strptime:               {baseline / number * 1e9:>7.0f} ns/call")
+    print(f"parse_weekday_and_hour: {fast / number * 1e9:>7.0f} ns/call ({baseline / fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Compare the per-object calculator against the vectorized engine.
+
+Run with ``python -m app.benchmarks.vectorized [rows]``.
+"""
+import sys
+import time
+
+import numpy as np
+from app.api.v1.delivery_fee_calculator.helpers import DeliveryFeeCalculator
+from app.api.v1.delivery_fee_calculator.vectorized import \
+    VectorizedDeliveryFeeCalculator
+
+
+def random_orders(rows: int):
+    rng = np.random.default_rng(0)
+    start = np.datetime64("2024-01-01T00:00:00")
+    times = start + rng.integers(0, 365 * 24 * 3600, rows).astype("timedelta64[s]")
+    return (
+        rng.integers(0, 25_000, rows),
+        rng.integers(0, 8_000, rows),
+        rng.integers(0, 20, rows),
+        times,
+    )
+
+
+def main(rows: int) -> None:
+    cart_values, distances, items, times = random_orders(rows)
+
+    sample = min(rows, 100_000)
+    time_strings = [f"{t}Z" for t in np.datetime_as_string(times[:sample], unit="s")]
+    scalar_rows = list(
+        zip(cart_values[:sample].tolist(), distances[:sample].tolist(), items[:sample].tolist(), time_strings)
+    )
+    calculator = DeliveryFeeCalculator()
+    start = time.perf_counter()
+    for row in scalar_rows:
+        calculator.calculate_delivery_fee(*row)
+    scalar_rate = sample / (time.perf_counter() - start)
+
+    vectorized = VectorizedDeliveryFeeCalculator()
+    start = time.perf_counter()
+    vectorized.calculate_delivery_fees(cart_values, distances, items, times)
+    vectorized_rate = rows / (time.perf_counter() - start)
+
+    print(f"per-object: {scalar_rate:>14,.0f} rows/s")
+    print(f"vectorized: {vectorized_rate:>14,.0f} rows/s ({vectorized_rate / scalar_rate:.0f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
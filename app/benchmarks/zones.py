@@ -0,0 +1,102 @@
+"""Measure delivery zone lookups.
+
+Hundreds of irregular star-shaped zones, some with holes, are scattered over a city-sized
+area, and random customer points are looked up in them. "naive" tests every zone in turn with
+Zone.contains; "indexed" asks the ZoneIndex grid.
+
+Run with ``python -m app.benchmarks.zones [zones] [points]``.
+"""
+import math
+import random
+import sys
+import time
+
+from app.api.v1.delivery_fee_calculator.zones import Zone, ZoneIndex
+
+# Longitude and latitude bounds of the generated area, roughly Helsinki.
+AREA = (24.7, 60.1, 25.2, 60.3)
+
+
+def star_zones(count: int, vertices: int = 24, seed: int = 0) -> list[Zone]:
+    """Generate irregular zones, every fifth one with a hole.
+
+    Args:
+        count (int): Number of zones.
+        vertices (int): Vertices of each outer ring.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        list[Zone]: The zones.
+    """
+    rng = random.Random(seed)
+    min_x, min_y, max_x, max_y = AREA
+    zones = []
+    for i in range(count):
+        cx, cy = rng.uniform(min_x, max_x), rng.uniform(min_y, max_y)
+        radius = rng.uniform(0.005, 0.03)
+        outer = [
+            (
+                cx + radius * rng.uniform(0.4, 1.0) * math.cos(2 * math.pi * k / vertices),
+                cy + radius * rng.uniform(0.4, 1.0) * math.sin(2 * math.pi * k / vertices) / 2,
+            )
+            for k in range(vertices)
+        ]
+        rings = [outer]
+        if i % 5 == 0:
+            hole = radius / 5
+            rings.append([(cx - hole, cy - hole / 2), (cx + hole, cy - hole / 2), (cx, cy + hole / 2)])
+        zones.append(Zone(str(i), rings, 100 + i, 50 + i % 7))
+    return zones
+
+
+def naive_lookup(zones: list[Zone], x: float, y: float) -> Zone | None:
+    """Find the first zone containing a point by testing every zone."""
+    for zone in zones:
+        if zone.contains(x, y):
+            return zone
+    return None
+
+
+def lookups(zone_count: int, points: int, seed: int = 1) -> dict:
+    """Time naive and indexed lookups of the same random points.
+
+    Args:
+        zone_count (int): Number of generated zones.
+        points (int): Number of looked up points.
+        seed (int): Seed of the point generator.
+
+    Returns:
+        dict: The build time of the index and the seconds per lookup of each strategy, in seconds.
+    """
+    zones = star_zones(zone_count)
+    start = time.perf_counter()
+    index = ZoneIndex(zones)
+    build = time.perf_counter() - start
+
+    rng = random.Random(seed)
+    min_x, min_y, max_x, max_y = AREA
+    sample = [(rng.uniform(min_x, max_x), rng.uniform(min_y, max_y)) for _ in range(points)]
+
+    start = time.perf_counter()
+    naive = [naive_lookup(zones, x, y) for x, y in sample]
+    naive_seconds = (time.perf_counter() - start) / points
+
+    start = time.perf_counter()
+    indexed = [index.lookup(x, y) for x, y in sample]
+    indexed_seconds = (time.perf_counter() - start) / points
+
+    if naive != indexed:
+        raise AssertionError("The index and the naive scan disagree")
+    return {"build": build, "naive": naive_seconds, "indexed": indexed_seconds}
+
+
+def main(zone_count: int = 500, points: int = 20_000) -> None:
+    result = lookups(zone_count, points)
+    print(f"{zone_count} zones, index built in {result['build'] * 1e3:.1f} ms")
+    for name in ("naive", "indexed"):
+        print(f"{name:<8} {result[name] * 1e6:>9.2f} us/lookup")
+    print(f"speedup  {result['naive'] / result['indexed']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
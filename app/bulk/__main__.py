@@ -0,0 +1,50 @@
+"""Reprice an order file offline, with the fee rules of the API.
+
+Usage::
+
+    python -m app.bulk orders.csv priced.csv
+    python -m app.bulk orders.ndjson priced.col --workers 8
+    python -m app.bulk orders.csv orders.col --output-format columnar
+
+Formats are told from the suffix (.csv, .ndjson/.jsonl, .col) unless given explicitly. CSV
+files need a header naming the cart_value, delivery_distance, number_of_items and time columns;
+NDJSON files hold one order object per line, like the batch endpoint. Results keep the input
+order and add delivery_fee and error columns.
+"""
+import argparse
+import sys
+
+from .formats import FORMATS, detect_format
+from .pricing import reprice_file
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.bulk", description=__doc__.split("\n")[0])
+    parser.add_argument("input", help="order file to price")
+    parser.add_argument("output", help="file to write the priced orders to")
+    parser.add_argument("--input-format", choices=FORMATS, help="format of the input file")
+    parser.add_argument("--output-format", choices=FORMATS, help="format of the output file")
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="worker processes (default: one per CPU, 1 prices in this process)",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        input_format = args.input_format or detect_format(args.input)
+        output_format = args.output_format or detect_format(args.output)
+        summary = reprice_file(args.input, args.output, input_format, output_format, args.workers)
+    except (OSError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 2
+
+    seconds = summary["elapsed_seconds"]
+    print(
+        f"priced {summary['rows']:,} orders ({summary['errors']:,} failed) in {seconds:.2f}s, "
+        f"{summary['rows'] / seconds if seconds else 0:,.0f} orders/s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,353 @@
+import csv
+import io
+import json
+import struct
+import warnings
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from app.api.v1.delivery_fee_calculator.timestamps import \
+    parse_weekday_and_hour
+from app.api.v1.delivery_fee_calculator.vectorized import \
+    VectorizedDeliveryFeeCalculator
+
+INPUT_COLUMNS = ("cart_value", "delivery_distance", "number_of_items", "time")
+OUTPUT_COLUMNS = INPUT_COLUMNS + ("delivery_fee", "error")
+FORMATS = ("csv", "ndjson", "columnar")
+SUFFIX_FORMATS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".col": "columnar",
+}
+
+# Columnar files: magic, row count and column count, one directory entry per column
+# (NUL-padded name, NumPy dtype string, byte offset), then each column as a contiguous array.
+COLUMNAR_MAGIC = b"DFEECOL1"
+COLUMNAR_HEADER = struct.Struct("<8sQQ")
+COLUMNAR_ENTRY = struct.Struct("<32s8sQ")
+COLUMNAR_ALIGNMENT = 64
+INT64_MIN, INT64_MAX = -(2**63), 2**63 - 1
+COLUMNAR_DTYPES = {
+    "cart_value": np.dtype("<i8"),
+    "delivery_distance": np.dtype("<i8"),
+    "number_of_items": np.dtype("<i8"),
+    "time": np.dtype("<M8[s]"),
+    "delivery_fee": np.dtype("<f8"),
+}
+
+
+def detect_format(path: str | Path) -> str:
+    """
+    Tell the format of an order file from its suffix.
+
+    :param path: The order file.
+    :return: One of FORMATS.
+    :raises ValueError: If the suffix is not a known one.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix not in SUFFIX_FORMATS:
+        raise ValueError(
+            f"Cannot tell the format of {path}, use one of {', '.join(SUFFIX_FORMATS)} or pass it explicitly"
+        )
+    return SUFFIX_FORMATS[suffix]
+
+
+class OrderChunk:
+    """
+    A slice of an order file, parsed into columns.
+
+    Delivery times are resolved to their weekday and UTC hour while parsing, so pricing needs
+    no further parsing. Rows that cannot be priced carry an error and zeros in their columns.
+
+    Attributes:
+    - cart_values, delivery_distances, numbers_of_items: int64 arrays of the cart fields.
+    - times: The delivery times, ISO strings as read or a datetime64 array for columnar files.
+    - weekdays, hours: int64 arrays of the ISO weekday and UTC hour of each delivery.
+    - errors: The error of each row, None for rows that can be priced.
+    """
+
+    __slots__ = (
+        "cart_values",
+        "delivery_distances",
+        "numbers_of_items",
+        "times",
+        "weekdays",
+        "hours",
+        "errors",
+    )
+
+    def __init__(self, cart_values, delivery_distances, numbers_of_items, times, weekdays, hours, errors):
+        self.cart_values = cart_values
+        self.delivery_distances = delivery_distances
+        self.numbers_of_items = numbers_of_items
+        self.times = times
+        self.weekdays = weekdays
+        self.hours = hours
+        self.errors = errors
+
+    def __len__(self) -> int:
+        return len(self.cart_values)
+
+    @classmethod
+    def from_rows(cls, rows) -> "OrderChunk":
+        """
+        Validate rows of raw field values, e.g. read from CSV or NDJSON.
+
+        :param rows: (cart_value, delivery_distance, number_of_items, time) tuples, or an error
+            message for rows that could not even be split into fields.
+        :return: The parsed chunk.
+        """
+        size = len(rows)
+        cart_values = [0] * size
+        delivery_distances = [0] * size
+        numbers_of_items = [0] * size
+        weekdays = [1] * size
+        hours = [0] * size
+        times = [""] * size
+        errors: list[str | None] = [None] * size
+        for index, row in enumerate(rows):
+            if isinstance(row, str):
+                errors[index] = row
+                continue
+            cart_value, delivery_distance, number_of_items, delivery_time = row
+            times[index] = delivery_time if isinstance(delivery_time, str) else str(delivery_time)
+            try:
+                values = int(cart_value), int(delivery_distance), int(number_of_items)
+                weekdays[index], hours[index] = parse_weekday_and_hour(delivery_time)
+            except (TypeError, ValueError) as error:
+                errors[index] = str(error)
+                continue
+            cart_values[index], delivery_distances[index], numbers_of_items[index] = values
+        columns = [cart_values, delivery_distances, numbers_of_items]
+        try:
+            arrays = [np.array(column, dtype=np.int64) for column in columns]
+        except OverflowError:
+            for index in range(size):
+                if not all(INT64_MIN <= column[index] <= INT64_MAX for column in columns):
+                    errors[index] = "Value out of the 64-bit integer range"
+                    for column in columns:
+                        column[index] = 0
+            arrays = [np.array(column, dtype=np.int64) for column in columns]
+        return cls(
+            *arrays,
+            times,
+            np.array(weekdays, dtype=np.int64),
+            np.array(hours, dtype=np.int64),
+            errors,
+        )
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, np.ndarray]) -> "OrderChunk":
+        """
+        Wrap the columns of a columnar file without copying them.
+
+        :param columns: The cart_value, delivery_distance, number_of_items and time columns.
+        :return: The parsed chunk; rows without a delivery time (NaT) carry an error.
+        """
+        times = columns["time"]
+        missing = np.isnat(times)
+        weekdays, hours = VectorizedDeliveryFeeCalculator.to_weekday_and_hour(times)
+        errors: list[str | None] = [None] * len(times)
+        for index in np.flatnonzero(missing).tolist():
+            errors[index] = "Missing delivery time"
+        return cls(
+            columns["cart_value"],
+            columns["delivery_distance"],
+            columns["number_of_items"],
+            times,
+            np.where(missing, 1, weekdays),
+            np.where(missing, 0, hours),
+            errors,
+        )
+
+    def time_array(self) -> np.ndarray:
+        """
+        Convert the delivery times to UTC datetime64 values.
+
+        :return: A datetime64[s] array, NaT for rows with an error.
+        """
+        if isinstance(self.times, np.ndarray):
+            return self.times
+        texts = ["NaT" if error is not None else text for text, error in zip(self.times, self.errors)]
+        with warnings.catch_warnings():
+            # NumPy warns when it drops the "Z" or offset after converting to UTC.
+            warnings.simplefilter("ignore", UserWarning)
+            warnings.simplefilter("ignore", DeprecationWarning)
+            try:
+                return np.array(texts, dtype="datetime64[s]")
+            except ValueError:
+                return np.array([_to_datetime64(text) for text in texts], dtype="datetime64[s]")
+
+    def time_strings(self) -> list[str]:
+        """
+        Render the delivery times as ISO strings.
+
+        :return: The times as read for text files, "YYYY-MM-DDTHH:MM:SSZ" for columnar ones.
+        """
+        if isinstance(self.times, list):
+            return self.times
+        return [
+            "" if text == "NaT" else text + "Z"
+            for text in np.datetime_as_string(self.times, unit="s").tolist()
+        ]
+
+
+def _to_datetime64(text: str) -> np.datetime64:
+    """Convert one ISO timestamp NumPy cannot read, such as one with a lowercase "z"."""
+    try:
+        return np.datetime64(text, "s")
+    except ValueError:
+        if text.endswith(("Z", "z")):
+            text = text[:-1] + "+00:00"
+        date_time = datetime.fromisoformat(text)
+        if date_time.tzinfo is not None:
+            date_time = date_time.astimezone(timezone.utc).replace(tzinfo=None)
+        return np.datetime64(date_time, "s")
+
+
+def line_ranges(buffer, start: int, parts: int) -> list[tuple[int, int]]:
+    """
+    Split the lines of a text buffer into about `parts` byte ranges that end on a newline.
+
+    :param buffer: The whole file, e.g. an mmap.
+    :param start: The offset of the first line to include.
+    :param parts: The number of ranges wanted.
+    :return: (start, stop) offsets covering buffer[start:] without splitting a line.
+    """
+    size = len(buffer)
+    step = max((size - start) // max(parts, 1), 1)
+    ranges = []
+    while start < size:
+        stop = buffer.find(b"\n", min(start + step, size) - 1)
+        stop = size if stop == -1 else stop + 1
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def csv_header(buffer) -> tuple[tuple[str, ...], int]:
+    """
+    Read the header line of a CSV file.
+
+    :param buffer: The whole file.
+    :return: The column names and the offset of the first data line.
+    :raises ValueError: If a required column is missing.
+    """
+    end = buffer.find(b"\n")
+    end = len(buffer) if end == -1 else end + 1
+    header = tuple(
+        name.strip() for name in next(csv.reader([bytes(buffer[:end]).decode("utf-8-sig")]), [])
+    )
+    missing = [name for name in INPUT_COLUMNS if name not in header]
+    if missing:
+        raise ValueError(f"CSV header lacks the column(s) {', '.join(missing)}")
+    return header, end
+
+
+def parse_csv(data: bytes, header: tuple[str, ...]) -> OrderChunk:
+    """
+    Parse CSV data lines, without the header line.
+
+    :param data: Whole lines of the file.
+    :param header: The column names from csv_header.
+    :return: The parsed chunk.
+    """
+    positions = [header.index(name) for name in INPUT_COLUMNS]
+    width = len(header)
+    rows = []
+    for fields in csv.reader(io.StringIO(data.decode())):
+        if not fields:
+            continue
+        if len(fields) != width:
+            rows.append(f"Expected {width} fields, got {len(fields)}")
+            continue
+        rows.append(tuple(fields[position] for position in positions))
+    return OrderChunk.from_rows(rows)
+
+
+def parse_ndjson(data: bytes) -> OrderChunk:
+    """
+    Parse NDJSON lines holding one order object each.
+
+    :param data: Whole lines of the file.
+    :return: The parsed chunk.
+    """
+    rows = []
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        try:
+            order = json.loads(line)
+            rows.append(tuple(order[name] for name in INPUT_COLUMNS))
+        except (KeyError, TypeError, ValueError) as error:
+            rows.append(f"Invalid order: {error!r}")
+    return OrderChunk.from_rows(rows)
+
+
+def read_columnar_directory(buffer) -> tuple[int, dict[str, tuple[np.dtype, int]]]:
+    """
+    Read the header of a columnar file.
+
+    :param buffer: The whole file.
+    :return: The row count and the dtype and byte offset of every column.
+    :raises ValueError: If the buffer is not a columnar file.
+    """
+    magic, rows, count = COLUMNAR_HEADER.unpack_from(buffer, 0)
+    if magic != COLUMNAR_MAGIC:
+        raise ValueError("Not a columnar order file")
+    directory = {}
+    for index in range(count):
+        name, dtype, offset = COLUMNAR_ENTRY.unpack_from(
+            buffer, COLUMNAR_HEADER.size + index * COLUMNAR_ENTRY.size
+        )
+        directory[name.rstrip(b"\0").decode()] = (np.dtype(dtype.rstrip(b"\0").decode()), offset)
+    missing = [name for name in INPUT_COLUMNS if name not in directory]
+    if missing:
+        raise ValueError(f"Columnar file lacks the column(s) {', '.join(missing)}")
+    return rows, directory
+
+
+def columnar_views(
+    buffer, directory: dict[str, tuple[np.dtype, int]], start: int, stop: int
+) -> dict[str, np.ndarray]:
+    """
+    Slice rows of every column straight out of the buffer, without copying.
+
+    :param buffer: The whole file, e.g. an mmap.
+    :param directory: The columns, see read_columnar_directory.
+    :param start: The first row.
+    :param stop: The row after the last one.
+    :return: Read-only arrays backed by the buffer.
+    """
+    return {
+        name: np.frombuffer(buffer, dtype=dtype, count=stop - start, offset=offset + start * dtype.itemsize)
+        for name, (dtype, offset) in directory.items()
+    }
+
+
+def write_columnar(path: str | Path, columns: dict[str, np.ndarray]) -> None:
+    """
+    Write columns of equal length as a columnar file.
+
+    :param path: The file to write.
+    :param columns: Column names to arrays; names must have at most 32 ASCII characters.
+    """
+    rows = len(next(iter(columns.values()))) if columns else 0
+    offset = COLUMNAR_HEADER.size + COLUMNAR_ENTRY.size * len(columns)
+    entries = []
+    arrays = []
+    for name, array in columns.items():
+        array = np.ascontiguousarray(array, dtype=COLUMNAR_DTYPES.get(name, array.dtype))
+        offset += -offset % COLUMNAR_ALIGNMENT
+        entries.append(COLUMNAR_ENTRY.pack(name.encode(), array.dtype.str.encode(), offset))
+        arrays.append((offset, array))
+        offset += array.nbytes
+    with open(path, "wb") as file:
+        file.write(COLUMNAR_HEADER.pack(COLUMNAR_MAGIC, rows, len(columns)))
+        for entry in entries:
+            file.write(entry)
+        for offset, array in arrays:
+            file.write(b"\0" * (offset - file.tell()))
+            file.write(array.view(np.uint8))
@@ -0,0 +1,240 @@
+import json
+import mmap
+import multiprocessing
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+from app.api.v1.delivery_fee_calculator.fee_plan import get_fee_plan
+from app.api.v1.delivery_fee_calculator.vectorized import \
+    VectorizedDeliveryFeeCalculator
+from app.config.settings import Settings
+
+from .formats import (COLUMNAR_DTYPES, INPUT_COLUMNS, OUTPUT_COLUMNS,
+                      OrderChunk, columnar_views, csv_header, line_ranges,
+                      parse_csv, parse_ndjson, read_columnar_directory,
+                      write_columnar)
+
+# Chunks per worker, so a slow chunk does not leave the other workers idle at the end.
+CHUNKS_PER_WORKER = 4
+
+_calculator: VectorizedDeliveryFeeCalculator | None = None
+
+
+def _init_worker(settings: Settings) -> None:
+    global _calculator
+    _calculator = VectorizedDeliveryFeeCalculator(settings)
+
+
+def price_chunk(calculator: VectorizedDeliveryFeeCalculator, chunk: OrderChunk) -> np.ndarray:
+    """
+    Price every row of a chunk.
+
+    :param calculator: The calculator to price with.
+    :param chunk: The parsed orders.
+    :return: A float64 array of fees in cents, NaN for rows with an error.
+    """
+    fees = calculator.calculate_delivery_fees_at(
+        chunk.cart_values, chunk.delivery_distances, chunk.numbers_of_items, chunk.weekdays, chunk.hours
+    )
+    failed = [index for index, error in enumerate(chunk.errors) if error is not None]
+    if failed:
+        fees[failed] = np.nan
+    return fees
+
+
+def format_fee(fee: float) -> int | float | None:
+    """Render a fee like the API does: whole cents as int, Friday rush fractions as float."""
+    if fee != fee:
+        return None
+    return int(fee) if fee.is_integer() else fee
+
+
+def quote_csv(text: str) -> str:
+    """Quote a free-text CSV field."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def format_csv(chunk: OrderChunk, fees: np.ndarray) -> bytes:
+    """
+    Render priced orders as CSV lines, without the header line.
+
+    :param chunk: The parsed orders.
+    :param fees: The fee of every order, see price_chunk.
+    :return: The encoded lines.
+    """
+    lines = []
+    for cart_value, delivery_distance, number_of_items, delivery_time, fee, error in zip(
+        chunk.cart_values.tolist(),
+        chunk.delivery_distances.tolist(),
+        chunk.numbers_of_items.tolist(),
+        chunk.time_strings(),
+        fees.tolist(),
+        chunk.errors,
+    ):
+        if error is None:
+            lines.append(
+                f"{cart_value},{delivery_distance},{number_of_items},{delivery_time},{format_fee(fee)},\n"
+            )
+        else:
+            lines.append(f",,,{quote_csv(delivery_time)},,{quote_csv(error)}\n")
+    return "".join(lines).encode()
+
+
+def format_ndjson(chunk: OrderChunk, fees: np.ndarray) -> bytes:
+    """
+    Render priced orders as NDJSON lines.
+
+    :param chunk: The parsed orders.
+    :param fees: The fee of every order, see price_chunk.
+    :return: The encoded lines.
+    """
+    lines = []
+    for values in zip(
+        chunk.cart_values.tolist(),
+        chunk.delivery_distances.tolist(),
+        chunk.numbers_of_items.tolist(),
+        chunk.time_strings(),
+        map(format_fee, fees.tolist()),
+        chunk.errors,
+    ):
+        lines.append(json.dumps(dict(zip(OUTPUT_COLUMNS, values))))
+        lines.append("\n")
+    return "".join(lines).encode()
+
+
+def reprice_part(task: tuple) -> tuple[bytes | dict[str, np.ndarray], int, int]:
+    """
+    Price one part of an input file; runs in a worker process.
+
+    The worker maps the input file itself, so only offsets travel to the worker and only the
+    result travels back. Columnar input is sliced out of the mapping without a copy.
+
+    :param task: (path, input format, CSV header, start, stop, output format), with start and
+        stop byte offsets for text input and row numbers for columnar input.
+    :return: Encoded lines for text output or the output columns for columnar output, the
+        row count and the failed row count.
+    """
+    path, input_format, header, start, stop, output_format = task
+    calculator = _calculator or VectorizedDeliveryFeeCalculator()
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        if input_format == "columnar":
+            _, directory = read_columnar_directory(buffer)
+            chunk = OrderChunk.from_columns(columnar_views(buffer, directory, start, stop))
+        elif input_format == "csv":
+            chunk = parse_csv(buffer[start:stop], header)
+        else:
+            chunk = parse_ndjson(buffer[start:stop])
+        fees = price_chunk(calculator, chunk)
+        if output_format == "csv":
+            result = format_csv(chunk, fees)
+        elif output_format == "ndjson":
+            result = format_ndjson(chunk, fees)
+        else:
+            result = {
+                "cart_value": np.array(chunk.cart_values),
+                "delivery_distance": np.array(chunk.delivery_distances),
+                "number_of_items": np.array(chunk.numbers_of_items),
+                "time": np.array(chunk.time_array()),
+                "delivery_fee": fees,
+            }
+        rows = len(chunk)
+        errors = len(chunk.errors) - chunk.errors.count(None)
+        # Release the views into the mapping before it is closed.
+        del chunk
+    return result, rows, errors
+
+
+def plan_tasks(path: Path, input_format: str, output_format: str, parts: int) -> list[tuple]:
+    """
+    Split an input file into tasks for reprice_part.
+
+    :param path: The input file.
+    :param input_format: One of FORMATS.
+    :param output_format: One of FORMATS.
+    :param parts: The number of tasks wanted.
+    :return: The tasks, in file order.
+    """
+    if path.stat().st_size == 0:
+        return []
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        if input_format == "columnar":
+            rows, _ = read_columnar_directory(buffer)
+            step = max(-(-rows // parts), 1)
+            ranges = [(start, min(start + step, rows)) for start in range(0, rows, step)]
+            header = None
+        else:
+            header, start = csv_header(buffer) if input_format == "csv" else (None, 0)
+            ranges = line_ranges(buffer, start, parts)
+    return [(str(path), input_format, header, start, stop, output_format) for start, stop in ranges]
+
+
+def reprice_file(
+    input_path: str | Path,
+    output_path: str | Path,
+    input_format: str,
+    output_format: str,
+    workers: int | None = None,
+    settings: Settings | None = None,
+) -> dict:
+    """
+    Price every order of a file and write the results, spreading the work over processes.
+
+    Rules:
+    - Fees follow the same rules as DeliveryFeeCalculator, computed with the vectorized engine.
+    - Output rows are in input order and echo the input fields next to delivery_fee and error.
+    - Rows that cannot be priced get an error (text output) or a NaN fee (columnar output)
+      instead of stopping the run.
+
+    :param input_path: The order file to read.
+    :param output_path: The file to write.
+    :param input_format: The input format, one of FORMATS.
+    :param output_format: The output format, one of FORMATS.
+    :param workers: Worker processes, defaults to the CPU count; 1 prices in this process.
+    :param settings: Fee parameters to price with, defaults to those of the active fee plan.
+    :return: The row count, the failed row count and the elapsed seconds.
+    """
+    start = time.perf_counter()
+    settings = settings or get_fee_plan().settings
+    workers = workers or os.cpu_count() or 1
+    tasks = plan_tasks(Path(input_path), input_format, output_format, workers * CHUNKS_PER_WORKER)
+
+    if workers == 1 or len(tasks) <= 1:
+        _init_worker(settings)
+        results = map(reprice_part, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(settings,))
+        results = pool.imap(reprice_part, tasks)
+
+    rows = errors = 0
+    try:
+        if output_format == "columnar":
+            parts = []
+            for columns, part_rows, part_errors in results:
+                parts.append(columns)
+                rows += part_rows
+                errors += part_errors
+            write_columnar(
+                output_path,
+                {
+                    name: np.concatenate([part[name] for part in parts])
+                    if parts
+                    else np.empty(0, dtype=COLUMNAR_DTYPES[name])
+                    for name in INPUT_COLUMNS + ("delivery_fee",)
+                },
+            )
+        else:
+            with open(output_path, "wb") as output:
+                if output_format == "csv":
+                    output.write((",".join(OUTPUT_COLUMNS) + "\n").encode())
+                for lines, part_rows, part_errors in results:
+                    output.write(lines)
+                    rows += part_rows
+                    errors += part_errors
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return {"rows": rows, "errors": errors, "elapsed_seconds": time.perf_counter() - start}
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Callable
+
+from .settings import Settings
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    tomllib = None
+
+logger = logging.getLogger(__name__)
+
+
+def without_environment(values: dict) -> dict:
+    """
+    Drop the values of a config file that an environment variable also sets.
+
+    Settings gives constructor arguments precedence over environment variables, the opposite of
+    a dotenv file, so values read from .json and .toml files are filtered to keep one order.
+
+    :param values: Setting names to values, as read from the file.
+    :return: The values no environment variable overrides.
+    :raises ValueError: If the file does not hold a mapping of setting names to values.
+    """
+    if not isinstance(values, dict):
+        raise ValueError("The config file must hold setting names mapped to values")
+    environment = {name.upper() for name in os.environ}
+    return {name: value for name, value in values.items() if name.upper() not in environment}
+
+
+class SettingsReloader:
+    """
+    Watches a config file and hands every valid new Settings snapshot to a callback.
+
+    The file is polled by modification time and size, which needs no extra dependency and
+    behaves the same on every platform and inside containers. A change is parsed and validated
+    with the Settings model before the callback sees it; a file that fails to parse or validate
+    is logged and ignored, so the running configuration stays in effect.
+
+    Every worker process runs its own reloader on the same file, so all workers converge on the
+    same snapshot, and FeePlan.version (a fingerprint of the settings) is identical across them.
+
+    Attributes:
+    - path: The watched config file (.env, .json or .toml).
+    - interval: Seconds between two checks of the file.
+    - on_reload: Called with each new Settings snapshot.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        interval: float,
+        on_reload: Callable[[Settings], object],
+    ):
+        """
+        Initialize the reloader. The file counts as changed until the first check, which
+        therefore applies it, see check.
+
+        :param path: The config file to watch.
+        :param interval: Seconds between two checks of the file.
+        :param on_reload: Called with each new Settings snapshot.
+        """
+        self.path = Path(path)
+        self.interval = interval
+        self.on_reload = on_reload
+        self._signature: tuple[int, int] | None = None
+        self._task: asyncio.Task | None = None
+
+    def _stat_signature(self) -> tuple[int, int] | None:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self) -> Settings:
+        """
+        Parse and validate the watched file.
+
+        Rules:
+        - .json files hold an object of setting names to values.
+        - .toml files hold top-level keys of setting names to values.
+        - Any other file is read as a dotenv file.
+        - Environment variables take precedence over the file whatever its format, as they
+          take precedence over the .env file at startup.
+
+        :return: The validated Settings snapshot.
+        :raises ValueError: If the file cannot be parsed or fails validation (pydantic's
+            ValidationError is a ValueError).
+        :raises OSError: If the file cannot be read.
+        """
+        suffix = self.path.suffix.lower()
+        if suffix == ".json":
+            return Settings(**without_environment(json.loads(self.path.read_bytes())))
+        if suffix == ".toml":
+            if tomllib is None:
+                raise ValueError("TOML config files need Python 3.11 or newer")
+            return Settings(**without_environment(tomllib.loads(self.path.read_text())))
+        return Settings(_env_file=os.fspath(self.path))
+
+    def check(self) -> bool:
+        """
+        Reload the settings if the file changed since the last check.
+
+        The first check applies the file as it is, so calling it once at startup makes the
+        file take effect before the first request, whatever its format.
+
+        :return: True if a new snapshot was handed to the callback.
+        """
+        signature = self._stat_signature()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            settings = self.load()
+        except (OSError, TypeError, ValueError) as error:
+            logger.warning("Ignoring invalid config file %s: %s", self.path, error)
+            return False
+        self.on_reload(settings)
+        logger.info("Reloaded settings from %s", self.path)
+        return True
+
+    async def run(self) -> None:
+        """Check the file every interval until cancelled, surviving any error."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.check)
+            except Exception:
+                logger.exception("Config reload of %s failed", self.path)
+
+    def start(self) -> None:
+        """Start watching the file in a background task of the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop watching the file."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,68 @@
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+RushWindow = tuple[int, int, int, float | None]
+
+
+def parse_weekday(text: str) -> int:
+    """
+    Parse a weekday name or ISO number.
+
+    :param text: "mon" to "sun", any case, or 1 to 7.
+    :return: The ISO weekday, 1 for Monday.
+    :raises ValueError: If the text names no weekday.
+    """
+    name = text.strip().lower()[:3]
+    if name in WEEKDAYS:
+        return WEEKDAYS.index(name) + 1
+    if text.strip().isdigit() and 1 <= int(text) <= 7:
+        return int(text)
+    raise ValueError(f"Unknown weekday '{text}'")
+
+
+def parse_range(text: str, parse, low: int, high: int) -> tuple[int, int]:
+    """Parse "a" or "a-b" into an inclusive range within low and high."""
+    first, _, last = text.partition("-")
+    start = parse(first)
+    end = parse(last) if last else start
+    if not low <= start <= end <= high:
+        raise ValueError(f"Invalid range '{text}'")
+    return start, end
+
+
+def parse_hour(text: str) -> int:
+    """Parse a UTC hour, range checked by parse_range."""
+    if not text.strip().isdigit():
+        raise ValueError(f"Invalid hour '{text}'")
+    return int(text)
+
+
+def parse_rush_schedule(text: str) -> list[RushWindow]:
+    """
+    Parse a rush schedule.
+
+    The schedule lists comma-separated windows, each "weekdays hours [multiplier]": weekdays
+    and UTC hours are a single value or an inclusive range, such as "fri 15-19",
+    "mon-fri 7-9 1.1" or "6 12 1.3". Where windows overlap, the last one listed applies.
+
+    :param text: The schedule, empty for none.
+    :return: One (ISO weekday, first hour, last hour, multiplier) tuple per weekday of each
+        window, in schedule order; the multiplier is None where the window gives none.
+    :raises ValueError: If a window is malformed.
+    """
+    windows = []
+    for entry in filter(None, (entry.strip() for entry in text.split(","))):
+        parts = entry.split()
+        if len(parts) not in (2, 3):
+            raise ValueError(f"Rush window '{entry}' must read 'weekdays hours [multiplier]'")
+        first_day, last_day = parse_range(parts[0], parse_weekday, 1, 7)
+        first_hour, last_hour = parse_range(parts[1], parse_hour, 0, 23)
+        multiplier = None
+        if len(parts) == 3:
+            multiplier = float(parts[2])
+            if not multiplier > 0:
+                raise ValueError(f"Rush window '{entry}' needs a positive multiplier")
+        windows.extend(
+            (day_of_week, first_hour, last_hour, multiplier)
+            for day_of_week in range(first_day, last_day + 1)
+        )
+    return windows
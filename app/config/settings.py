@@ -1,6 +1,10 @@
-from pydantic import Field
+from typing import Literal
+
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from .schedule import parse_rush_schedule
+
 
 class Settings(BaseSettings):
     MIN_CART_VALUE_TO_AVOID_SURCHARGE: int = Field(
@@ -58,6 +62,25 @@ class Settings(BaseSettings):
         1.2,
         description="Friday rush: Multiplier",
     )
+    RUSH_SCHEDULE: str = Field(
+        "",
+        description="Rush windows as comma-separated 'weekdays UTC-hours [multiplier]' entries such as 'fri 15-19, mon-fri 7-9 1.1', "
+        "multiplier defaulting to FRIDAY_RUSH_MULTIPLIER; empty for the single Friday rush window",
+    )
+    SURGE_ORDER_RATE_THRESHOLD: float = Field(
+        0.0,
+        description="Quotes per second per worker above which fees surge in proportion to the rate, 0 disables surge pricing",
+    )
+    SURGE_MAX_MULTIPLIER: float = Field(
+        2.0,
+        ge=1.0,
+        description="Largest surge multiplier",
+    )
+    SURGE_WINDOW_SECONDS: int = Field(
+        60,
+        ge=1,
+        description="Seconds of quote volume the surge multiplier is computed from",
+    )
     MAX_DELIVERY_FEE: int = Field(
         1500,
         description="Maximum delivery fee"
@@ -72,7 +95,227 @@ class Settings(BaseSettings):
         description="Delivery fee is free if cart value id equal or over 2000"
     )
 
-    model_config = SettingsConfigDict(env_file=".env")
+    FEE_PLAN_MAX_ITEMS: int = Field(
+        100,
+        description="Largest item count covered by the precomputed item fee table",
+    )
+    FEE_PLAN_MAX_DISTANCE: int = Field(
+        20_000,
+        description="Largest distance in meters covered by the precomputed distance fee table",
+    )
+
+    QUOTE_CACHE_MAX_SIZE: int = Field(
+        10_000,
+        description="Maximum number of fee quotes kept in the response cache, 0 disables it",
+    )
+    QUOTE_CACHE_TTL_SECONDS: float = Field(
+        60.0,
+        description="Seconds a cached fee quote stays valid",
+    )
+
+    CONFIG_RELOAD_FILE: str = Field(
+        ".env",
+        description="Config file applied at startup and watched for changes: .env, .json or .toml; read at startup only",
+    )
+    CONFIG_RELOAD_INTERVAL_SECONDS: float = Field(
+        2.0,
+        description="Seconds between checks of the watched config file, 0 disables reloading; read at startup only",
+    )
+
+    HEALTH_SAMPLE_INTERVAL_SECONDS: float = Field(
+        5.0,
+        description="Seconds between two samples of the resource usage reported by /health",
+    )
+
+    METRICS_ENABLED: bool = Field(
+        True,
+        description="Expose /metrics and record per-route request metrics; read at startup only",
+    )
+    STAGE_TIMING_SAMPLE_RATE: int = Field(
+        64,
+        description="Time the fee calculation stages of one in this many quotes, 0 disables it",
+    )
+
+    MAX_BATCH_SIZE: int = Field(
+        100_000,
+        description="Maximum number of carts accepted by the batch endpoint",
+    )
+
+    STREAM_CHUNK_SIZE: int = Field(
+        1_000,
+        description="Carts priced per chunk by the streaming endpoint",
+    )
+    STREAM_MAX_LINE_BYTES: int = Field(
+        64 * 1024,
+        description="Longest NDJSON line accepted by the streaming endpoint",
+    )
+
+    SERVER_WORKERS: int = Field(
+        0,
+        description="Worker processes started by the production launcher, 0 for one per available CPU core; read at startup only",
+    )
+    SERVER_MAX_REQUESTS: int = Field(
+        0,
+        description="Requests a launcher worker serves before it is replaced, 0 never replaces workers; read at startup only",
+    )
+    SERVER_MAX_REQUESTS_JITTER: int = Field(
+        0,
+        description="Random extra requests added per worker to SERVER_MAX_REQUESTS, so workers are not all replaced at once; read at startup only",
+    )
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: float = Field(
+        30.0,
+        description="Seconds a launcher worker may take to finish its requests when stopped or replaced; read at startup only",
+    )
+
+    VENUES_FILE: str = Field(
+        "",
+        description="CSV or GeoJSON file of venue coordinates, for quotes that send a venue_id instead of a delivery_distance",
+    )
+
+    ZONES_FILE: str = Field(
+        "",
+        description="GeoJSON file of delivery zone polygons whose own distance pricing applies to customers inside them",
+    )
+
+    SIMULATION_MAX_ORDERS: int = Field(
+        1_000_000,
+        description="Maximum number of orders accepted by the simulation endpoint",
+    )
+    SIMULATION_MAX_VARIANTS: int = Field(
+        100,
+        description="Maximum number of settings variants accepted by the simulation endpoint",
+    )
+
+    ADMISSION_MAX_IN_FLIGHT: int = Field(
+        1_000,
+        description="API requests a worker serves at once before shedding more with 503, 0 disables the cap",
+    )
+    ADMISSION_MAX_LOOP_LAG_SECONDS: float = Field(
+        0.5,
+        description="Event loop lag in seconds above which API requests are shed with 503, 0 disables it",
+    )
+    ADMISSION_LOOP_LAG_INTERVAL_SECONDS: float = Field(
+        0.1,
+        description="Seconds between two event loop lag probes",
+    )
+    RATE_LIMIT_PER_SECOND: float = Field(
+        0.0,
+        description="API requests a client may send per second on average, 0 disables rate limiting",
+    )
+    RATE_LIMIT_BURST: int = Field(
+        50,
+        description="API requests a client may send at once before being rate limited",
+    )
+    RATE_LIMIT_MAX_CLIENTS: int = Field(
+        100_000,
+        description="Maximum number of clients tracked by the rate limiter per worker",
+    )
+    RATE_LIMIT_KEY_HEADER: str = Field(
+        "",
+        description="Request header identifying the client for rate limiting, empty to use the client address",
+    )
+
+    SHARED_MEMORY_DIR: str = Field(
+        "",
+        description="Directory, ideally on a tmpfs such as /dev/shm, of the memory-mapped files through which workers share "
+        "the quote cache, its counters and the settings snapshot, empty to keep them per process; read at startup only",
+    )
+    SHARED_CACHE_SLOTS: int = Field(
+        65_536,
+        description="Slots of the shared quote cache table, 192 bytes each; read at startup only",
+    )
+    SHARED_MAX_WORKERS: int = Field(
+        256,
+        description="Most processes counting in the shared counters at once; read at startup only",
+    )
+
+    QUOTE_LOG_DIR: str = Field(
+        "",
+        description="Directory of the NDJSON files every fee quote is recorded to, empty to record none; read at startup only",
+    )
+    QUOTE_LOG_QUEUE_SIZE: int = Field(
+        10_000,
+        ge=1,
+        description="Quote records a worker buffers before QUOTE_LOG_OVERFLOW applies",
+    )
+    QUOTE_LOG_OVERFLOW: Literal["drop", "block"] = Field(
+        "drop",
+        description="What a quote does when the record buffer is full: drop its record, or block until the next flush",
+    )
+    QUOTE_LOG_BATCH_SIZE: int = Field(
+        1_000,
+        ge=1,
+        description="Buffered quote records that are written at once without waiting for the flush interval",
+    )
+    QUOTE_LOG_FLUSH_INTERVAL_SECONDS: float = Field(
+        1.0,
+        gt=0,
+        description="Most seconds a quote record waits in the buffer before it is written",
+    )
+    QUOTE_LOG_MAX_FILE_BYTES: int = Field(
+        64 * 1024 * 1024,
+        ge=1,
+        description="Bytes of records, before compression, after which a new quote log file is started",
+    )
+    QUOTE_LOG_COMPRESS: bool = Field(
+        False,
+        description="Write the quote log files as gzip streams",
+    )
+
+    ADMIN_TOKEN: str = Field(
+        "",
+        description="Bearer token of the /admin routes, such as the profiler, empty to disable them",
+    )
+    PROFILER_INTERVAL_SECONDS: float = Field(
+        0.01,
+        gt=0,
+        description="Seconds of CPU time between two stack samples of the profiler",
+    )
+    PROFILER_MAX_SECONDS: float = Field(
+        60.0,
+        gt=0,
+        description="Longest profile the /admin/profile route takes",
+    )
+    PROFILER_STARTUP_SECONDS: float = Field(
+        0.0,
+        ge=0,
+        description="Seconds each worker profiles itself from startup, saved to PROFILER_OUTPUT_DIR, 0 to not; read at startup only",
+    )
+    PROFILER_OUTPUT_DIR: str = Field(
+        "profiles",
+        description="Directory of the speedscope files of the startup profiles",
+    )
+    ROUTE_TIMINGS_ENABLED: bool = Field(
+        True,
+        description="Keep the cumulative time spent in each route handler, served on /admin/routes; read at startup only",
+    )
+
+    model_config = SettingsConfigDict(env_file=".env", frozen=True)
+
+    @field_validator("RUSH_SCHEDULE")
+    @classmethod
+    def check_rush_schedule(cls, value: str) -> str:
+        parse_rush_schedule(value)
+        return value
+
+
+# Settings wired into the application when it is created. A reloaded config file cannot change
+# them; every other setting takes effect on reload.
+RESTART_ONLY_SETTINGS = (
+    "CONFIG_RELOAD_FILE",
+    "CONFIG_RELOAD_INTERVAL_SECONDS",
+    "METRICS_ENABLED",
+    "SERVER_WORKERS",
+    "SERVER_MAX_REQUESTS",
+    "SERVER_MAX_REQUESTS_JITTER",
+    "SERVER_GRACEFUL_TIMEOUT_SECONDS",
+    "SHARED_MEMORY_DIR",
+    "SHARED_CACHE_SLOTS",
+    "SHARED_MAX_WORKERS",
+    "QUOTE_LOG_DIR",
+    "PROFILER_STARTUP_SECONDS",
+    "ROUTE_TIMINGS_ENABLED",
+)
 
 
 SETTINGS = Settings()
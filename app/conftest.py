@@ -0,0 +1,19 @@
+import pytest
+from app.api.v1.delivery_fee_calculator import fee_plan
+from app.api.v1.delivery_fee_calculator.cache import quote_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_quote_cache():
+    """Keep cached quotes from one test from answering requests of the next."""
+    quote_cache.clear()
+    yield
+    quote_cache.clear()
+
+
+@pytest.fixture
+def restore_fee_plan():
+    """Put the original fee plan back after a test rebuilt it."""
+    original = fee_plan.get_fee_plan()
+    yield
+    fee_plan._fee_plan = original
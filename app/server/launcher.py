@@ -0,0 +1,379 @@
+"""Production launcher: a preforking process manager running the app in uvicorn workers.
+
+Usage::
+
+    python -m app.server.launcher --host 0.0.0.0 --port 8000
+    python -m app.server.launcher --workers 4 --max-requests 10000 --max-requests-jitter 1000
+
+The master process imports the app, compiles the fee plan and applies the config file, then
+binds the listening socket and forks the workers, so the code and tables are shared
+copy-on-write. Workers use uvloop and httptools when they are installed.
+
+- SIGTERM / SIGINT: the workers stop accepting, finish their requests within the graceful
+  timeout and exit, then the master exits.
+- SIGHUP: the workers are replaced one at a time, each only once its successor is ready.
+- A worker that served its maximum number of requests announces it is draining and its
+  successor is started at once; the listening socket stays open in the master, so no
+  connection is refused while workers come and go.
+"""
+import argparse
+import gc
+import importlib.util
+import logging
+import os
+import random
+import select
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+from app.api.v1.delivery_fee_calculator.fee_plan import (get_fee_plan,
+                                                         rebuild_fee_plan)
+from app.config.reloader import SettingsReloader
+from uvicorn.importer import import_from_string
+
+logger = logging.getLogger(__name__)
+
+
+def available_cores() -> int:
+    """Count the CPU cores this process may run on.
+
+    Returns:
+        int: The size of the CPU affinity set, which honours taskset and container CPU sets,
+        or the CPU count where affinity is not supported.
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def event_loop_and_parser() -> tuple[str, str]:
+    """Pick the fastest installed event loop and HTTP parser.
+
+    Returns:
+        tuple[str, str]: The uvicorn loop ("uvloop" or "asyncio") and http ("httptools" or
+        "h11") settings.
+    """
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    return loop, http
+
+
+def preload(app_path: str):
+    """Import the app and build everything workers can share before they are forked.
+
+    The config file is applied here, so workers find the fee plan already compiled from it.
+    The surviving objects are then frozen out of the garbage collector: a collection in a worker
+    would otherwise write to every tracked object and unshare the pages holding it.
+
+    Args:
+        app_path (str): The "module:attribute" path of the ASGI app.
+
+    Returns:
+        The ASGI app.
+    """
+    app = import_from_string(app_path)
+    settings = get_fee_plan().settings
+    SettingsReloader(settings.CONFIG_RELOAD_FILE, 0, rebuild_fee_plan).check()
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+class WorkerServer(uvicorn.Server):
+    """A uvicorn server that reports its startup and drain to the launcher through a pipe.
+
+    Attributes:
+        forked_at (float): perf_counter value at the time the worker was forked.
+        notify (int): Write end of the launcher's message pipe.
+    """
+
+    def __init__(self, config: uvicorn.Config, forked_at: float, notify: int):
+        super().__init__(config)
+        self.forked_at = forked_at
+        self.notify = notify
+
+    def send(self, message: str) -> None:
+        # Writes shorter than PIPE_BUF are atomic, so messages of several workers never mix.
+        os.write(self.notify, f"{message} {os.getpid()}\n".encode())
+
+    async def startup(self, sockets=None) -> None:
+        await super().startup(sockets)
+        if self.should_exit:
+            return
+        seconds = time.perf_counter() - self.forked_at
+        logger.info("Worker %d ready in %.1f ms", os.getpid(), seconds * 1000)
+        self.send("ready")
+
+    async def shutdown(self, sockets=None) -> None:
+        self.send("draining")
+        await super().shutdown(sockets)
+
+
+class Launcher:
+    """Keeps a fixed number of uvicorn workers serving one listening socket.
+
+    Attributes:
+        app: The preloaded ASGI app.
+        sock (socket.socket): The bound, listening socket shared by the workers.
+        workers (int): The number of workers to keep running.
+        max_requests (int): Requests a worker serves before it is replaced, 0 for never.
+        max_requests_jitter (int): Random extra requests added per worker to max_requests.
+        graceful_timeout (float): Seconds a stopping worker may take to finish its requests.
+        loop (str): The uvicorn event loop setting.
+        http (str): The uvicorn HTTP protocol setting.
+        pids (set[int]): The running workers.
+    """
+
+    def __init__(
+        self,
+        app,
+        sock: socket.socket,
+        workers: int,
+        max_requests: int = 0,
+        max_requests_jitter: int = 0,
+        graceful_timeout: float = 30.0,
+    ):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.loop, self.http = event_loop_and_parser()
+        self.pids: set[int] = set()
+        # Workers whose successor is already started, so their exit must not start another.
+        self._replaced: set[int] = set()
+        # Workers waiting for a SIGHUP successor, and the successor being started.
+        self._retiring: list[int] = []
+        self._successor: int | None = None
+        self._stopping = False
+        self._reload = False
+        self._messages, self._notify = os.pipe()
+        os.set_blocking(self._messages, False)
+        self._buffer = b""
+
+    def spawn(self) -> int:
+        """Fork a worker.
+
+        Returns:
+            int: The pid of the worker, in the master process.
+        """
+        limit = None
+        if self.max_requests > 0:
+            limit = self.max_requests + random.randint(0, max(self.max_requests_jitter, 0))
+        forked_at = time.perf_counter()
+        pid = os.fork()
+        if pid:
+            self.pids.add(pid)
+            return pid
+
+        status = 1
+        try:
+            for signum in (signal.SIGHUP, signal.SIGCHLD, signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, signal.SIG_DFL)
+            signal.set_wakeup_fd(-1)
+            os.close(self._messages)
+            config = uvicorn.Config(
+                self.app,
+                loop=self.loop,
+                http=self.http,
+                lifespan="on",
+                limit_max_requests=limit,
+                timeout_graceful_shutdown=self.graceful_timeout,
+            )
+            WorkerServer(config, forked_at, self._notify).run(sockets=[self.sock])
+            status = 0
+        except BaseException:
+            logger.exception("Worker %d failed", os.getpid())
+        finally:
+            os._exit(status)
+
+    def run(self) -> int:
+        """Serve until SIGTERM or SIGINT, keeping the workers running.
+
+        Returns:
+            int: The exit status for the launcher process.
+        """
+        wakeup_read, wakeup_write = os.pipe()
+        os.set_blocking(wakeup_read, False)
+        os.set_blocking(wakeup_write, False)
+        signal.set_wakeup_fd(wakeup_write)
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+        logger.info(
+            "Starting %d workers on %s (loop %s, http %s, max requests %s)",
+            self.workers,
+            "%s:%d" % self.sock.getsockname()[:2],
+            self.loop,
+            self.http,
+            self.max_requests or "unlimited",
+        )
+        self._top_up()
+
+        while not self._stopping:
+            select.select([self._messages, wakeup_read], [], [], 1.0)
+            self._drain(wakeup_read)
+            if self._reload:
+                self._reload_workers()
+            self._read_messages()
+            self._reap()
+        return self._stop()
+
+    def _handle_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _handle_reload(self, signum, frame) -> None:
+        self._reload = True
+
+    def _reload_workers(self) -> None:
+        self._reload = False
+        logger.info("Replacing the workers")
+        self._retiring.extend(pid for pid in self.pids - self._replaced if pid not in self._retiring)
+        if self._successor is None:
+            self._replace_next()
+
+    def _replace_next(self) -> None:
+        """Start the successor of the next retiring worker still running, if any."""
+        while self._retiring and self._retiring[0] not in self.pids:
+            self._retiring.pop(0)
+        self._successor = self.spawn() if self._retiring and not self._stopping else None
+
+    def _top_up(self) -> None:
+        """Start workers until as many as wanted are serving, not counting replaced ones."""
+        while not self._stopping and len(self.pids - self._replaced) < self.workers:
+            self.spawn()
+
+    @staticmethod
+    def _drain(fd: int) -> None:
+        try:
+            while os.read(fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _read_messages(self) -> None:
+        try:
+            while chunk := os.read(self._messages, 4096):
+                self._buffer += chunk
+        except BlockingIOError:
+            pass
+        *lines, self._buffer = self._buffer.split(b"\n")
+        for line in lines:
+            event, pid = line.decode().split()
+            self._on_message(event, int(pid))
+
+    def _on_message(self, event: str, pid: int) -> None:
+        if event == "ready" and pid == self._successor:
+            while self._retiring and self._retiring[0] not in self.pids:
+                self._retiring.pop(0)
+            if self._retiring:
+                retiring = self._retiring.pop(0)
+                self._replaced.add(retiring)
+                os.kill(retiring, signal.SIGTERM)
+            self._replace_next()
+        elif event == "draining" and pid in self.pids and pid not in self._replaced:
+            # The worker reached its request limit: start its successor while it drains.
+            self._replaced.add(pid)
+            self._top_up()
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            self.pids.discard(pid)
+            if pid in self._replaced:
+                self._replaced.discard(pid)
+                logger.info("Worker %d replaced", pid)
+            elif not self._stopping:
+                logger.warning("Worker %d exited unexpectedly (status %d)", pid, status)
+            if pid == self._successor:
+                self._replace_next()
+            self._top_up()
+
+    def _stop(self) -> int:
+        logger.info("Stopping %d workers", len(self.pids))
+        for pid in self.pids:
+            os.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self.pids and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.05)
+        for pid in self.pids:
+            logger.warning("Worker %d did not stop in time, killing it", pid)
+            os.kill(pid, signal.SIGKILL)
+        while self.pids:
+            pid, _ = os.waitpid(-1, 0)
+            self.pids.discard(pid)
+        return 0
+
+
+def bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Create the listening socket the workers share.
+
+    Args:
+        host (str): The address to bind.
+        port (int): The port to bind, 0 for any free port.
+        backlog (int): The connection backlog, which holds connections while workers restart.
+
+    Returns:
+        socket.socket: The listening socket, inheritable by forked workers.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Parse the command line, preload the app and run the launcher."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(process)d] %(message)s")
+    start = time.perf_counter()
+    parser = argparse.ArgumentParser(prog="python -m app.server.launcher", description=__doc__.split("\n")[0])
+    parser.add_argument("app", nargs="?", default="app.main:app", help="ASGI app to serve (default: app.main:app)")
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="port to bind (default: 8000)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: SERVER_WORKERS)")
+    parser.add_argument("--max-requests", type=int, help="requests per worker (default: SERVER_MAX_REQUESTS)")
+    parser.add_argument(
+        "--max-requests-jitter", type=int, help="random extra requests per worker (default: SERVER_MAX_REQUESTS_JITTER)"
+    )
+    parser.add_argument(
+        "--graceful-timeout", type=float, help="seconds to finish requests (default: SERVER_GRACEFUL_TIMEOUT_SECONDS)"
+    )
+    args = parser.parse_args(argv)
+
+    app = preload(args.app)
+    settings = get_fee_plan().settings
+    sock = bind(args.host, args.port)
+    logger.info("Preloaded %s in %.1f ms", args.app, (time.perf_counter() - start) * 1000)
+    launcher = Launcher(
+        app,
+        sock,
+        workers=args.workers or settings.SERVER_WORKERS or available_cores(),
+        max_requests=settings.SERVER_MAX_REQUESTS if args.max_requests is None else args.max_requests,
+        max_requests_jitter=(
+            settings.SERVER_MAX_REQUESTS_JITTER if args.max_requests_jitter is None else args.max_requests_jitter
+        ),
+        graceful_timeout=(
+            settings.SERVER_GRACEFUL_TIMEOUT_SECONDS if args.graceful_timeout is None else args.graceful_timeout
+        ),
+    )
+    return launcher.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
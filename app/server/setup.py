@@ -1,26 +1,263 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from functools import partial
+from pathlib import Path
+
+from app.api.admission.middleware import (AdmissionMiddleware,
+                                          admission_controller,
+                                          admission_metrics)
 from app.api.health.routes import router as health_router
+from app.api.health.sampler import ResourceSampler
+from app.api.metrics.stages import stage_sampler
+from app.api.profiling.routes import router as profiling_router
+from app.api.profiling.sampler import stack_sampler
+from app.api.profiling.timings import route_timings
+from app.api.v1.delivery_fee_calculator.cache import (QUOTE_CACHE_COUNTERS,
+                                                      quote_cache,
+                                                      quote_cache_metrics)
+from app.api.v1.delivery_fee_calculator.coalescing import quote_flight_metrics
+from app.api.v1.delivery_fee_calculator.fee_plan import (get_fee_plan,
+                                                         rebuild_fee_plan)
+from app.api.v1.delivery_fee_calculator.geo import (get_venue_index,
+                                                    load_venue_index)
+from app.api.v1.delivery_fee_calculator.helpers import DeliveryFeeCalculator
+from app.api.v1.delivery_fee_calculator.quote_log import (quote_log,
+                                                          quote_log_metrics)
+from app.api.v1.delivery_fee_calculator.surge import surge_meter, surge_metrics
+from app.api.v1.delivery_fee_calculator.zones import (get_zone_index,
+                                                      load_zone_index)
 from app.api.v1.routes import router as v1_router
+from app.config.reloader import SettingsReloader
+from app.config.settings import RESTART_ONLY_SETTINGS, Settings
 from fastapi import APIRouter, FastAPI
 
+logger = logging.getLogger(__name__)
+
+
+# The settings snapshot shared with the other workers, see share_across_workers.
+_settings_snapshot = None
+
+
+def share_across_workers(settings: Settings) -> None:
+    """Back the quote cache and its counters with shared memory, and publish the settings.
+
+    The files live in `SHARED_MEMORY_DIR`. Workers forked by the launcher inherit the mappings
+    made here by the parent; workers started separately map the same files. Either way every
+    worker of the node reads and writes one quote table and one set of cache counters.
+
+    Args:
+        settings (Settings): The startup settings.
+    """
+    global _settings_snapshot
+    # Imported here so an application running without shared memory never maps any file.
+    from app.shared.counters import SharedCounters
+    from app.shared.snapshot import SharedSnapshot
+    from app.shared.table import SharedTable
+
+    directory = Path(settings.SHARED_MEMORY_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    quote_cache.share(
+        SharedTable(directory / "quote-cache", settings.SHARED_CACHE_SLOTS),
+        SharedCounters(directory / "quote-cache-counters", QUOTE_CACHE_COUNTERS, settings.SHARED_MAX_WORKERS),
+    )
+    _settings_snapshot = SharedSnapshot(directory / "settings")
+    publish_settings()
+
+
+def publish_settings() -> None:
+    """Publish the active settings to the other workers, if memory is shared."""
+    if _settings_snapshot is not None:
+        plan = get_fee_plan()
+        _settings_snapshot.publish(plan.version, plan.settings.model_dump_json().encode())
+
+
+def settings_metrics() -> list[tuple[str, str, str, float]]:
+    """Report the settings version of this worker and the last one any worker published.
+
+    Returns:
+        list[tuple[str, str, str, float]]: (name, kind, documentation, value) tuples.
+    """
+    metrics = [("settings_version", "gauge", "Settings version this worker prices with.", get_fee_plan().version)]
+    published = _settings_snapshot.read() if _settings_snapshot is not None else None
+    if published is not None:
+        metrics.append(
+            ("settings_version_published", "gauge", "Settings version last applied by any worker.", published[0])
+        )
+    return metrics
+
+
+def apply_settings(app: FastAPI, startup: Settings, settings: Settings) -> None:
+    """Make a reloaded Settings snapshot take effect in a running application.
+
+    The fee plan is rebuilt unless the snapshot equals the active one, and the quote cache
+    limits, the stage timing rate, the resource sampling interval, the admission limits and the
+    surge and quote log settings are updated in place. The venues and zones are loaded again if VENUES_FILE or ZONES_FILE names
+    another file; a file that cannot be loaded is logged and the previous one is kept. Settings in
+    RESTART_ONLY_SETTINGS keep their startup value; a warning is logged when the new snapshot
+    changes one of them.
+
+    Args:
+        app (FastAPI): The running application.
+        startup (Settings): The settings the application was started with.
+        settings (Settings): The reloaded settings.
+    """
+    for name in RESTART_ONLY_SETTINGS:
+        if getattr(settings, name) != getattr(startup, name):
+            logger.warning("%s changed but only takes effect after a restart", name)
+    # Compiling an identical plan would only unshare the tables the launcher preloaded.
+    if settings != get_fee_plan().settings:
+        rebuild_fee_plan(settings)
+        publish_settings()
+    quote_cache.max_size = settings.QUOTE_CACHE_MAX_SIZE
+    quote_cache.ttl_seconds = settings.QUOTE_CACHE_TTL_SECONDS
+    stage_sampler.configure(settings.STAGE_TIMING_SAMPLE_RATE if startup.METRICS_ENABLED else 0)
+    app.state.resource_sampler.interval = settings.HEALTH_SAMPLE_INTERVAL_SECONDS
+    admission_controller.configure(settings)
+    surge_meter.configure(settings)
+    quote_log.configure(settings)
+    if settings.VENUES_FILE != get_venue_index().path:
+        try:
+            load_venue_index(settings.VENUES_FILE)
+        except (OSError, ValueError) as error:
+            logger.warning("Keeping the venues of %r: %s", get_venue_index().path, error)
+    if settings.ZONES_FILE != get_zone_index().path:
+        try:
+            load_zone_index(settings.ZONES_FILE)
+        except (OSError, ValueError) as error:
+            logger.warning("Keeping the zones of %r: %s", get_zone_index().path, error)
+
+
+async def profile_startup(seconds: float, interval: float, directory: str) -> None:
+    """Profile the worker for its first seconds and save the profile, see StackSampler.save.
+
+    Args:
+        seconds (float): How long to sample.
+        interval (float): Seconds between two samples.
+        directory (str): The directory of the speedscope file.
+    """
+    stack_sampler.interval = interval
+    try:
+        await stack_sampler.run_for(seconds)
+    finally:
+        # Saved even when the worker stops first, with what was sampled so far.
+        path = stack_sampler.save(directory)
+        logger.info("Saved the startup profile to %s", path)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the background services of the application while it serves requests.
+
+    On startup the config file is applied once and the first resource sample is taken, then
+    the resource sampler behind the health probes, the event loop lag probe behind load shedding,
+    the config file reloader, unless its interval is 0, and the quote log writer, if
+    `QUOTE_LOG_DIR` is set, are started, and with `PROFILER_STARTUP_SECONDS` the worker profiles
+    its first seconds; on shutdown they are stopped again, the quote records still buffered are
+    written and an unfinished startup profile is saved.
+
+    Args:
+        app (FastAPI): The application being served.
+    """
+    startup = get_fee_plan().settings
+    reloader = SettingsReloader(
+        startup.CONFIG_RELOAD_FILE,
+        startup.CONFIG_RELOAD_INTERVAL_SECONDS,
+        partial(apply_settings, app, startup),
+    )
+    reloader.check()
+    if reloader.interval > 0:
+        reloader.start()
+    app.state.settings_reloader = reloader
+    await asyncio.to_thread(app.state.resource_sampler.sample)
+    app.state.resource_sampler.start()
+    admission_controller.lag_monitor.start()
+    if startup.QUOTE_LOG_DIR:
+        quote_log.start(startup.QUOTE_LOG_DIR)
+    startup_profile = None
+    if startup.PROFILER_STARTUP_SECONDS > 0:
+        startup_profile = asyncio.create_task(
+            profile_startup(
+                startup.PROFILER_STARTUP_SECONDS, startup.PROFILER_INTERVAL_SECONDS, startup.PROFILER_OUTPUT_DIR
+            )
+        )
+    try:
+        yield
+    finally:
+        if startup_profile is not None:
+            startup_profile.cancel()
+            try:
+                await startup_profile
+            except asyncio.CancelledError:
+                pass
+        await quote_log.stop()
+        await admission_controller.lag_monitor.stop()
+        await app.state.resource_sampler.stop()
+        await reloader.stop()
+
 
 def create_app() -> FastAPI:
     """Create and configure a FastAPI application instance.
 
     This function sets up a FastAPI application instance with the specified description and title.
     It then creates an APIRouter instance with a tag "Root" and includes the `health_router` and
-    `v1_router` routers into the main FastAPI application instance.
+    `v1_router` routers into the main FastAPI application instance. Unless `METRICS_ENABLED` is
+    off, the `/metrics` route and the middleware recording per-route metrics are added. The
+    admission middleware, which rate limits API clients and sheds load, is added last so it
+    rejects requests before any other work. The application-scoped `DeliveryFeeCalculator` is
+    created here and provided to the routes through dependency injection, the venues of
+    `VENUES_FILE` and the zones of `ZONES_FILE` are loaded, and with `SHARED_MEMORY_DIR` the
+    quote cache is shared with the other workers, see share_across_workers. The `/admin` routes
+    of the profiler are added, answering only requests with the `ADMIN_TOKEN`, and unless
+    `ROUTE_TIMINGS_ENABLED` is off every route handler is timed, see RouteTimings.
 
     Returns:
         FastAPI: The configured FastAPI application instance.
     """
-    app = FastAPI(title="Delivery Fee Calculator API")
+    app = FastAPI(title="Delivery Fee Calculator API", lifespan=lifespan)
+
+    settings = get_fee_plan().settings
+
+    app.state.fee_calculator = DeliveryFeeCalculator()
+    app.state.resource_sampler = ResourceSampler(settings.HEALTH_SAMPLE_INTERVAL_SECONDS)
+    surge_meter.configure(settings)
+    quote_log.configure(settings)
+    if settings.SHARED_MEMORY_DIR:
+        share_across_workers(settings)
+    if settings.VENUES_FILE != get_venue_index().path:
+        load_venue_index(settings.VENUES_FILE)
+    if settings.ZONES_FILE != get_zone_index().path:
+        load_zone_index(settings.ZONES_FILE)
 
     router = APIRouter()
 
     router.include_router(health_router)
 
+    if settings.METRICS_ENABLED:
+        # Imported here so an application running without metrics never loads them.
+        from app.api.metrics.middleware import MetricsMiddleware
+        from app.api.metrics.registry import REGISTRY
+        from app.api.metrics.routes import router as metrics_router
+
+        router.include_router(metrics_router)
+        app.add_middleware(MetricsMiddleware)
+        REGISTRY.add_collector(quote_cache_metrics)
+        REGISTRY.add_collector(quote_flight_metrics)
+        REGISTRY.add_collector(admission_metrics)
+        REGISTRY.add_collector(surge_metrics)
+        REGISTRY.add_collector(quote_log_metrics)
+        REGISTRY.add_collector(settings_metrics)
+
+    router.include_router(profiling_router)
+
+    admission_controller.configure(settings)
+    app.add_middleware(AdmissionMiddleware, controller=admission_controller)
+
     app.include_router(router)
 
     app.include_router(v1_router)
 
+    if settings.ROUTE_TIMINGS_ENABLED:
+        route_timings.instrument(app)
+
     return app
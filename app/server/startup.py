@@ -0,0 +1,199 @@
+"""Report the cold start of the application: import time, startup phases and first request.
+
+Usage::
+
+    python -m app.server.startup
+    python -m app.server.startup --top 30 --json
+    python -m app.server.startup --budget 1.5
+
+Every measurement runs in a fresh interpreter, as a new pod would: the phases are timed by a
+child process, and the import breakdown comes from ``python -X importtime``, grouped by
+top-level package and listed per module.
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+
+# Seconds from the first import to the first quote served that test_startup allows.
+COLD_START_BUDGET_SECONDS = 1.5
+
+QUOTE_BODY = b'{"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}'
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+async def asgi_request(app, method: str, path: str, body: bytes = b"") -> int:
+    """Send one request straight to an ASGI app.
+
+    Args:
+        app: The ASGI app.
+        method (str): The HTTP method.
+        path (str): The request path.
+        body (bytes): The JSON request body.
+
+    Returns:
+        int: The response status code.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("startup", 80),
+    }
+    status = []
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    return status[0]
+
+
+def measure_phases() -> dict:
+    """Time the startup phases in this process, which must not have imported the app yet.
+
+    Returns:
+        dict: Seconds spent importing the app's modules, creating the app, running the lifespan
+        startup, and serving the first and second quote; plus the modules imported by then.
+    """
+    import asyncio
+
+    phases = {}
+    start = time.perf_counter()
+    from app.server.setup import create_app
+
+    phases["import"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    app = create_app()
+    phases["create_app"] = time.perf_counter() - start
+
+    async def serve() -> None:
+        start = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            phases["lifespan_startup"] = time.perf_counter() - start
+            for name in ("first_request", "second_request"):
+                start = time.perf_counter()
+                status = await asgi_request(app, "POST", "/api/v1/delivery-fee-calculator/", QUOTE_BODY)
+                phases[name] = time.perf_counter() - start
+                if status != 200:
+                    raise RuntimeError(f"The quote request answered {status}")
+
+    asyncio.run(serve())
+    phases["ready"] = phases["import"] + phases["create_app"] + phases["lifespan_startup"] + phases["first_request"]
+    return {"phases": phases, "modules": sorted(sys.modules)}
+
+
+def cold_start() -> dict:
+    """Measure the startup phases in a fresh interpreter.
+
+    Returns:
+        dict: The result of measure_phases, plus the wall time of the whole child process,
+        interpreter startup included, under phases["process"].
+    """
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-m", "app.server.startup", "--measure"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    report = json.loads(output)
+    report["phases"]["process"] = time.perf_counter() - start
+    return report
+
+
+def import_times(module: str = "app.main") -> list[dict]:
+    """Collect the ``-X importtime`` breakdown of importing a module in a fresh interpreter.
+
+    Args:
+        module (str): The module to import.
+
+    Returns:
+        list[dict]: One entry per imported module with its name, nesting depth, and own and
+        cumulative import time in seconds, in import order.
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            entries.append(
+                {
+                    "module": name,
+                    "depth": len(indent) // 2,
+                    "self": int(own) / 1e6,
+                    "cumulative": int(cumulative) / 1e6,
+                }
+            )
+    return entries
+
+
+def by_package(entries: list[dict]) -> list[tuple[str, float]]:
+    """Sum the own import time of the modules of each top-level package, largest first."""
+    totals: dict[str, float] = {}
+    for entry in entries:
+        package = entry["module"].split(".")[0]
+        totals[package] = totals.get(package, 0.0) + entry["self"]
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.server.startup", description=__doc__.split("\n")[0])
+    parser.add_argument("--top", type=int, default=15, help="packages and modules to list (default: 15)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument(
+        "--budget", type=float, help="exit with status 1 if the app takes longer to get ready, in seconds"
+    )
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        print(json.dumps(measure_phases()))
+        return 0
+
+    report = cold_start()
+    entries = import_times()
+    over_budget = args.budget is not None and report["phases"]["ready"] > args.budget
+    if args.json:
+        print(json.dumps({"phases": report["phases"], "imports": entries}, indent=2))
+        return 1 if over_budget else 0
+
+    print("Startup phases (fresh interpreter)")
+    for name, seconds in report["phases"].items():
+        print(f"  {name:<18} {seconds * 1000:>9.1f} ms")
+    print(f"\nImport time by package, top {args.top}")
+    for package, seconds in by_package(entries)[: args.top]:
+        print(f"  {package:<40} {seconds * 1000:>9.1f} ms")
+    print(f"\nSlowest modules by own import time, top {args.top}")
+    for entry in sorted(entries, key=lambda entry: entry["self"], reverse=True)[: args.top]:
+        print(f"  {entry['module']:<60} {entry['self'] * 1000:>9.1f} ms")
+    if over_budget:
+        print(f"\nReady after {report['phases']['ready']:.3f} s, over the budget of {args.budget} s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+import os
+import struct
+from pathlib import Path
+from typing import Sequence
+
+from .region import HEADER_SIZE, SharedRegion
+
+COUNTERS_MAGIC = b"DFEECNT1"
+
+PID = struct.Struct("<Q")
+# Rows are padded to whole cache lines, so workers never write to the same line.
+CACHE_LINE = 64
+
+
+class Counters:
+    """
+    Named in-process counters, the interface SharedCounters shares across workers.
+
+    Counters are incremented in place through `row`, indexed in the order of `names`:
+    ``counters.row[0] += 1``.
+
+    Attributes:
+    - names: The counter names.
+    - row: The counts of this process.
+    """
+
+    def __init__(self, names: Sequence[str]):
+        """
+        Create counters at zero.
+
+        :param names: The counter names.
+        """
+        self.names = tuple(names)
+        self.row = [0] * len(self.names)
+
+    def totals(self) -> list[int]:
+        """
+        Sum every process's counts.
+
+        :return: One total per counter, in the order of `names`.
+        """
+        return list(self.row)
+
+
+class SharedCounters(Counters):
+    """
+    Named counters summed over every worker of a node.
+
+    Each worker claims a row of the shared file, keyed by its process ID, and only ever writes
+    to that row, so incrementing a counter needs neither a lock nor an atomic instruction: it is
+    a plain update of a 64-bit integer in shared memory, through a memoryview. Readers sum the
+    rows. The row of a worker that exited is handed to the next worker with its counts, so
+    totals never go backwards. A process forked after it claimed a row claims its own in the
+    child.
+
+    Attributes:
+    - region: The shared file holding the rows.
+    - rows: The number of rows, the most workers that can count at once.
+    """
+
+    def __init__(self, path: str | Path, names: Sequence[str], rows: int):
+        """
+        Map the counters and claim a row for this process.
+
+        :param path: The file holding the counters.
+        :param names: The counter names; a file created with another number of counters is reset.
+        :param rows: The number of rows.
+        :raises RuntimeError: If every row belongs to a running process.
+        """
+        self.names = tuple(names)
+        self.rows = rows
+        self._stride = -(-(PID.size + 8 * len(self.names)) // CACHE_LINE) * CACHE_LINE
+        self.region = SharedRegion(
+            path, COUNTERS_MAGIC, (rows, len(self.names), self._stride), HEADER_SIZE + rows * self._stride
+        )
+        self._claim()
+        os.register_at_fork(after_in_child=self._claim)
+
+    def _claim(self) -> None:
+        """Take the row of this process: its own, a free one or one of an exited process."""
+        buffer = self.region.buffer
+        pid = os.getpid()
+        with self.region.lock():
+            candidates = []
+            for row in range(self.rows):
+                offset = HEADER_SIZE + row * self._stride
+                owner = PID.unpack_from(buffer, offset)[0]
+                if owner == pid:
+                    candidates = [offset]
+                    break
+                if owner == 0 or not process_exists(owner):
+                    candidates.append(offset)
+            if not candidates:
+                raise RuntimeError(f"All {self.rows} counter rows of {self.region.path} are in use")
+            offset = candidates[0]
+            PID.pack_into(buffer, offset, pid)
+        start = offset + PID.size
+        self.row = memoryview(buffer)[start:start + 8 * len(self.names)].cast("Q")
+
+    def totals(self) -> list[int]:
+        """
+        Sum every worker's counts.
+
+        :return: One total per counter, in the order of `names`.
+        """
+        counts = memoryview(self.region.buffer)[HEADER_SIZE:].cast("Q")
+        stride = self._stride // 8
+        return [
+            sum(counts[row * stride + 1 + column] for row in range(self.rows))
+            for column in range(len(self.names))
+        ]
+
+
+def process_exists(pid: int) -> bool:
+    """
+    Tell whether a process is running.
+
+    :param pid: The process ID.
+    :return: False if no process has this ID.
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
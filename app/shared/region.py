@@ -0,0 +1,63 @@
+import fcntl
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+# Every shared file starts with a header naming the structure and its layout: magic, layout
+# version and up to four layout parameters, padded to one cache line.
+HEADER = struct.Struct("<8sI4I")
+HEADER_SIZE = 64
+LAYOUT_VERSION = 1
+
+
+class SharedRegion:
+    """
+    A memory-mapped file shared by the worker processes of a node.
+
+    The file is created, or reset, by the first process that opens it with a different layout;
+    every other process maps the same pages, so a write by one worker is visible to all of them
+    without any copy or message. Workers forked after the region was opened share the mapping,
+    and independently started processes opening the same path map the same file.
+
+    Writers serialize on a POSIX record lock on the header, which the kernel releases if the
+    holder dies; readers never lock, the structures built on a region use seqlocks or
+    single-writer slots instead. A file on a tmpfs such as /dev/shm never touches the disk.
+
+    Attributes:
+    - path: The mapped file.
+    - buffer: The mapping, header included.
+    """
+
+    def __init__(self, path: str | Path, magic: bytes, layout: tuple[int, ...], size: int):
+        """
+        Map a shared file, creating it or resetting it if its header does not match.
+
+        :param path: The file to map.
+        :param magic: Eight bytes naming the structure stored in the file.
+        :param layout: Up to four integers describing the layout, such as a slot count; a file
+            created with another layout is reset, which drops its content.
+        :param size: The size of the file, header included.
+        """
+        self.path = Path(path)
+        header = HEADER.pack(magic, LAYOUT_VERSION, *layout, *(0,) * (4 - len(layout)))
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self.lock():
+            current = os.pread(self._fd, HEADER.size, 0)
+            if current != header or os.fstat(self._fd).st_size != size:
+                # Truncating to zero first zero-fills every byte, including the seqlocks.
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, header, 0)
+            self.buffer = mmap.mmap(self._fd, size)
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Hold the region's write lock, shared by every process mapping the file."""
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, 0)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, 0)
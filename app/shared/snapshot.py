@@ -0,0 +1,71 @@
+import struct
+from pathlib import Path
+
+from .region import HEADER_SIZE, SharedRegion
+
+SNAPSHOT_MAGIC = b"DFEESNP1"
+
+# Seqlock sequence, version and length of the published snapshot, then its bytes.
+SNAPSHOT_HEADER = struct.Struct("<IIQ")
+SEQUENCE = struct.Struct("<I")
+DATA_OFFSET = HEADER_SIZE + 64
+READ_ATTEMPTS = 100
+
+
+class SharedSnapshot:
+    """
+    The latest version of a document, such as the active settings, published to every worker.
+
+    One writer at a time, under the region's lock, replaces the document; readers copy it
+    without locking and retry while a seqlock shows a write in progress, so they always see a
+    whole snapshot.
+
+    Attributes:
+    - region: The shared file holding the snapshot.
+    - capacity: The largest document in bytes.
+    """
+
+    def __init__(self, path: str | Path, capacity: int = 64 * 1024):
+        """
+        Map a snapshot, creating it empty if needed.
+
+        :param path: The file holding the snapshot.
+        :param capacity: The largest document in bytes; a file created with another capacity is reset.
+        """
+        self.capacity = capacity
+        self.region = SharedRegion(path, SNAPSHOT_MAGIC, (capacity,), DATA_OFFSET + capacity)
+
+    def publish(self, version: int, data: bytes) -> None:
+        """
+        Replace the snapshot.
+
+        :param version: The version of the document, an unsigned 32-bit integer.
+        :param data: The document.
+        :raises ValueError: If the document is larger than the capacity.
+        """
+        if len(data) > self.capacity:
+            raise ValueError(f"A {len(data)} byte snapshot exceeds the capacity of {self.capacity} bytes")
+        buffer = self.region.buffer
+        with self.region.lock():
+            sequence = SEQUENCE.unpack_from(buffer, HEADER_SIZE)[0] + 1
+            SEQUENCE.pack_into(buffer, HEADER_SIZE, sequence)
+            buffer[DATA_OFFSET:DATA_OFFSET + len(data)] = data
+            SNAPSHOT_HEADER.pack_into(buffer, HEADER_SIZE, sequence, version, len(data))
+            SEQUENCE.pack_into(buffer, HEADER_SIZE, (sequence + 1) & 0xFFFFFFFF)
+
+    def read(self) -> tuple[int, bytes] | None:
+        """
+        Copy the snapshot.
+
+        :return: The version and document, None if nothing was published yet.
+        :raises TimeoutError: If writes kept the snapshot busy for READ_ATTEMPTS attempts.
+        """
+        buffer = self.region.buffer
+        for _ in range(READ_ATTEMPTS):
+            sequence, version, length = SNAPSHOT_HEADER.unpack_from(buffer, HEADER_SIZE)
+            if sequence & 1:
+                continue
+            data = buffer[DATA_OFFSET:DATA_OFFSET + min(length, self.capacity)]
+            if SEQUENCE.unpack_from(buffer, HEADER_SIZE)[0] == sequence:
+                return None if sequence == 0 else (version, data)
+        raise TimeoutError(f"The snapshot of {self.region.path} stayed busy")
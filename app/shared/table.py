@@ -0,0 +1,151 @@
+import struct
+import zlib
+from pathlib import Path
+
+from .region import HEADER_SIZE, SharedRegion
+
+TABLE_MAGIC = b"DFEETBL1"
+
+# Slot layout: seqlock sequence, key and value lengths, key hash, version, expiry time, then
+# the key and value bytes. Slots are three cache lines, so neighbours never share one.
+SLOT_HEADER = struct.Struct("<IHHIId")
+SEQUENCE = struct.Struct("<I")
+KEY_OFFSET = 32
+MAX_KEY_BYTES = 96
+VALUE_OFFSET = KEY_OFFSET + MAX_KEY_BYTES
+MAX_VALUE_BYTES = 64
+SLOT_SIZE = VALUE_OFFSET + MAX_VALUE_BYTES
+
+# Slots probed from a key's home slot before a lookup gives up or a store evicts.
+PROBES = 8
+# Attempts at a consistent read of a slot a writer keeps changing before it counts as a miss.
+READ_ATTEMPTS = 4
+
+
+class SharedTable:
+    """
+    A fixed-size hash table of byte strings in shared memory.
+
+    Slots are laid out in a flat array and found by open addressing: a key lives in one of the
+    PROBES slots following its CRC-32 home slot. Entries are never deleted, only overwritten,
+    so an empty slot ends a probe. Each entry carries a version and an expiry time, and a
+    lookup treats an entry of another version or past its expiry as missing, which lets
+    workers that switched to new settings ignore the old entries without clearing anything.
+
+    Reads take no lock. Every slot is guarded by a seqlock: a writer makes the slot's sequence
+    odd, writes the slot and makes it even again, and a reader retries if the sequence was odd
+    or changed while it copied the slot. Writers exclude each other with the region's lock; a
+    store evicts, among its probed slots, an empty, stale or expired one, or else the one
+    expiring first.
+
+    Attributes:
+    - region: The shared file holding the table.
+    - slots: The number of slots.
+    """
+
+    def __init__(self, path: str | Path, slots: int):
+        """
+        Map a table, creating it if needed.
+
+        :param path: The file holding the table.
+        :param slots: The number of slots; a table created with another count is reset.
+        """
+        self.slots = slots
+        self.region = SharedRegion(
+            path, TABLE_MAGIC, (slots, SLOT_SIZE, MAX_KEY_BYTES, MAX_VALUE_BYTES), HEADER_SIZE + slots * SLOT_SIZE
+        )
+        self._buffer = self.region.buffer
+
+    def _offsets(self, hashed: int) -> list[int]:
+        """The offsets of the slots a key may live in, starting with its home slot."""
+        home = hashed % self.slots
+        return [HEADER_SIZE + (home + probe) % self.slots * SLOT_SIZE for probe in range(PROBES)]
+
+    def get(self, key: bytes, version: int, now: float) -> bytes | None:
+        """
+        Look up the value of a key.
+
+        :param key: The key, at most MAX_KEY_BYTES long.
+        :param version: The version the value must have been stored under.
+        :param now: The current wall-clock time, compared with the expiry of the entry.
+        :return: The value, or None if the key is missing, stale or expired.
+        """
+        buffer = self._buffer
+        hashed = zlib.crc32(key)
+        home = hashed % self.slots
+        key_end = KEY_OFFSET + len(key)
+        for probe in range(PROBES):
+            offset = HEADER_SIZE + (home + probe) % self.slots * SLOT_SIZE
+            attempts = READ_ATTEMPTS
+            while attempts:
+                attempts -= 1
+                sequence, key_length, value_length, slot_hash, slot_version, expires = (
+                    SLOT_HEADER.unpack_from(buffer, offset)
+                )
+                if sequence & 1:
+                    continue
+                if key_length == 0:
+                    return None
+                if slot_hash != hashed or buffer[offset + KEY_OFFSET:offset + key_end] != key:
+                    if SEQUENCE.unpack_from(buffer, offset)[0] != sequence:
+                        continue
+                    break
+                value = buffer[offset + VALUE_OFFSET:offset + VALUE_OFFSET + value_length]
+                if SEQUENCE.unpack_from(buffer, offset)[0] != sequence:
+                    continue
+                return value if slot_version == version and expires > now else None
+            else:
+                # A writer kept the slot busy; answer a miss rather than wait for it.
+                return None
+        return None
+
+    def put(self, key: bytes, value: bytes, version: int, expires: float, now: float) -> bool:
+        """
+        Store the value of a key.
+
+        :param key: The key, at most MAX_KEY_BYTES long.
+        :param value: The value, at most MAX_VALUE_BYTES long.
+        :param version: The version the value belongs to, an unsigned 32-bit integer.
+        :param expires: The wall-clock time the entry expires at.
+        :param now: The current wall-clock time, to tell expired entries that may be evicted.
+        :return: False if the key or value is too long to be stored.
+        """
+        if not 0 < len(key) <= MAX_KEY_BYTES or len(value) > MAX_VALUE_BYTES:
+            return False
+        buffer = self._buffer
+        hashed = zlib.crc32(key)
+        with self.region.lock():
+            reusable = None
+            earliest = None
+            for offset in self._offsets(hashed):
+                _, key_length, _, slot_hash, slot_version, slot_expires = SLOT_HEADER.unpack_from(buffer, offset)
+                if key_length == 0:
+                    # The key is in no later slot either; prefer an earlier stale slot.
+                    target = offset if reusable is None else reusable
+                    break
+                if slot_hash == hashed and buffer[offset + KEY_OFFSET:offset + KEY_OFFSET + key_length] == key:
+                    target = offset
+                    break
+                if reusable is None and (slot_version != version or slot_expires <= now):
+                    reusable = offset
+                if earliest is None or slot_expires < earliest[0]:
+                    earliest = (slot_expires, offset)
+            else:
+                target = earliest[1] if reusable is None else reusable
+            sequence = SEQUENCE.unpack_from(buffer, target)[0] + 1
+            SEQUENCE.pack_into(buffer, target, sequence)
+            buffer[target + KEY_OFFSET:target + KEY_OFFSET + len(key)] = key
+            buffer[target + VALUE_OFFSET:target + VALUE_OFFSET + len(value)] = value
+            SLOT_HEADER.pack_into(
+                buffer, target, sequence, len(key), len(value), hashed, version, expires
+            )
+            SEQUENCE.pack_into(buffer, target, (sequence + 1) & 0xFFFFFFFF)
+        return True
+
+    def __len__(self) -> int:
+        """Count the occupied slots, stale and expired entries included."""
+        buffer = self._buffer
+        return sum(
+            SLOT_HEADER.unpack_from(buffer, HEADER_SIZE + slot * SLOT_SIZE)[1] != 0
+            for slot in range(self.slots)
+        )
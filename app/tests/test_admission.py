@@ -0,0 +1,148 @@
+import asyncio
+import time
+
+import pytest
+from app.api.admission.lag import LoopLagMonitor
+from app.api.admission.limiter import TokenBucketLimiter
+from app.api.admission.middleware import admission_controller
+from app.api.v1.delivery_fee_calculator.fee_plan import get_fee_plan
+from app.benchmarks.admission import (ADMISSION_OVERHEAD_BUDGET_SECONDS,
+                                      overhead)
+from app.config.settings import Settings
+from fastapi.testclient import TestClient
+
+ENDPOINT = "/api/v1/delivery-fee-calculator/"
+
+payload = {
+    "cart_value": 800,
+    "delivery_distance": 1500,
+    "number_of_items": 5,
+    "time": "2024-01-19T13:00:00Z",
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def admission():
+    """Hand the shared admission controller to a test and put its settings and state back after."""
+    yield admission_controller
+    admission_controller.lag_monitor.lag = 0.0
+    admission_controller.configure(get_fee_plan().settings)
+
+
+def test_token_bucket_allows_a_burst_then_refills():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=2, burst=3, max_clients=10, clock=clock)
+
+    assert [limiter.acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("a") == pytest.approx(0.5)
+    assert limiter.acquire("b") == 0.0
+
+    clock.now = 0.5
+    assert limiter.acquire("a") == 0.0
+    assert limiter.acquire("a") == pytest.approx(0.5)
+    assert limiter.rejections == 2
+
+
+def test_idle_buckets_are_evicted_once_full_again():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=10, burst=5, max_clients=100, clock=clock)
+    for key in range(50):
+        limiter.acquire(key)
+    assert len(limiter) == 50
+
+    clock.now = 0.4
+    limiter.acquire("active")
+    assert len(limiter) == 51
+
+    clock.now = 1.0
+    limiter.acquire("active")
+    assert len(limiter) == 1
+    assert limiter.evictions == 0
+
+
+def test_least_recently_used_bucket_is_dropped_at_max_clients():
+    limiter = TokenBucketLimiter(rate=1, burst=1, max_clients=2, clock=FakeClock())
+    limiter.acquire("a")
+    limiter.acquire("b")
+    limiter.acquire("a")
+    limiter.acquire("c")
+
+    assert len(limiter) == 2
+    assert limiter.evictions == 1
+    # "a" is still out of tokens; "b" lost its empty bucket and starts over with a full one.
+    assert limiter.acquire("a") > 0.0
+    assert limiter.acquire("b") == 0.0
+
+
+def test_rate_limited_client_gets_429(client, admission):
+    admission.configure(Settings(RATE_LIMIT_PER_SECOND=0.5, RATE_LIMIT_BURST=2, RATE_LIMIT_KEY_HEADER="X-Client-Id"))
+    headers = {"X-Client-Id": "mobile"}
+
+    assert [client.post(ENDPOINT, json=payload, headers=headers).status_code for _ in range(2)] == [200, 200]
+    response = client.post(ENDPOINT, json=payload, headers=headers)
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Too many requests"}
+    assert response.headers["retry-after"] == "2"
+
+    assert client.post(ENDPOINT, json=payload, headers={"X-Client-Id": "web"}).status_code == 200
+    assert client.get("/health/live").status_code == 200
+
+
+def test_overload_sheds_with_503(client, admission):
+    admission.configure(Settings(ADMISSION_MAX_IN_FLIGHT=1, ADMISSION_MAX_LOOP_LAG_SECONDS=0.2))
+    assert client.post(ENDPOINT, json=payload).status_code == 200
+    assert admission.in_flight == 0
+
+    admission.in_flight = 1
+    try:
+        response = client.post(ENDPOINT, json=payload)
+    finally:
+        admission.in_flight = 0
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+    admission.lag_monitor.lag = 0.3
+    assert client.post(ENDPOINT, json=payload).status_code == 503
+    assert client.get("/health/ready").status_code == 200
+    assert (admission.shed_in_flight, admission.shed_loop_lag) >= (1, 1)
+
+
+def test_lag_monitor_measures_a_blocked_loop():
+    monitor = LoopLagMonitor(0.01)
+
+    async def block() -> float:
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.2)
+        await asyncio.sleep(0.05)
+        lag = monitor.max_lag
+        await monitor.stop()
+        return lag
+
+    assert asyncio.run(block()) >= 0.15
+    assert monitor.lag == 0.0
+
+
+def test_admission_metrics_are_exposed(client):
+    text = client.get("/metrics").text
+    assert "# TYPE admission_shed_loop_lag_total counter" in text
+    assert "# TYPE event_loop_lag_seconds gauge" in text
+
+
+def test_admission_overhead_within_budget():
+    assert overhead(requests=20_000, repeat=3)["overhead"] < ADMISSION_OVERHEAD_BUDGET_SECONDS
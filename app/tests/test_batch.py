@@ -0,0 +1,109 @@
+import json
+
+import pytest
+from app.api.v1.delivery_fee_calculator.batch import parse_batch_body
+from app.api.v1.delivery_fee_calculator.fee_plan import rebuild_fee_plan
+from app.api.v1.delivery_fee_calculator.helpers import DeliveryFeeCalculator
+from app.config.settings import Settings
+from fastapi import status
+from fastapi.testclient import TestClient
+
+# Mocking a delivery time for testing
+mock_delivery_time = "2024-01-19T13:00:00Z"
+
+carts = [
+    {"cart_value": 800, "delivery_distance": 1500, "number_of_items": 5, "time": mock_delivery_time},
+    {"cart_value": 1000, "delivery_distance": 1500, "number_of_items": 5, "time": mock_delivery_time},
+    {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": mock_delivery_time},
+    {"cart_value": 800, "delivery_distance": 2000, "number_of_items": 10, "time": mock_delivery_time},
+]
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+
+    return TestClient(app)
+
+
+def expected_fees():
+    calculator = DeliveryFeeCalculator()
+    return [
+        calculator.calculate_delivery_fee(
+            cart["cart_value"],
+            cart["delivery_distance"],
+            cart["number_of_items"],
+            cart["time"],
+        )
+        for cart in carts
+    ]
+
+
+def test_batch_json_array_matches_single_calculation(client) -> None:
+    response = client.post("/api/v1/delivery-fee-calculator/batch", json=carts)
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()["results"]
+    assert [result["delivery_fee"] for result in results] == expected_fees()
+    assert all(result["error"] is None for result in results)
+
+
+def test_batch_ndjson_matches_single_calculation(client) -> None:
+    body = "\n".join(json.dumps(cart) for cart in carts) + "\n"
+    response = client.post(
+        "/api/v1/delivery-fee-calculator/batch",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()["results"]
+    assert [result["delivery_fee"] for result in results] == expected_fees()
+
+
+def test_batch_reports_errors_per_item(client) -> None:
+    payload = [
+        carts[0],
+        {**carts[0], "cart_value": "invalid"},
+        {**carts[0], "time": "invalid"},
+        carts[2],
+    ]
+    response = client.post("/api/v1/delivery-fee-calculator/batch", json=payload)
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()["results"]
+    assert results[0] == {"delivery_fee": 550, "error": None}
+    assert results[1]["delivery_fee"] is None and "cart_value" in results[1]["error"]
+    assert results[2]["delivery_fee"] is None and results[2]["error"]
+    assert results[3] == {"delivery_fee": 710, "error": None}
+
+
+def test_batch_ndjson_malformed_line_fails_only_that_item(client) -> None:
+    body = json.dumps(carts[0]) + "\n{not json\n" + json.dumps(carts[2])
+    response = client.post(
+        "/api/v1/delivery-fee-calculator/batch",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    results = response.json()["results"]
+    assert [result["delivery_fee"] for result in results] == [550, None, 710]
+
+
+@pytest.mark.parametrize("body", [b"{not json", b'{"cart_value": 800}'])
+def test_batch_rejects_non_array_body(client, body) -> None:
+    response = client.post(
+        "/api/v1/delivery-fee-calculator/batch",
+        content=body,
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_batch_rejects_oversized_batch(client, restore_fee_plan) -> None:
+    rebuild_fee_plan(Settings(MAX_BATCH_SIZE=2))
+    response = client.post("/api/v1/delivery-fee-calculator/batch", json=carts)
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+
+def test_parse_batch_body_skips_blank_ndjson_lines() -> None:
+    assert parse_batch_body(b'{"a": 1}\n\n  \n{"b": 2}\n', "application/x-ndjson") == [
+        b'{"a": 1}',
+        b'{"b": 2}',
+    ]
@@ -0,0 +1,40 @@
+import asyncio
+
+from app.api.v1.delivery_fee_calculator.cache import quote_cache
+from app.benchmarks.suite import compare, load_test, run_suite
+from app.server.setup import create_app
+
+
+def report(**results):
+    return {"results": {name: {"value": value, "unit": unit} for name, (value, unit) in results.items()}}
+
+
+def test_compare_flags_slowdowns_beyond_threshold():
+    baseline = report(fee=(100.0, "ns/op"), rps=(1000.0, "req/s"), p99=(1.0, "ms"))
+    current = report(fee=(130.0, "ns/op"), rps=(700.0, "req/s"), p99=(1.1, "ms"))
+    regressions = compare(current, baseline, threshold=0.2)
+    assert [line.split(":")[0] for line in regressions] == ["fee", "rps"]
+
+
+def test_compare_ignores_improvements_and_unknown_benchmarks():
+    baseline = report(fee=(100.0, "ns/op"), rps=(1000.0, "req/s"))
+    current = report(fee=(50.0, "ns/op"), rps=(5000.0, "req/s"), new=(1.0, "ms"))
+    assert compare(current, baseline, threshold=0.0) == []
+
+
+def test_run_suite_reports_every_benchmark():
+    results = run_suite(micro_number=100, requests=20, concurrency_levels=(2,))["results"]
+    assert results["micro.calculate_delivery_fee"]["unit"] == "ns/op"
+    for mode in ("cached", "uncached"):
+        assert results[f"e2e.{mode}.c2.throughput"]["value"] > 0
+        assert results[f"e2e.{mode}.c2.p50"]["value"] <= results[f"e2e.{mode}.c2.p99"]["value"]
+
+
+def test_uncached_load_test_never_hits_the_cache():
+    app = create_app()
+    for _ in range(2):
+        hits = quote_cache.hits
+        # Over 250 unique payloads, where varying the cart value gave rush fees in fractional cents.
+        results = asyncio.run(load_test(app, requests=300, concurrency=4, unique=True))
+        assert results["throughput"]["value"] > 0
+        assert quote_cache.hits == hits
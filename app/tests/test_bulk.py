@@ -0,0 +1,97 @@
+import csv
+import json
+
+import numpy as np
+import pytest
+from app.api.v1.delivery_fee_calculator.helpers import DeliveryFeeCalculator
+from app.bulk.__main__ import main
+from app.bulk.formats import (columnar_views, line_ranges,
+                              read_columnar_directory, write_columnar)
+from app.bulk.pricing import reprice_file
+
+orders = [
+    {"cart_value": 800, "delivery_distance": 1500, "number_of_items": 5, "time": "2024-01-19T13:00:00Z"},
+    {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-19T16:00:00Z"},
+    {"cart_value": 100, "delivery_distance": 30_000, "number_of_items": 14, "time": "2024-01-19T17:30:00+01:00"},
+    {"cart_value": 20_000, "delivery_distance": 1500, "number_of_items": 5, "time": "2024-01-15T13:00:00Z"},
+] * 50
+
+
+def expected_fees():
+    calculator = DeliveryFeeCalculator()
+    return [calculator.calculate_delivery_fee(*order.values()) for order in orders]
+
+
+@pytest.fixture
+def csv_orders(tmp_path):
+    path = tmp_path / "orders.csv"
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=["time", "number_of_items", "cart_value", "delivery_distance"])
+        writer.writeheader()
+        writer.writerows(orders)
+        file.write("not a time,1,2,3\n")
+    return path
+
+
+def read_csv(path):
+    with open(path, newline="") as file:
+        return list(csv.DictReader(file))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_csv_fees_match_calculator(tmp_path, csv_orders, workers):
+    summary = reprice_file(csv_orders, tmp_path / "priced.csv", "csv", "csv", workers=workers)
+    rows = read_csv(tmp_path / "priced.csv")
+
+    assert summary["rows"] == len(orders) + 1
+    assert summary["errors"] == 1
+    assert [float(row["delivery_fee"]) for row in rows[:-1]] == expected_fees()
+    assert rows[-1]["delivery_fee"] == ""
+    assert "Invalid delivery time" in rows[-1]["error"]
+
+
+def test_ndjson_round_trip_through_columnar(tmp_path):
+    source = tmp_path / "orders.ndjson"
+    source.write_text("".join(json.dumps(order) + "\n" for order in orders) + "{}\n")
+
+    reprice_file(source, tmp_path / "priced.col", "ndjson", "columnar", workers=2)
+    reprice_file(tmp_path / "priced.col", tmp_path / "priced.ndjson", "columnar", "ndjson", workers=1)
+    results = [json.loads(line) for line in (tmp_path / "priced.ndjson").read_text().splitlines()]
+
+    assert [result["delivery_fee"] for result in results[:-1]] == expected_fees()
+    assert results[2]["time"] == "2024-01-19T16:30:00Z"
+    assert results[-1]["delivery_fee"] is None and results[-1]["error"]
+
+
+def test_columnar_views_do_not_copy(tmp_path):
+    path = tmp_path / "orders.col"
+    values = np.arange(10, dtype=np.int64)
+    write_columnar(
+        path,
+        {
+            "cart_value": values,
+            "delivery_distance": values * 2,
+            "number_of_items": values % 3,
+            "time": np.full(10, np.datetime64("2024-01-19T13:00:00", "s")),
+        },
+    )
+    buffer = path.read_bytes()
+    rows, directory = read_columnar_directory(buffer)
+    views = columnar_views(buffer, directory, 4, 7)
+
+    assert rows == 10
+    assert views["delivery_distance"].tolist() == [8, 10, 12]
+    assert views["cart_value"].base is not None and not views["cart_value"].flags.writeable
+
+
+def test_line_ranges_end_on_newlines():
+    buffer = b"header\n" + b"".join(b"line %d\n" % number for number in range(100))
+    ranges = line_ranges(buffer, 7, 7)
+    assert ranges[0][0] == 7 and ranges[-1][1] == len(buffer)
+    assert all(buffer[stop - 1:stop] == b"\n" for _, stop in ranges)
+    assert b"".join(buffer[start:stop] for start, stop in ranges) == buffer[7:]
+
+
+def test_cli_reports_unknown_format(tmp_path, capsys):
+    assert main([str(tmp_path / "orders.xlsx"), str(tmp_path / "out.csv")]) == 2
+    assert "Cannot tell the format" in capsys.readouterr().err
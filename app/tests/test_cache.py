@@ -0,0 +1,92 @@
+import pytest
+from app.api.v1.delivery_fee_calculator.cache import QuoteCache, quote_cache
+from app.api.v1.delivery_fee_calculator.fee_plan import (get_fee_plan,
+                                                         rebuild_fee_plan)
+from app.config.settings import Settings
+from fastapi.testclient import TestClient
+
+payload = {
+    "cart_value": 800,
+    "delivery_distance": 1500,
+    "number_of_items": 5,
+    "time": "2024-01-19T13:00:00Z",
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+
+    return TestClient(app)
+
+
+def test_lru_eviction():
+    cache = QuoteCache(max_size=2, ttl_seconds=60)
+    cache.get("a", 1)
+    cache.put("a", 1, b"A")
+    cache.put("b", 1, b"B")
+    assert cache.get("a", 1) == b"A"
+    cache.put("c", 1, b"C")
+
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) == b"A"
+    assert cache.get("c", 1) == b"C"
+    assert cache.evictions == 1
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = QuoteCache(max_size=10, ttl_seconds=5, clock=clock)
+    cache.get("a", 1)
+    cache.put("a", 1, b"A")
+    clock.now = 4.9
+    assert cache.get("a", 1) == b"A"
+    clock.now = 5.0
+    assert cache.get("a", 1) is None
+    assert (cache.hits, cache.misses, cache.expirations) == (1, 2, 1)
+
+
+def test_new_version_drops_entries():
+    cache = QuoteCache(max_size=10, ttl_seconds=60)
+    cache.get("a", 1)
+    cache.put("a", 1, b"A")
+    assert cache.get("a", 2) is None
+    assert len(cache) == 0
+    cache.put("a", 1, b"stale")
+    assert len(cache) == 0
+
+
+def test_disabled_cache_stores_nothing():
+    cache = QuoteCache(max_size=0, ttl_seconds=60)
+    cache.get("a", 1)
+    cache.put("a", 1, b"A")
+    assert cache.get("a", 1) is None
+
+
+def test_endpoint_reuses_quotes_within_the_hour(client):
+    first = client.post("/api/v1/delivery-fee-calculator/", json=payload)
+    second = client.post(
+        "/api/v1/delivery-fee-calculator/",
+        json={**payload, "time": "2024-01-19T13:59:00Z"},
+    )
+    assert first.json() == second.json() == {"delivery_fee": 550}
+
+    stats = client.get("/api/v1/delivery-fee-calculator/cache").json()
+    assert stats["hits"] >= 1 and stats["size"] == 1
+    assert stats["version"] == get_fee_plan().version
+
+
+def test_endpoint_misses_after_settings_change(client, restore_fee_plan):
+    client.post("/api/v1/delivery-fee-calculator/", json=payload)
+    rebuild_fee_plan(Settings(DISTANCE_SURCHARGE=200))
+    response = client.post("/api/v1/delivery-fee-calculator/", json=payload)
+    assert response.json() == {"delivery_fee": 850}
+    assert quote_cache.version == get_fee_plan().version
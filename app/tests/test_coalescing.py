@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from app.api.v1.delivery_fee_calculator.coalescing import SingleFlight
+from app.benchmarks.coalescing import duplicated_load
+from fastapi.testclient import TestClient
+
+payload = {
+    "cart_value": 800,
+    "delivery_distance": 1500,
+    "number_of_items": 5,
+    "time": "2024-01-19T13:00:00Z",
+}
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+
+    return TestClient(app)
+
+
+def test_concurrent_identical_calls_share_one_computation():
+    flights = SingleFlight()
+    calls = []
+
+    async def compute(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return object()
+
+    async def main():
+        return await asyncio.gather(*(flights.run(key, lambda key=key: compute(key)) for key in "aaab"))
+
+    a1, a2, a3, b = asyncio.run(main())
+    assert a1 is a2 is a3
+    assert b is not a1
+    assert sorted(calls) == ["a", "b"]
+    assert flights.stats() == {"leaders": 2, "coalesced": 2, "in_flight": 0}
+
+
+def test_synchronous_computation_registers_no_flight():
+    flights = SingleFlight()
+    assert asyncio.run(flights.run("a", lambda: 42)) == 42
+    assert flights.stats() == {"leaders": 0, "coalesced": 0, "in_flight": 0}
+
+
+def test_errors_reach_every_caller():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("no zone")
+
+    async def main():
+        return await asyncio.gather(*(flights.run("a", fail) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(main())
+    assert [type(error) for error in errors] == [ValueError] * 3
+    assert len(flights) == 0
+
+
+def test_follower_takes_over_from_a_cancelled_leader():
+    flights = SingleFlight()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return calls
+
+    async def main():
+        leader = asyncio.create_task(flights.run("a", compute))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flights.run("a", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower, leader.cancelled()
+
+    assert asyncio.run(main()) == (2, True)
+    assert flights.coalesced == 0
+
+
+def test_duplicated_load_computes_each_cart_once():
+    direct = asyncio.run(duplicated_load(200, 4, None))
+    coalesced = asyncio.run(duplicated_load(200, 4, SingleFlight()))
+    assert direct["computations"] == 200
+    assert coalesced["computations"] == 4
+
+
+def test_coalescing_metrics_are_exposed(client):
+    assert client.post("/api/v1/delivery-fee-calculator/", json=payload).status_code == 200
+    text = client.get("/metrics").text
+    assert "# TYPE quote_coalesced_total counter" in text
+    assert "quote_flights_in_flight 0" in text
@@ -0,0 +1,102 @@
+import pytest
+from app.api.v1.delivery_fee_calculator.codec import (encode_quote,
+                                                      validate_quote_request)
+from app.api.v1.delivery_fee_calculator.schemas import \
+    DeliveryFeeCalculatorInputSchema
+from fastapi import FastAPI, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.testclient import TestClient
+
+ENDPOINT = "/api/v1/delivery-fee-calculator/"
+VALID = b'{"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}'
+
+BODIES = [
+    (VALID, "application/json"),
+    (VALID, None),
+    (VALID, "application/vnd.api+json; charset=utf-8"),
+    (VALID, "text/plain"),
+    (b"", "application/json"),
+    (b"null", "application/json"),
+    (b"[]", "application/json"),
+    (b'{"cart_value": 790', "application/json"),
+    (b'{"cart_value": "790", "delivery_distance": 2235.0, "number_of_items": 4, "time": "x"}', "application/json"),
+    (b'{"cart_value": 7.5, "delivery_distance": "far", "number_of_items": null}', "application/json"),
+    (b'{"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": 1705323600}', "application/json"),
+    (b'{"cart_value": 790, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}', "application/json"),
+    (b'{"cart_value": 790, "number_of_items": 4, "time": "2024-01-15T13:00:00Z", "venue_id": "a", "customer_location": {"lat": 60.2, "lon": 24.9}}', "application/json"),
+    (b'{"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z", "venue_id": "a"}', "application/json"),
+    (b'{"cart_value": 790, "number_of_items": 4, "time": "2024-01-15T13:00:00Z", "venue_id": "a", "customer_location": {"lat": 91, "lon": 0}}', "application/json"),
+]
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def model_client():
+    """A route validating the body the way FastAPI does, the reference for the fast path."""
+    app = FastAPI()
+
+    @app.post(ENDPOINT)
+    async def route(data: DeliveryFeeCalculatorInputSchema) -> dict:
+        return {}
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("body, content_type", BODIES)
+def test_validation_errors_match_a_model_body(client, model_client, body, content_type):
+    headers = {"Content-Type": content_type} if content_type else {}
+    expected = model_client.post(ENDPOINT, content=body, headers=headers)
+    response = client.post(ENDPOINT, content=body, headers=headers)
+    if expected.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY:
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json() == expected.json()
+    else:
+        assert response.status_code != status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_validate_quote_request_returns_the_model_fields():
+    data = validate_quote_request(VALID, "application/json")
+    assert data == DeliveryFeeCalculatorInputSchema.model_validate_json(VALID).model_dump()
+
+
+def test_validate_quote_request_rejects_a_missing_body():
+    with pytest.raises(RequestValidationError) as error:
+        validate_quote_request(b"", None)
+    assert error.value.errors()[0]["loc"] == ("body",)
+
+
+def test_validate_quote_request_reads_large_integers_exactly():
+    body = VALID.replace(b"790", b"100000000000000000000000")
+    assert validate_quote_request(body, "application/json")["cart_value"] == 10**23
+
+
+def test_encode_quote_follows_the_output_schema():
+    assert encode_quote(710) == b'{"delivery_fee":710}'
+    assert encode_quote(840.0) == b'{"delivery_fee":840}'
+    assert encode_quote(10**23) == b'{"delivery_fee":100000000000000000000000}'
+    with pytest.raises(ValueError):
+        encode_quote(840.5)
+
+
+def test_openapi_documents_the_schemas(client):
+    operation = client.get("/openapi.json").json()["paths"][ENDPOINT]["post"]
+    assert operation["requestBody"] == {
+        "content": {
+            "application/json": {
+                "schema": {"$ref": "#/components/schemas/DeliveryFeeCalculatorInputSchema"}
+            }
+        },
+        "required": True,
+    }
+    assert operation["responses"]["200"]["content"]["application/json"]["schema"] == {
+        "$ref": "#/components/schemas/DeliveryFeeCalculatorOutputSchema"
+    }
+    assert operation["responses"]["422"]["content"]["application/json"]["schema"] == {
+        "$ref": "#/components/schemas/HTTPValidationError"
+    }
@@ -110,3 +110,54 @@ def test_calculate_delivery_fee_exception_handling(client, monkeypatch) -> None:
     response = client.post("/api/v1/delivery-fee-calculator/", json=valid_payload)
     assert response.status_code == status.HTTP_400_BAD_REQUEST
     assert response.json() == {"detail": "Mocked exception"}
+
+
+def test_calculator_is_shared_across_requests(client) -> None:
+    calculator = client.app.state.fee_calculator
+    valid_payload = {
+        "cart_value": 800,
+        "delivery_distance": 1500,
+        "number_of_items": 5,
+        "time": mock_delivery_time,
+    }
+    client.post("/api/v1/delivery-fee-calculator/", json=valid_payload)
+    client.post("/api/v1/delivery-fee-calculator/batch", json=[valid_payload])
+    assert client.app.state.fee_calculator is calculator
+
+
+def test_calculator_follows_fee_plan_rebuild(client, restore_fee_plan) -> None:
+    from app.api.v1.delivery_fee_calculator.fee_plan import rebuild_fee_plan
+    from app.config.settings import Settings
+
+    plan = rebuild_fee_plan(Settings(DISTANCE_SURCHARGE=200))
+    valid_payload = {
+        "cart_value": 1000,
+        "delivery_distance": 1500,
+        "number_of_items": 5,
+        "time": mock_delivery_time,
+    }
+    response = client.post("/api/v1/delivery-fee-calculator/", json=valid_payload)
+    assert response.json() == {"delivery_fee": 650}
+    assert client.app.state.fee_calculator.plan is plan
+
+
+@pytest.mark.parametrize(
+    "query, headers",
+    [("?breakdown=true", {}), ("?breakdown=1", {}), ("", {"X-Fee-Breakdown": "true"})],
+)
+def test_breakdown_is_opt_in(client, query, headers) -> None:
+    valid_payload = {
+        "cart_value": 790,
+        "delivery_distance": 2235,
+        "number_of_items": 4,
+        "time": "2024-01-19T16:00:00Z",
+    }
+    compact = client.post("/api/v1/delivery-fee-calculator/", json=valid_payload)
+    detailed = client.post(f"/api/v1/delivery-fee-calculator/{query}", json=valid_payload, headers=headers)
+    assert compact.json() == {"delivery_fee": 852}
+    assert detailed.json()["delivery_fee"] == 852
+    assert detailed.json()["breakdown"]["rules"] == ["small_order_surcharge", "rush_hour"]
+    assert detailed.headers["X-Settings-Version"] == compact.headers["X-Settings-Version"]
+    # A false value, or another parameter, keeps the compact response.
+    other = client.post("/api/v1/delivery-fee-calculator/?breakdown=false&x=1", json=valid_payload)
+    assert other.json() == {"delivery_fee": 852}
@@ -0,0 +1,157 @@
+import pytest
+from app.api.v1.delivery_fee_calculator.fee_plan import (FeePlan, get_fee_plan,
+                                                         rebuild_fee_plan)
+from app.api.v1.delivery_fee_calculator.helpers import DeliveryFeeCalculator
+from app.config.settings import SETTINGS, Settings
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def plan():
+    return FeePlan(Settings(FEE_PLAN_MAX_ITEMS=20, FEE_PLAN_MAX_DISTANCE=3_000))
+
+
+def test_tables_match_formulas(plan):
+    for number_of_items in range(-2, 40):
+        assert plan.item_fee(number_of_items) == plan.compute_item_fee(number_of_items)
+    for delivery_distance in range(-600, 6_000):
+        assert plan.distance_fee(delivery_distance) == plan.compute_distance_fee(
+            delivery_distance
+        )
+
+
+@pytest.mark.parametrize(
+    "day_of_week, utc_hour, expected_rush",
+    [(5, 14, False), (5, 15, True), (5, 19, True), (5, 20, False), (4, 16, False)],
+)
+def test_rush_hours(plan, day_of_week, utc_hour, expected_rush):
+    expected = plan.settings.FRIDAY_RUSH_MULTIPLIER if expected_rush else 1.0
+    assert plan.rush_multipliers[(day_of_week - 1) * 24 + utc_hour] == expected
+
+
+def test_rush_schedule_replaces_the_friday_window():
+    plan = FeePlan(Settings(RUSH_SCHEDULE="mon-fri 7-9 1.1, sat 12, fri 8 1.5", FRIDAY_RUSH_MULTIPLIER=1.3))
+    multipliers = {
+        (day_of_week, utc_hour): plan.rush_multipliers[(day_of_week - 1) * 24 + utc_hour]
+        for day_of_week in range(1, 8)
+        for utc_hour in range(24)
+    }
+    rush = {hour: multiplier for hour, multiplier in multipliers.items() if multiplier != 1.0}
+    assert rush == {
+        **{(day_of_week, utc_hour): 1.1 for day_of_week in range(1, 6) for utc_hour in (7, 8, 9)},
+        (5, 8): 1.5,
+        (6, 12): 1.3,
+    }
+    assert plan.fee(800, 1500, 5, 1, 8) == pytest.approx(550 * 1.1)
+    assert plan.fee(800, 1500, 5, 5, 16) == 550
+
+
+@pytest.mark.parametrize("schedule", ["fri", "fri 20-19", "fri 24", "funday 12", "fri 12 -1", "fri 12 x"])
+def test_invalid_rush_schedules_are_rejected(schedule):
+    with pytest.raises(ValueError):
+        Settings(RUSH_SCHEDULE=schedule)
+
+
+def test_surge_multiplies_on_top_of_rush_before_the_cap(plan):
+    rush = plan.settings.FRIDAY_RUSH_MULTIPLIER
+    assert plan.fee(800, 1500, 5, 5, 16, surge=1.5) == pytest.approx(550 * rush * 1.5)
+    assert plan.fee(800, 1500, 5, 5, 13, surge=1.5) == pytest.approx(550 * 1.5)
+    assert plan.fee(800, 1500, 5, 5, 13, surge=10.0) == plan.max_delivery_fee
+    stage_times = []
+    assert plan.timed_fee(800, 1500, 5, 5, 16, stage_times, surge=1.5) == plan.fee(
+        800, 1500, 5, 5, 16, surge=1.5
+    )
+
+
+@pytest.mark.parametrize(
+    "cart_value, delivery_distance, number_of_items, day_of_week, utc_hour",
+    [
+        (800, 1500, 5, 5, 13),
+        (790, 2235, 4, 5, 16),
+        (100, 25_000, 150, 5, 16),
+        (SETTINGS.FREE_DELIVERY_THRESHOLD, 1500, 5, 5, 16),
+    ],
+)
+def test_fast_path_matches_method_chain(
+    plan, cart_value, delivery_distance, number_of_items, day_of_week, utc_hour
+):
+    if cart_value >= plan.free_delivery_threshold:
+        expected = 0
+    else:
+        expected = plan.apply_rush_and_cap(
+            plan.cart_fee(cart_value)
+            + plan.distance_fee(delivery_distance)
+            + plan.item_fee(number_of_items),
+            day_of_week,
+            utc_hour,
+        )
+    assert (
+        plan.fee(cart_value, delivery_distance, number_of_items, day_of_week, utc_hour)
+        == expected
+    )
+
+
+@pytest.mark.parametrize(
+    "cart_value, delivery_distance, number_of_items, day_of_week, utc_hour, surge",
+    [
+        (800, 1500, 5, 5, 13, 1.0),
+        (790, 2235, 4, 5, 16, 1.0),
+        (100, 25_000, 150, 5, 16, 1.0),
+        (800, 1500, 5, 5, 13, 1.5),
+        (SETTINGS.FREE_DELIVERY_THRESHOLD, 1500, 5, 5, 16, 1.0),
+    ],
+)
+def test_breakdown_matches_fee(
+    plan, cart_value, delivery_distance, number_of_items, day_of_week, utc_hour, surge
+):
+    arguments = (cart_value, delivery_distance, number_of_items, day_of_week, utc_hour)
+    result = plan.fee_breakdown(*arguments, surge=surge)
+    assert result["delivery_fee"] == plan.fee(*arguments, surge=surge)
+    breakdown = result["breakdown"]
+    assert breakdown["base_fee"] == breakdown["cart_fee"] + breakdown["distance_fee"] + breakdown["item_fee"]
+
+
+def test_breakdown_reports_the_rules_that_fired(plan):
+    assert plan.fee_breakdown(790, 2235, 4, 5, 16)["breakdown"] == {
+        "cart_fee": 210,
+        "distance_fee": 500,
+        "item_fee": 0,
+        "base_fee": 710,
+        "rush_multiplier": plan.settings.FRIDAY_RUSH_MULTIPLIER,
+        "surge_multiplier": 1.0,
+        "zone": None,
+        "rules": ["small_order_surcharge", "rush_hour"],
+    }
+    assert plan.fee_breakdown(100, 25_000, 150, 5, 13, surge=1.2)["breakdown"]["rules"] == [
+        "small_order_surcharge",
+        "item_surcharge",
+        "bulk_item_fee",
+        "surge",
+        "max_delivery_fee",
+    ]
+    assert plan.fee_breakdown(plan.free_delivery_threshold, 1500, 5, 5, 16)["breakdown"]["rules"] == [
+        "free_delivery"
+    ]
+
+
+def test_version_depends_only_on_settings():
+    assert FeePlan(Settings()).version == FeePlan(Settings()).version
+    assert FeePlan(Settings()).version != FeePlan(Settings(DISTANCE_SURCHARGE=150)).version
+
+
+def test_rebuild_swaps_active_plan(restore_fee_plan):
+    from app.main import app
+
+    client = TestClient(app)
+    payload = {
+        "cart_value": 1000,
+        "delivery_distance": 1500,
+        "number_of_items": 5,
+        "time": "2024-01-19T13:00:00Z",
+    }
+    new_plan = rebuild_fee_plan(Settings(DISTANCE_SURCHARGE=200))
+
+    assert get_fee_plan() is new_plan
+    assert DeliveryFeeCalculator().plan is new_plan
+    response = client.post("/api/v1/delivery-fee-calculator/", json=payload)
+    assert response.json() == {"delivery_fee": 650}
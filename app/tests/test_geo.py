@@ -0,0 +1,130 @@
+import json
+
+import pytest
+from app.api.v1.delivery_fee_calculator import geo
+from app.api.v1.delivery_fee_calculator.geo import (VenueIndex,
+                                                    haversine_meters,
+                                                    haversine_meters_array,
+                                                    load_venue_index)
+from fastapi import status
+from fastapi.testclient import TestClient
+
+ENDPOINT = "/api/v1/delivery-fee-calculator/"
+VENUE = {"lat": 60.17012, "lon": 24.92813}
+CUSTOMER = {"lat": 60.18, "lon": 24.95}
+
+payload = {
+    "cart_value": 800,
+    "number_of_items": 5,
+    "time": "2024-01-19T13:00:00Z",
+}
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def venues(tmp_path):
+    """Load two venues from a CSV file and restore the original venues after the test."""
+    original = geo.get_venue_index()
+    path = tmp_path / "venues.csv"
+    path.write_text(f"id,lat,lon\nkamppi,{VENUE['lat']},{VENUE['lon']}\nfar,61.4978,23.761\n")
+    yield load_venue_index(str(path))
+    geo._venue_index = original
+
+
+def test_haversine_matches_known_distances():
+    # One degree of latitude along a meridian.
+    assert haversine_meters(0, 0, 1, 0) == pytest.approx(111_195, abs=1)
+    assert haversine_meters(60.1699, 24.9384, 61.4978, 23.761) == pytest.approx(160_500, rel=0.01)
+    assert haversine_meters(10, 20, 10, 20) == 0.0
+
+
+def test_vectorized_haversine_matches_scalar():
+    points = [(60.1, 24.9, 60.2, 25.0), (0, 0, 0, 179.9), (-33.9, 151.2, 51.5, -0.1)]
+    distances = haversine_meters_array(*zip(*points))
+    assert distances.tolist() == pytest.approx([haversine_meters(*point) for point in points])
+
+
+def test_venue_index_loads_geojson(tmp_path):
+    path = tmp_path / "venues.geojson"
+    path.write_text(
+        json.dumps(
+            {
+                "type": "FeatureCollection",
+                "features": [
+                    {"type": "Feature", "id": "a", "geometry": {"type": "Point", "coordinates": [24.9, 60.1]}},
+                    {"type": "Feature", "properties": {"id": 7}, "geometry": {"type": "Point", "coordinates": [23.7, 61.4]}},
+                ],
+            }
+        )
+    )
+    index = VenueIndex.from_file(str(path))
+    assert len(index) == 2
+    assert index.coordinates("a") == (60.1, 24.9)
+    assert index.coordinates("7") == (61.4, 23.7)
+    with pytest.raises(ValueError, match="Unknown venue 'b'"):
+        index.coordinates("b")
+
+
+def test_venue_index_rejects_malformed_files(tmp_path):
+    path = tmp_path / "venues.csv"
+    path.write_text("id,lat\na,60.1\n")
+    with pytest.raises(ValueError, match="Malformed"):
+        VenueIndex.from_file(str(path))
+    with pytest.raises(ValueError, match="listed twice"):
+        VenueIndex([("a", 1.0, 2.0), ("a", 3.0, 4.0)])
+    with pytest.raises(ValueError):
+        VenueIndex([("a", 91.0, 2.0)])
+
+
+def test_coordinates_price_like_the_computed_distance(client, venues):
+    distance = round(haversine_meters(VENUE["lat"], VENUE["lon"], CUSTOMER["lat"], CUSTOMER["lon"]))
+    expected = client.post(ENDPOINT, json={**payload, "delivery_distance": distance}).json()
+
+    by_location = client.post(ENDPOINT, json={**payload, "venue_location": VENUE, "customer_location": CUSTOMER})
+    by_id = client.post(ENDPOINT, json={**payload, "venue_id": "kamppi", "customer_location": CUSTOMER})
+    assert by_location.json() == by_id.json() == expected
+
+
+def test_unknown_venue_is_rejected(client, venues):
+    response = client.post(ENDPOINT, json={**payload, "venue_id": "nowhere", "customer_location": CUSTOMER})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == {"detail": "Unknown venue 'nowhere'"}
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {},
+        {"customer_location": CUSTOMER},
+        {"venue_id": "kamppi"},
+        {"venue_id": "kamppi", "venue_location": VENUE, "customer_location": CUSTOMER},
+        {"delivery_distance": 1500, "venue_id": "kamppi", "customer_location": CUSTOMER},
+    ],
+)
+def test_distance_must_be_given_exactly_once(client, fields):
+    response = client.post(ENDPOINT, json={**payload, **fields})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_batch_computes_distances_together(client, venues):
+    carts = [
+        {**payload, "delivery_distance": 1500},
+        {**payload, "venue_id": "kamppi", "customer_location": CUSTOMER},
+        {**payload, "venue_id": "nowhere", "customer_location": CUSTOMER},
+        {**payload, "venue_id": "far", "customer_location": CUSTOMER},
+        {**payload, "customer_location": CUSTOMER},
+    ]
+    results = client.post(f"{ENDPOINT}batch", json=carts).json()["results"]
+    singles = [client.post(ENDPOINT, json=cart) for cart in carts]
+
+    assert [result["delivery_fee"] for result in results] == [
+        response.json()["delivery_fee"] if response.status_code == 200 else None for response in singles
+    ]
+    assert results[2]["error"] == "Unknown venue 'nowhere'"
+    assert results[4]["error"] is not None
@@ -0,0 +1,85 @@
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+import pytest
+from app.server.launcher import available_cores, event_loop_and_parser
+
+CART = {"cart_value": 790, "delivery_distance": 2235, "number_of_items": 4, "time": "2024-01-15T13:00:00Z"}
+
+
+class LauncherProcess:
+    """A launcher running in a subprocess, with its log collected line by line."""
+
+    def __init__(self, *args: str):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "app.server.launcher", "--port", "0", *args],
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        self.lines: list[str] = []
+        threading.Thread(target=self._collect, daemon=True).start()
+
+    def _collect(self) -> None:
+        for line in self.process.stderr:
+            self.lines.append(line)
+
+    def wait_for(self, pattern: str, count: int = 1, timeout: float = 20.0) -> list[re.Match]:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            matches = [match for line in list(self.lines) if (match := re.search(pattern, line))]
+            if len(matches) >= count:
+                return matches
+            time.sleep(0.05)
+        raise AssertionError(f"{pattern!r} not logged {count} times:\n{''.join(self.lines)}")
+
+
+@pytest.fixture
+def launcher():
+    launchers = []
+
+    def start(*args: str) -> LauncherProcess:
+        launchers.append(LauncherProcess(*args))
+        return launchers[-1]
+
+    yield start
+    for process in launchers:
+        if process.process.poll() is None:
+            process.process.kill()
+            process.process.wait()
+
+
+def test_available_cores():
+    assert 1 <= available_cores() <= (os.cpu_count() or 1)
+
+
+def test_event_loop_and_parser():
+    loop, http = event_loop_and_parser()
+    assert loop in ("uvloop", "asyncio")
+    assert http in ("httptools", "h11")
+
+
+def test_workers_are_recycled_reloaded_and_drained(launcher):
+    process = launcher("--workers", "2", "--max-requests", "3", "--graceful-timeout", "5")
+    port = process.wait_for(r"Starting 2 workers on 127\.0\.0\.1:(\d+)")[0].group(1)
+    process.wait_for(r"Worker \d+ ready in [\d.]+ ms", count=2)
+    url = f"http://127.0.0.1:{port}/api/v1/delivery-fee-calculator/"
+
+    # Every request succeeds while workers reach their limit and are replaced.
+    statuses = [httpx.post(url, json=CART).status_code for _ in range(20)]
+    assert statuses == [200] * 20
+    replaced = len(process.wait_for(r"Worker \d+ replaced", count=2))
+
+    # SIGHUP replaces every running worker, and requests keep succeeding meanwhile.
+    os.kill(process.process.pid, signal.SIGHUP)
+    process.wait_for(r"Worker \d+ replaced", count=replaced + 2)
+    assert httpx.post(url, json=CART).status_code == 200
+
+    os.kill(process.process.pid, signal.SIGTERM)
+    assert process.process.wait(timeout=20) == 0
+    assert not any("unexpectedly" in line for line in process.lines)
@@ -0,0 +1,138 @@
+import threading
+
+import pytest
+from app.api.metrics.registry import (REGISTRY, CounterChild, Metric,
+                                      MetricsRegistry)
+from app.api.metrics.stages import STAGES, StageSampler, stage_sampler
+from app.api.v1.delivery_fee_calculator.fee_plan import get_fee_plan
+from app.api.v1.delivery_fee_calculator.helpers import DeliveryFeeCalculator
+from app.api.v1.delivery_fee_calculator.timestamps import \
+    weekday_and_hour_of_bucket
+from fastapi.testclient import TestClient
+
+payload = {
+    "cart_value": 800,
+    "delivery_distance": 1500,
+    "number_of_items": 5,
+    "time": "2024-01-19T13:00:00Z",
+}
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+
+    return TestClient(app)
+
+
+def metric_value(text: str, prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{prefix} not found")
+
+
+def test_counter_merges_thread_shards():
+    counter = MetricsRegistry().counter("test_total", "Test.", ("kind",))
+
+    def work():
+        for _ in range(1000):
+            counter.labels("a").inc()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.labels("a").inc()
+    assert counter.labels("a").value() == 4001
+
+
+def test_histogram_exposition():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("test_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.labels("/").observe(value)
+    text = registry.expose()
+
+    assert '# TYPE test_seconds histogram' in text
+    assert 'test_seconds_bucket{route="/",le="0.1"} 2' in text
+    assert 'test_seconds_bucket{route="/",le="1.0"} 3' in text
+    assert 'test_seconds_bucket{route="/",le="+Inf"} 4' in text
+    assert 'test_seconds_count{route="/"} 4' in text
+
+
+def test_stage_sampler_samples_one_in_every():
+    sampler = StageSampler(every=3)
+    assert [sampler.should_sample() for _ in range(6)] == [False, False, True] * 2
+    assert not any(StageSampler(every=0).should_sample() for _ in range(10))
+
+
+def stage_counts() -> list[float]:
+    text = REGISTRY.expose()
+    return [
+        metric_value(text, f'fee_stage_duration_seconds_count{{stage="{stage}"}}')
+        if f'stage="{stage}"' in text
+        else 0
+        for stage in STAGES
+    ]
+
+
+def test_metric_subclass_must_implement_exposition():
+    class Incomplete(Metric):
+        def _new_child(self):
+            return CounterChild()
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete", "Test.")
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        (800, 1500, 5, 4, 13),
+        (100, 30_000, 20, 5, 16),
+        (900, 0, 13, 5, 19),
+        (20_000, 1500, 5, 5, 16),
+    ],
+)
+def test_timed_fee_matches_fee(args):
+    plan = get_fee_plan()
+    stage_times = []
+    assert plan.timed_fee(*args, stage_times) == plan.fee(*args)
+    assert len(stage_times) == (0 if args[0] >= plan.free_delivery_threshold else 4)
+
+
+def test_sampled_request_records_stages_of_the_real_quote(client, monkeypatch):
+    monkeypatch.setattr(stage_sampler, "every", 1)
+    monkeypatch.setattr(stage_sampler, "_countdown", 1)
+    weekday_and_hour_of_bucket.cache_clear()
+    before = stage_counts()
+
+    response = client.post("/api/v1/delivery-fee-calculator/", json=payload)
+    assert response.json() == {
+        "delivery_fee": DeliveryFeeCalculator().calculate_delivery_fee(*payload.values())
+    }
+    assert [after - count for after, count in zip(stage_counts(), before)] == [1] * len(STAGES)
+    # The timed parse was the request's first one, so it resolved the hour bucket itself.
+    assert weekday_and_hour_of_bucket.cache_info().misses == 1
+
+
+def test_metrics_endpoint_reports_routes(client):
+    route = 'route="/api/v1/delivery-fee-calculator/",method="POST"'
+    before = client.get("/metrics").text
+    count_before = (
+        metric_value(before, f"http_request_duration_seconds_count{{{route}}}")
+        if route in before
+        else 0
+    )
+    client.post("/api/v1/delivery-fee-calculator/", json=payload)
+    client.post("/api/v1/delivery-fee-calculator/", json={**payload, "time": "invalid"})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert metric_value(text, f"http_request_duration_seconds_count{{{route}}}") == count_before + 2
+    assert metric_value(text, f'http_requests_total{{{route},status="400"}}') >= 1
+    assert "quote_cache_hits_total" in text
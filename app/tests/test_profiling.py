@@ -0,0 +1,131 @@
+import asyncio
+import json
+import threading
+import time
+
+from app.api.profiling.sampler import StackSampler
+from app.api.profiling.timings import route_timings
+from app.api.v1.delivery_fee_calculator.fee_plan import rebuild_fee_plan
+from app.config.settings import Settings
+from app.server.setup import create_app, profile_startup
+from fastapi.testclient import TestClient
+
+ENDPOINT = "/api/v1/delivery-fee-calculator/"
+TOKEN = "secret"
+AUTHORIZATION = {"Authorization": f"Bearer {TOKEN}"}
+
+payload = {
+    "cart_value": 800,
+    "delivery_distance": 1500,
+    "number_of_items": 5,
+    "time": "2024-01-19T13:00:00Z",
+}
+
+
+def spin(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+def sample_spinning_thread(sampler: StackSampler) -> None:
+    spinner = threading.Thread(target=spin, args=(0.2,), name="spinner")
+    sampling = threading.Thread(target=lambda: asyncio.run(sampler.run_for(0.2)))
+    spinner.start()
+    sampling.start()
+    sampling.join()
+    spinner.join()
+
+
+def test_admin_routes_need_the_token(restore_fee_plan):
+    with TestClient(create_app()) as client:
+        assert client.post("/admin/profile?seconds=0.01").status_code == 404
+        assert client.get("/admin/routes").status_code == 404
+
+    rebuild_fee_plan(Settings(ADMIN_TOKEN=TOKEN))
+    with TestClient(create_app()) as client:
+        response = client.get("/admin/routes", headers={"Authorization": "Bearer wrong"})
+        assert response.status_code == 401
+        assert response.headers["www-authenticate"] == "Bearer"
+        assert client.get("/admin/routes").status_code == 401
+        assert client.get("/admin/routes", headers=AUTHORIZATION).status_code == 200
+
+
+def test_sampler_records_the_stacks_of_other_threads():
+    sampler = StackSampler(interval=0.005)
+    sample_spinning_thread(sampler)
+    assert not sampler.running
+    assert sampler.duration >= 0.2
+    lines = sampler.collapsed().splitlines()
+    spinning = [line for line in lines if line.startswith("spinner;") and "spin (" in line]
+    assert spinning
+    stack, count = spinning[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert stack.split(";")[-1].startswith("spin (")
+
+
+def test_sampler_interrupts_the_main_thread_for_cpu_time():
+    sampler = StackSampler(interval=0.005)
+    sampler.start()
+    try:
+        assert sampler.mode == "cpu"
+        spin(0.2)
+    finally:
+        sampler.stop()
+    assert any(
+        thread == "MainThread" and stack[-1].co_name == "spin" for thread, stack in sampler.samples
+    )
+
+
+def test_speedscope_profile_has_one_profile_per_thread():
+    sampler = StackSampler(interval=0.005)
+    sample_spinning_thread(sampler)
+    document = sampler.speedscope("test")
+    frames = document["shared"]["frames"]
+    profiles = {profile["name"]: profile for profile in document["profiles"]}
+    assert document["name"] == "test"
+    assert "spinner" in profiles
+    spinner = profiles["spinner"]
+    assert len(spinner["samples"]) == len(spinner["weights"])
+    assert spinner["endValue"] == sum(spinner["weights"])
+    assert any(frames[stack[-1]]["name"] == "spin" for stack in spinner["samples"])
+
+
+def test_profile_endpoint(restore_fee_plan):
+    rebuild_fee_plan(Settings(ADMIN_TOKEN=TOKEN, PROFILER_MAX_SECONDS=1))
+    with TestClient(create_app()) as client:
+        response = client.post("/admin/profile?seconds=2", headers=AUTHORIZATION)
+        assert response.status_code == 400
+
+        response = client.post("/admin/profile?seconds=0.2&interval=0.005", headers=AUTHORIZATION)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in response.text.splitlines())
+
+        response = client.post(
+            "/admin/profile?seconds=0.2&interval=0.005&format=speedscope", headers=AUTHORIZATION
+        )
+        assert response.status_code == 200
+        assert response.json()["$schema"] == "https://www.speedscope.app/file-format-schema.json"
+
+
+def test_route_timings(restore_fee_plan):
+    rebuild_fee_plan(Settings(ADMIN_TOKEN=TOKEN))
+    route_timings.reset()
+    with TestClient(create_app()) as client:
+        for _ in range(3):
+            assert client.post(ENDPOINT, json=payload).status_code == 200
+        timings = client.get("/admin/routes", headers=AUTHORIZATION).json()
+    quotes = [timing for timing in timings if timing["route"] == ENDPOINT]
+    assert len(quotes) == 1
+    assert quotes[0]["method"] == "POST"
+    assert quotes[0]["calls"] == 3
+    assert 0 < quotes[0]["mean_seconds"] <= quotes[0]["max_seconds"] <= quotes[0]["total_seconds"]
+
+
+def test_startup_profile_is_saved(tmp_path):
+    asyncio.run(profile_startup(0.05, 0.005, str(tmp_path)))
+    paths = list(tmp_path.iterdir())
+    assert len(paths) == 1
+    assert paths[0].name.endswith(".speedscope.json")
+    assert "profiles" in json.loads(paths[0].read_bytes())
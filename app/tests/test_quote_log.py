@@ -0,0 +1,136 @@
+import asyncio
+import gzip
+import json
+from datetime import datetime, timezone
+
+from app.api.v1.delivery_fee_calculator.fee_plan import (get_fee_plan,
+                                                         rebuild_fee_plan)
+from app.api.v1.delivery_fee_calculator.quote_log import (QuoteLog,
+                                                          encode_record,
+                                                          quote_log)
+from app.config.settings import Settings
+from app.server.setup import create_app
+from fastapi.testclient import TestClient
+
+ENDPOINT = "/api/v1/delivery-fee-calculator/"
+TIME = datetime(2024, 1, 19, 13, tzinfo=timezone.utc)
+
+payload = {
+    "cart_value": 800,
+    "delivery_distance": 1500,
+    "number_of_items": 5,
+    "time": "2024-01-19T13:00:00Z",
+}
+
+
+def record(number: int = 0) -> tuple:
+    return (1700000000.5, 3, 800 + number, 1500, 5, TIME, None, 1.0, b'{"delivery_fee":710}')
+
+
+def read_lines(directory) -> list[dict]:
+    lines = []
+    for path in sorted(directory.iterdir()):
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rb") as file:
+            lines.extend(json.loads(line) for line in file)
+    return lines
+
+
+def test_record_splices_the_served_body():
+    assert json.loads(encode_record(record())) == {
+        "logged_at": 1700000000.5,
+        "settings_version": 3,
+        "cart_value": 800,
+        "delivery_distance": 1500,
+        "number_of_items": 5,
+        "time": "2024-01-19T13:00:00+00:00",
+        "zone": None,
+        "surge": 1.0,
+        "quote": {"delivery_fee": 710},
+    }
+
+
+def test_batches_are_written_to_rotating_files(tmp_path):
+    log = QuoteLog(flush_interval=60, max_file_bytes=1_000)
+
+    async def main():
+        log.start(str(tmp_path))
+        for number in range(25):
+            assert log.offer(record(number))
+            if number % 10 == 9:
+                await log.flush()
+        await log.stop()
+
+    asyncio.run(main())
+    assert [line["cart_value"] for line in read_lines(tmp_path)] == list(range(800, 825))
+    # Two batches of 10, then the last 5 on stop; each batch fills its file past 1000 bytes.
+    assert (log.written, log.flushes, log.dropped, log.depth) == (25, 3, 0, 0)
+    assert len(list(tmp_path.iterdir())) == 3
+
+
+def test_full_batch_wakes_the_writer(tmp_path):
+    log = QuoteLog(batch_size=2, flush_interval=60)
+
+    async def main():
+        log.start(str(tmp_path))
+        log.offer(record(0))
+        log.offer(record(1))
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if log.written:
+                break
+        written = log.written
+        await log.stop()
+        return written
+
+    assert asyncio.run(main()) == 2
+
+
+def test_compressed_files(tmp_path):
+    log = QuoteLog(compress=True)
+
+    async def main():
+        log.start(str(tmp_path))
+        log.offer(record())
+        await log.stop()
+
+    asyncio.run(main())
+    assert [path.suffix for path in tmp_path.iterdir()] == [".gz"]
+    assert read_lines(tmp_path)[0]["quote"] == {"delivery_fee": 710}
+
+
+def test_drop_policy_counts_overflow():
+    log = QuoteLog(queue_size=2)
+    assert all(log.offer(record(number)) for number in range(3))
+    assert (log.depth, log.dropped) == (2, 1)
+
+
+def test_block_policy_waits_for_the_next_flush(tmp_path):
+    log = QuoteLog(queue_size=2, overflow="block", flush_interval=60)
+
+    async def main():
+        log.start(str(tmp_path))
+        assert log.offer(record(0)) and log.offer(record(1))
+        assert not log.offer(record(2))
+        await asyncio.wait_for(log.put(record(2)), 5)
+        await log.stop()
+
+    asyncio.run(main())
+    assert (log.written, log.dropped, log.blocked) == (3, 0, 1)
+    assert [line["cart_value"] for line in read_lines(tmp_path)] == [800, 801, 802]
+
+
+def test_endpoint_records_quotes(tmp_path, restore_fee_plan):
+    rebuild_fee_plan(Settings(QUOTE_LOG_DIR=str(tmp_path)))
+    try:
+        with TestClient(create_app()) as client:
+            fee = client.post(ENDPOINT, json=payload).json()["delivery_fee"]
+            client.post(ENDPOINT, json=payload)
+            assert "quote_log_queue_depth" in client.get("/metrics").text
+        lines = read_lines(tmp_path)
+        assert len(lines) == 2
+        assert lines[0]["quote"] == {"delivery_fee": fee}
+        assert lines[0]["settings_version"] == get_fee_plan().version
+        assert lines[0]["time"] == payload["time"]
+    finally:
+        quote_log.written = quote_log.flushes = 0
@@ -0,0 +1,135 @@
+import json
+import logging
+import os
+
+import pytest
+from app.api.metrics.stages import stage_sampler
+from app.api.v1.delivery_fee_calculator.cache import quote_cache
+from app.api.v1.delivery_fee_calculator.fee_plan import (get_fee_plan,
+                                                         rebuild_fee_plan)
+from app.config.reloader import SettingsReloader
+from app.config.settings import Settings
+from app.server.setup import apply_settings, create_app
+from fastapi.testclient import TestClient
+
+payload = {
+    "cart_value": 1000,
+    "delivery_distance": 1500,
+    "number_of_items": 5,
+    "time": "2024-01-19T13:00:00Z",
+}
+
+
+def touch(path, content):
+    path.write_text(content)
+    # Make sure the change is visible even on filesystems with coarse timestamps.
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.mark.parametrize(
+    "file_name, content",
+    [
+        ("fees.json", json.dumps({"DISTANCE_SURCHARGE": 200})),
+        ("fees.toml", "DISTANCE_SURCHARGE = 200\n"),
+        ("fees.env", "DISTANCE_SURCHARGE=200\n"),
+    ],
+)
+def test_reloads_changed_file(tmp_path, file_name, content):
+    reloaded = []
+    path = tmp_path / file_name
+    reloader = SettingsReloader(path, 1, reloaded.append)
+    assert reloader.check() is False
+
+    touch(path, content)
+    assert reloader.check() is True
+    assert reloaded[0].DISTANCE_SURCHARGE == 200
+    assert reloader.check() is False
+
+
+@pytest.mark.parametrize(
+    "content",
+    ["{not json", json.dumps({"DISTANCE_SURCHARGE": "a lot"}), json.dumps([1, 2])],
+)
+def test_ignores_invalid_file(tmp_path, content):
+    reloaded = []
+    path = tmp_path / "fees.json"
+    reloader = SettingsReloader(path, 1, reloaded.append)
+    touch(path, content)
+    assert reloader.check() is False
+    assert reloaded == []
+
+
+def test_snapshots_are_immutable():
+    with pytest.raises(ValueError):
+        Settings().DISTANCE_SURCHARGE = 200
+
+
+def test_reload_updates_version_header(tmp_path, restore_fee_plan):
+    client = TestClient(create_app())
+    before = client.post("/api/v1/delivery-fee-calculator/", json=payload)
+
+    path = tmp_path / "fees.json"
+    reloader = SettingsReloader(path, 1, rebuild_fee_plan)
+    touch(path, json.dumps({"DISTANCE_SURCHARGE": 200}))
+    reloader.check()
+    after = client.post("/api/v1/delivery-fee-calculator/", json=payload)
+
+    assert before.json() == {"delivery_fee": 350}
+    assert after.json() == {"delivery_fee": 650}
+    assert after.headers["X-Settings-Version"] == str(get_fee_plan().version)
+    assert after.headers["X-Settings-Version"] != before.headers["X-Settings-Version"]
+
+
+def test_lifespan_starts_and_stops_reloader():
+    app = create_app()
+    with TestClient(app):
+        assert app.state.settings_reloader._task is not None
+    assert app.state.settings_reloader._task is None
+
+
+@pytest.mark.parametrize(
+    "file_name, content",
+    [
+        ("fees.json", json.dumps({"DISTANCE_SURCHARGE": 200})),
+        ("fees.env", "DISTANCE_SURCHARGE=200\n"),
+    ],
+)
+def test_environment_takes_precedence_over_file(tmp_path, monkeypatch, file_name, content):
+    monkeypatch.setenv("DISTANCE_SURCHARGE", "300")
+    path = tmp_path / file_name
+    path.write_text(content)
+    assert SettingsReloader(path, 1, print).load().DISTANCE_SURCHARGE == 300
+
+
+def test_startup_applies_watched_file(tmp_path, restore_fee_plan):
+    path = tmp_path / "fees.json"
+    path.write_text(json.dumps({"DISTANCE_SURCHARGE": 200, "CONFIG_RELOAD_FILE": str(path)}))
+    rebuild_fee_plan(Settings(CONFIG_RELOAD_FILE=str(path)))
+    with TestClient(create_app()) as client:
+        response = client.post("/api/v1/delivery-fee-calculator/", json=payload)
+    assert response.json() == {"delivery_fee": 650}
+
+
+def test_apply_settings_updates_running_services(monkeypatch, caplog, restore_fee_plan):
+    monkeypatch.setattr(quote_cache, "max_size", quote_cache.max_size)
+    monkeypatch.setattr(quote_cache, "ttl_seconds", quote_cache.ttl_seconds)
+    monkeypatch.setattr(stage_sampler, "every", stage_sampler.every)
+    monkeypatch.setattr(stage_sampler, "_countdown", stage_sampler._countdown)
+    app = create_app()
+    startup = get_fee_plan().settings
+    reloaded = Settings(
+        QUOTE_CACHE_MAX_SIZE=5,
+        QUOTE_CACHE_TTL_SECONDS=1.0,
+        STAGE_TIMING_SAMPLE_RATE=3,
+        HEALTH_SAMPLE_INTERVAL_SECONDS=7.0,
+        METRICS_ENABLED=not startup.METRICS_ENABLED,
+    )
+    with caplog.at_level(logging.WARNING):
+        apply_settings(app, startup, reloaded)
+
+    assert get_fee_plan().settings is reloaded
+    assert (quote_cache.max_size, quote_cache.ttl_seconds) == (5, 1.0)
+    assert stage_sampler.every == (3 if startup.METRICS_ENABLED else 0)
+    assert app.state.resource_sampler.interval == 7.0
+    assert "METRICS_ENABLED changed" in caplog.text
@@ -0,0 +1,122 @@
+import multiprocessing
+import os
+
+import pytest
+from app.api.v1.delivery_fee_calculator.cache import (QUOTE_CACHE_COUNTERS,
+                                                      QuoteCache, quote_cache)
+from app.api.v1.delivery_fee_calculator.fee_plan import rebuild_fee_plan
+from app.config.settings import Settings
+from app.server import setup
+from app.shared.counters import PID, Counters, SharedCounters
+from app.shared.region import HEADER_SIZE
+from app.shared.snapshot import SharedSnapshot
+from app.shared.table import MAX_KEY_BYTES, SharedTable
+from fastapi.testclient import TestClient
+
+fork = multiprocessing.get_context("fork")
+
+
+def in_child(target, *args):
+    process = fork.Process(target=target, args=args)
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+
+
+def test_table_round_trip(tmp_path):
+    table = SharedTable(tmp_path / "table", 64)
+    assert table.get(b"a", 1, 0.0) is None
+    assert table.put(b"a", b"A", 1, 10.0, 0.0)
+    assert table.get(b"a", 1, 9.9) == b"A"
+    assert table.get(b"a", 2, 9.9) is None
+    assert table.get(b"a", 1, 10.0) is None
+    table.put(b"a", b"AA", 2, 10.0, 0.0)
+    assert table.get(b"a", 2, 0.0) == b"AA"
+    assert len(table) == 1
+    assert not table.put(b"k" * (MAX_KEY_BYTES + 1), b"", 1, 10.0, 0.0)
+
+
+def test_table_evicts_the_entry_expiring_first(tmp_path):
+    table = SharedTable(tmp_path / "table", 8)
+    for number in range(8):
+        table.put(b"%d" % number, b"v", 1, 100.0 + number, 0.0)
+    table.put(b"new", b"v", 1, 200.0, 0.0)
+    assert len(table) == 8
+    assert table.get(b"0", 1, 0.0) is None
+    assert table.get(b"new", 1, 0.0) == b"v"
+    assert all(table.get(b"%d" % number, 1, 0.0) == b"v" for number in range(1, 8))
+
+
+def test_table_is_shared_with_forked_workers(tmp_path):
+    table = SharedTable(tmp_path / "table", 64)
+    in_child(lambda: table.put(b"a", b"from child", 1, 10.0, 0.0))
+    assert table.get(b"a", 1, 0.0) == b"from child"
+    # A process opening the same file sees the same entries.
+    assert SharedTable(tmp_path / "table", 64).get(b"a", 1, 0.0) == b"from child"
+
+
+def test_counters_sum_every_worker(tmp_path):
+    counters = SharedCounters(tmp_path / "counters", ("a", "b"), rows=4)
+    counters.row[0] += 1
+
+    def count():
+        counters.row[0] += 2
+        counters.row[1] += 5
+
+    in_child(count)
+    in_child(count)
+    assert counters.totals() == [5, 10]
+    assert list(counters.row) == [1, 0]
+    # The exited workers' rows are handed over with their counts.
+    reopened = SharedCounters(tmp_path / "counters", ("a", "b"), rows=4)
+    assert reopened.totals() == [5, 10]
+
+
+def test_counters_refuse_more_workers_than_rows(tmp_path):
+    counters = SharedCounters(tmp_path / "counters", ("a",), rows=1)
+    offset = HEADER_SIZE
+    # Hand the only row to another running process.
+    PID.pack_into(counters.region.buffer, offset, os.getppid())
+    try:
+        with pytest.raises(RuntimeError):
+            SharedCounters(tmp_path / "counters", ("a",), rows=1)
+    finally:
+        PID.pack_into(counters.region.buffer, offset, 0)
+
+
+def test_snapshot_publish_and_read(tmp_path):
+    snapshot = SharedSnapshot(tmp_path / "snapshot", capacity=16)
+    assert snapshot.read() is None
+    in_child(lambda: snapshot.publish(3, b"settings"))
+    assert snapshot.read() == (3, b"settings")
+    snapshot.publish(4, b"new")
+    assert snapshot.read() == (4, b"new")
+    with pytest.raises(ValueError):
+        snapshot.publish(5, b"x" * 17)
+
+
+def test_quote_caches_share_entries_and_counters(tmp_path):
+    first, second = QuoteCache(max_size=10, ttl_seconds=60), QuoteCache(max_size=10, ttl_seconds=60)
+    table = SharedTable(tmp_path / "table", 64)
+    counters = SharedCounters(tmp_path / "counters", QUOTE_CACHE_COUNTERS, rows=4)
+    first.share(table, counters)
+    second.share(table, counters)
+    key = (800, 1500, 5, 5, 13, None, 1.0)
+    assert first.get(key, 1) is None
+    first.put(key, 1, b'{"delivery_fee":710}')
+    assert second.get(key, 1) == b'{"delivery_fee":710}'
+    assert second.get(key, 2) is None
+    assert (first.hits, first.misses) == (1, 2)
+
+
+def test_app_shares_the_quote_cache(tmp_path, restore_fee_plan):
+    rebuild_fee_plan(Settings(SHARED_MEMORY_DIR=str(tmp_path)))
+    try:
+        client = TestClient(setup.create_app())
+        assert isinstance(quote_cache.counters, SharedCounters)
+        assert sorted(os.listdir(tmp_path)) == ["quote-cache", "quote-cache-counters", "settings"]
+        assert "settings_version_published" in client.get("/metrics").text
+    finally:
+        quote_cache.shared = None
+        quote_cache.counters = Counters(QUOTE_CACHE_COUNTERS)
+        setup._settings_snapshot = None
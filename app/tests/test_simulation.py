@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+from app.api.v1.delivery_fee_calculator.simulation import (FeeSimulation,
+                                                           apply_overrides)
+from app.api.v1.delivery_fee_calculator.vectorized import \
+    VectorizedDeliveryFeeCalculator
+from app.config.settings import Settings
+from app.tests.test_batch import carts, client  # noqa: F401
+from fastapi import status
+
+SIMULATE_URL = "/api/v1/delivery-fee-calculator/simulate"
+
+VARIANTS = [
+    {"DISTANCE_SURCHARGE": 120},
+    {"FRIDAY_RUSH_MULTIPLIER": 1.5, "UPPER_THRESHOLD_UTC": 20},
+    {"FREE_DELIVERY_THRESHOLD": 5_000, "MAX_DELIVERY_FEE": 900},
+    {"MIN_CART_VALUE_TO_AVOID_SURCHARGE": 1_500, "ITEM_SURCHARGE": 60},
+    {"RUSH_SCHEDULE": "mon-fri 7-9 1.1, sat 11-13"},
+]
+
+
+@pytest.fixture
+def random_orders():
+    rng = np.random.default_rng(7)
+    size = 5_000
+    start = np.datetime64("2024-01-01T00:00:00")
+    times = start + rng.integers(0, 28 * 24 * 3600, size).astype("timedelta64[s]")
+    return (
+        rng.integers(0, 25_000, size),
+        rng.integers(0, 8_000, size),
+        rng.integers(0, 20, size),
+        times,
+    )
+
+
+@pytest.mark.parametrize("overrides", [{}] + VARIANTS)
+def test_fees_match_vectorized_calculator(random_orders, overrides):
+    cart_values, distances, items, times = random_orders
+    weekdays, hours = VectorizedDeliveryFeeCalculator.to_weekday_and_hour(times)
+    simulation = FeeSimulation(cart_values, distances, items, weekdays, hours)
+    settings = apply_overrides(Settings(), overrides)
+    expected = VectorizedDeliveryFeeCalculator(settings).calculate_delivery_fees(
+        cart_values, distances, items, times
+    )
+    # Price the baseline first, so the variant reuses the cached components it shares with it.
+    simulation.fees(Settings())
+    assert simulation.fees(settings).tolist() == expected.tolist()
+
+
+def test_statistics(random_orders):
+    cart_values, distances, items, times = random_orders
+    weekdays, hours = VectorizedDeliveryFeeCalculator.to_weekday_and_hour(times)
+    simulation = FeeSimulation(cart_values, distances, items, weekdays, hours)
+    settings = Settings()
+    fees = VectorizedDeliveryFeeCalculator(settings).calculate_delivery_fees(
+        cart_values, distances, items, times
+    )
+    statistics = simulation.statistics(settings)
+    assert statistics["total_fees"] == pytest.approx(fees.sum())
+    assert statistics["mean_fee"] == pytest.approx(fees.mean())
+    assert statistics["percentiles"]["p90"] == pytest.approx(np.percentile(fees, 90))
+    assert statistics["capped_share"] == pytest.approx(np.mean(fees >= settings.MAX_DELIVERY_FEE))
+
+
+def test_apply_overrides_rejects_unknown_settings():
+    with pytest.raises(ValueError, match="NOT_A_SETTING"):
+        apply_overrides(Settings(), {"NOT_A_SETTING": 1})
+
+
+def test_simulate_endpoint(client):  # noqa: F811
+    variants = [{"name": f"variant_{index}", "overrides": overrides} for index, overrides in enumerate(VARIANTS)]
+    orders = carts + [{**carts[0], "time": "not a time"}]
+    response = client.post(SIMULATE_URL, json={"orders": orders, "variants": variants})
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert body["orders"] == len(carts)
+    assert body["errors"] == 1
+
+    columns = np.array([[cart[name] for name in ("cart_value", "delivery_distance", "number_of_items")] for cart in carts]).T
+    times = [cart["time"] for cart in carts]
+    for overrides, result in zip([{}] + VARIANTS, [body["baseline"]] + [item["statistics"] for item in body["variants"]]):
+        fees = VectorizedDeliveryFeeCalculator(apply_overrides(Settings(), overrides)).calculate_delivery_fees(
+            *columns, times
+        )
+        assert result["total_fees"] == pytest.approx(fees.sum())
+    assert [item["name"] for item in body["variants"]] == [variant["name"] for variant in variants]
+
+
+def test_simulate_endpoint_rejects_invalid_variants(client):  # noqa: F811
+    response = client.post(
+        SIMULATE_URL,
+        json={"orders": carts, "variants": [{"name": "bad", "overrides": {"NOT_A_SETTING": 1}}]},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "bad" in response.json()["detail"]
+
+
+def test_simulate_endpoint_limits_variants(client):  # noqa: F811
+    variants = [{"name": str(index), "overrides": {}} for index in range(Settings().SIMULATION_MAX_VARIANTS + 1)]
+    response = client.post(SIMULATE_URL, json={"orders": carts, "variants": variants})
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
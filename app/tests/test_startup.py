@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+from app.server.startup import (COLD_START_BUDGET_SECONDS, by_package,
+                                cold_start, import_times)
+
+
+def imported_modules(code: str, **environment: str) -> set[str]:
+    output = subprocess.run(
+        [sys.executable, "-c", f"{code}\nimport sys\nprint('\\n'.join(sys.modules))"],
+        check=True,
+        capture_output=True,
+        text=True,
+        env={**os.environ, **environment},
+    ).stdout
+    return set(output.split())
+
+
+def test_cold_start_within_budget():
+    report = cold_start()
+    phases = report["phases"]
+    assert phases["ready"] < COLD_START_BUDGET_SECONDS, phases
+    # Serving quotes never needs NumPy, which only the simulation endpoint loads.
+    assert "numpy" not in report["modules"]
+
+
+def test_importing_the_app_skips_optional_subsystems():
+    modules = imported_modules("import app.main")
+    assert "numpy" not in modules
+    assert "psutil" not in modules
+
+
+def test_metrics_are_not_loaded_when_disabled():
+    modules = imported_modules("import app.main", METRICS_ENABLED="false")
+    assert "app.api.metrics.middleware" not in modules
+    assert "app.api.metrics.routes" not in modules
+
+
+def test_import_times_breakdown():
+    entries = import_times("json.decoder")
+    names = [entry["module"] for entry in entries]
+    assert names[-1] == "json.decoder"
+    assert all(entry["cumulative"] >= entry["self"] >= 0 for entry in entries)
+    assert dict(by_package(entries))["json"] > 0
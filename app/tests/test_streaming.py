@@ -0,0 +1,67 @@
+import asyncio
+import json
+
+import pytest
+from app.api.v1.delivery_fee_calculator.helpers import DeliveryFeeCalculator
+from app.api.v1.delivery_fee_calculator.streaming import (iter_ndjson_lines,
+                                                          stream_quotes)
+from app.tests.test_batch import carts, client, expected_fees  # noqa: F401
+from fastapi import status
+
+
+async def as_chunks(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect(iterator) -> list:
+    return [item async for item in iterator]
+
+
+def split_body(body: bytes, size: int):
+    # Deliberately split lines across chunk boundaries.
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def test_iter_ndjson_lines_joins_lines_split_across_chunks() -> None:
+    lines = asyncio.run(collect(iter_ndjson_lines(as_chunks(b'{"a"', b': 1}\n\n{"b', b'": 2}'), 100)))
+    assert lines == [b'{"a": 1}', b'{"b": 2}']
+
+
+def test_iter_ndjson_lines_rejects_overlong_line() -> None:
+    with pytest.raises(ValueError):
+        asyncio.run(collect(iter_ndjson_lines(as_chunks(b"x" * 50, b"x" * 60), 100)))
+
+
+def test_stream_quotes_emits_results_per_chunk_and_summary() -> None:
+    body = b"".join(json.dumps(cart).encode() + b"\n" for cart in carts)
+    chunks = asyncio.run(
+        collect(stream_quotes(DeliveryFeeCalculator(), as_chunks(*split_body(body, 7)), 3, 1024))
+    )
+    # Two chunks of results (3 + 1 carts), then the summary line.
+    assert len(chunks) == 3
+    lines = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert [line["delivery_fee"] for line in lines[:-1]] == expected_fees()
+    summary = lines[-1]["summary"]
+    assert summary["rows"] == len(carts)
+    assert summary["errors"] == 0
+    assert summary["error"] is None
+
+
+def test_stream_endpoint_matches_single_calculation(client) -> None:
+    body = b"".join(json.dumps(cart).encode() + b"\n" for cart in carts)
+    body += b"not json\n"
+    response = client.post(
+        "/api/v1/delivery-fee-calculator/stream",
+        content=split_body(body, 11),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert "X-Settings-Version" in response.headers
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["delivery_fee"] for line in lines[:-2]] == expected_fees()
+    assert lines[-2]["delivery_fee"] is None and lines[-2]["error"]
+    assert lines[-1]["summary"]["rows"] == len(carts) + 1
+    assert lines[-1]["summary"]["errors"] == 1
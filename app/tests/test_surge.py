@@ -0,0 +1,90 @@
+import time
+
+import pytest
+from app.api.v1.delivery_fee_calculator.fee_plan import get_fee_plan
+from app.api.v1.delivery_fee_calculator.surge import SurgeMeter, surge_meter
+from app.config.settings import Settings
+from fastapi.testclient import TestClient
+
+ENDPOINT = "/api/v1/delivery-fee-calculator/"
+
+payload = {
+    "cart_value": 800,
+    "delivery_distance": 1500,
+    "number_of_items": 5,
+    "time": "2024-01-19T13:00:00Z",
+}
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def surging():
+    """Make the shared meter surge from 1 quote per second and restore it after the test."""
+    clock = FakeClock()
+    surge_meter.clock = clock
+    surge_meter.configure(Settings(SURGE_ORDER_RATE_THRESHOLD=1.0, SURGE_WINDOW_SECONDS=10))
+    yield clock
+    surge_meter.clock = time.monotonic
+    surge_meter.configure(get_fee_plan().settings)
+
+
+def test_rate_counts_the_last_full_window():
+    clock = FakeClock()
+    meter = SurgeMeter(threshold=100.0, window=10, clock=clock)
+    for second in range(15):
+        meter.record(second)
+        clock.now += 1
+    meter.record(0)
+    # Seconds 5 to 14 recorded 5 + 6 + ... + 14 quotes.
+    assert meter.rate == sum(range(5, 15)) / 10
+    clock.now += 3
+    meter.record(0)
+    assert meter.rate == sum(range(8, 15)) / 10
+    clock.now += 60
+    meter.record(0)
+    assert meter.rate == 0.0
+
+
+def test_multiplier_grows_with_the_rate_up_to_the_cap():
+    clock = FakeClock()
+    meter = SurgeMeter(threshold=2.0, max_multiplier=1.5, window=4, clock=clock)
+    assert [meter.record(7) for _ in range(2)] == [1.0, 1.0]
+    clock.now += 1
+    # 14 quotes over 4 seconds is 3.5 per second, 1.75 times the threshold, capped at 1.5.
+    assert meter.record() == 1.5
+    clock.now += 1
+    meter.max_multiplier = 3.0
+    assert meter.record() == pytest.approx(1.88)
+
+
+def test_disabled_meter_counts_nothing():
+    meter = SurgeMeter()
+    assert meter.record(1_000_000) == 1.0
+    assert meter.rate == 0.0
+
+
+def test_surge_raises_quotes_and_is_exported(client, surging):
+    calm = client.post(ENDPOINT, json=payload).json()["delivery_fee"]
+    for _ in range(19):
+        client.post(ENDPOINT, json=payload)
+    surging.now += 1
+    # 20 quotes over a 10 second window is twice the threshold.
+    surged = client.post(ENDPOINT, json=payload).json()["delivery_fee"]
+    assert surged == 2 * calm
+    text = client.get("/metrics").text
+    assert "quote_surge_multiplier 2.0" in text
+    assert "quote_rate_per_second 2.0" in text
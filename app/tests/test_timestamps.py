@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from app.api.v1.delivery_fee_calculator.timestamps import (
+    parse_weekday_and_hour, weekday_and_hour_of_bucket)
+
+
+@pytest.mark.parametrize(
+    "delivery_time, expected",
+    [
+        ("2024-01-19T13:00:00Z", (5, 13)),
+        ("2024-01-15T00:59:59Z", (1, 0)),
+        ("2024-02-29T23:30:00Z", (4, 23)),
+        ("2024-01-19T18:30:00+02:00", (5, 16)),
+        ("2024-01-19T23:30:00-01:00", (6, 0)),
+        ("2024-01-19T13:00:00.250Z", (5, 13)),
+        ("2024-01-19T13:00:00", (5, 13)),
+        ("2024-01-19 13:00:00Z", (5, 13)),
+        (datetime(2024, 1, 19, 16, 0), (5, 16)),
+        (datetime(2024, 1, 19, 16, 0, tzinfo=timezone(timedelta(hours=-3))), (5, 19)),
+    ],
+)
+def test_parse_weekday_and_hour(delivery_time, expected):
+    assert parse_weekday_and_hour(delivery_time) == expected
+
+
+def test_fixed_width_layout_matches_strptime():
+    start = datetime(2024, 1, 1)
+    for hours in range(0, 24 * 400, 7):
+        date_time = start + timedelta(hours=hours, minutes=hours % 60)
+        delivery_time = date_time.strftime("%Y-%m-%dT%H:%M:%SZ")
+        parsed = datetime.strptime(delivery_time, "%Y-%m-%dT%H:%M:%SZ")
+        assert parse_weekday_and_hour(delivery_time) == (parsed.isoweekday(), parsed.hour)
+
+
+@pytest.mark.parametrize(
+    "delivery_time",
+    [
+        "invalid",
+        "2024-01-19T24:00:00Z",
+        "2024-01-19T13:60:00Z",
+        "2024-02-30T13:00:00Z",
+        "２０２４-01-19T13:00:00Z",
+        None,
+        1705669200,
+    ],
+)
+def test_parse_weekday_and_hour_rejects_invalid_input(delivery_time):
+    with pytest.raises(ValueError):
+        parse_weekday_and_hour(delivery_time)
+
+
+def test_hour_bucket_is_cached():
+    weekday_and_hour_of_bucket.cache_clear()
+    parse_weekday_and_hour("2024-01-19T13:00:00Z")
+    parse_weekday_and_hour("2024-01-19T13:42:17Z")
+    info = weekday_and_hour_of_bucket.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from app.api.v1.delivery_fee_calculator.fee_plan import FeePlan
+from app.api.v1.delivery_fee_calculator.helpers import DeliveryFeeCalculator
+from app.api.v1.delivery_fee_calculator.vectorized import \
+    VectorizedDeliveryFeeCalculator
+from app.config.settings import Settings
+
+
+@pytest.fixture
+def vectorized():
+    return VectorizedDeliveryFeeCalculator()
+
+
+@pytest.fixture
+def random_orders():
+    rng = np.random.default_rng(42)
+    size = 5_000
+    start = np.datetime64("2024-01-01T00:00:00")
+    times = start + rng.integers(0, 28 * 24 * 3600, size).astype("timedelta64[s]")
+    return (
+        rng.integers(0, 25_000, size),
+        rng.integers(0, 8_000, size),
+        rng.integers(0, 20, size),
+        times,
+    )
+
+
+@pytest.mark.parametrize("settings", [None, Settings(RUSH_SCHEDULE="mon-fri 7-9 1.1, sat 11-13")])
+def test_matches_scalar_calculator(settings, random_orders):
+    cart_values, distances, items, times = random_orders
+    time_strings = [f"{time}Z" for time in np.datetime_as_string(times, unit="s")]
+    vectorized = VectorizedDeliveryFeeCalculator(settings)
+    calculator = DeliveryFeeCalculator(settings and FeePlan(settings))
+    expected = [
+        calculator.calculate_delivery_fee(int(c), int(d), int(n), t)
+        for c, d, n, t in zip(cart_values, distances, items, time_strings)
+    ]
+    fees = vectorized.calculate_delivery_fees(cart_values, distances, items, times)
+    assert fees.tolist() == expected
+
+
+def test_accepts_iso_strings(vectorized):
+    fees = vectorized.calculate_delivery_fees(
+        [800, 800], [1500, 1500], [5, 5], ["2024-01-19T13:00:00Z", "2024-01-19T16:00:00Z"]
+    )
+    assert fees.tolist() == [550, 550 * 1.2]
+
+
+def test_converts_offsets_to_utc(vectorized):
+    weekday, hour = vectorized.to_weekday_and_hour(
+        ["2024-01-19T18:30:00+02:00", "2024-01-20T00:15:00Z"]
+    )
+    assert weekday.tolist() == [5, 6]
+    assert hour.tolist() == [16, 0]
+
+
+@pytest.mark.parametrize(
+    "delivery_distance, expected_distance_fee",
+    [(0, 0), (999, 200), (1499, 300), (1500, 300), (1501, 400)],
+)
+def test_calculate_distance_fees(vectorized, delivery_distance, expected_distance_fee):
+    fees = vectorized.calculate_distance_fees(np.array([delivery_distance]))
+    assert fees.tolist() == [expected_distance_fee]
+
+
+def test_uses_provided_settings():
+    settings = Settings(FREE_DELIVERY_THRESHOLD=500, DISTANCE_SURCHARGE=200)
+    vectorized = VectorizedDeliveryFeeCalculator(settings)
+    fees = vectorized.calculate_delivery_fees(
+        [400, 800], [1500, 1500], [4, 4], ["2024-01-16T13:00:00Z"] * 2
+    )
+    assert fees.tolist() == [600 + 600, 0]
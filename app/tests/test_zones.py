@@ -0,0 +1,137 @@
+import json
+import random
+
+import pytest
+from app.api.v1.delivery_fee_calculator import zones
+from app.api.v1.delivery_fee_calculator.zones import (Zone, ZoneIndex,
+                                                      load_zone_index)
+from app.benchmarks.zones import AREA, lookups, naive_lookup, star_zones
+from fastapi.testclient import TestClient
+
+ENDPOINT = "/api/v1/delivery-fee-calculator/"
+VENUE = {"lat": 60.17, "lon": 24.93}
+SQUARE = [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]]
+HOLE = [[4, 4], [6, 4], [6, 6], [4, 6]]
+
+# A cart with no small order or item surcharges, so the fee is the distance fee.
+payload = {
+    "cart_value": 1000,
+    "delivery_distance": 1500,
+    "number_of_items": 4,
+    "time": "2024-01-19T13:00:00Z",
+}
+
+
+def feature(coordinates, base_fee, surcharge, geometry="Polygon", **extra):
+    return {
+        "type": "Feature",
+        "geometry": {"type": geometry, "coordinates": coordinates},
+        "properties": {"base_fee": base_fee, "distance_surcharge": surcharge, **extra},
+    }
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def city_zones(tmp_path):
+    """Load a central zone inside a wider one and restore the original zones after the test."""
+    original = zones.get_zone_index()
+    path = tmp_path / "zones.geojson"
+    center = [[24.92, 60.16], [24.96, 60.16], [24.96, 60.19], [24.92, 60.19]]
+    wide = [[24.8, 60.1], [25.1, 60.1], [25.1, 60.3], [24.8, 60.3]]
+    path.write_text(
+        json.dumps(
+            {
+                "type": "FeatureCollection",
+                "features": [
+                    feature([center], 300, 200, distance_interval=1000, id="center"),
+                    feature([wide], 0, 0, id="wide"),
+                ],
+            }
+        )
+    )
+    yield load_zone_index(str(path))
+    zones._zone_index = original
+
+
+def test_holes_and_multipolygons():
+    zone = Zone("a", [SQUARE, HOLE, [[20, 0], [30, 0], [25, 5]]], 0, 0)
+    index = ZoneIndex([zone])
+    for point, inside in [((1, 1), True), ((5, 5), False), ((25, 1), True), ((15, 1), False), ((-1, 5), False)]:
+        assert zone.contains(*point) is inside
+        assert (index.lookup(*point) is zone) is inside
+
+
+def test_first_zone_wins_where_zones_overlap():
+    inner = Zone("inner", [[[2, 2], [8, 2], [8, 8], [2, 8]]], 1, 1)
+    outer = Zone("outer", [SQUARE], 2, 2)
+    index = ZoneIndex([inner, outer])
+    assert index.lookup(5, 5) is inner
+    assert index.lookup(1, 1) is outer
+    assert index.lookup(11, 5) is None
+    assert ZoneIndex().lookup(5, 5) is None
+
+
+def test_zone_distance_fee_charges_started_intervals():
+    zone = Zone("a", [SQUARE], 300, 200, distance_interval=1000)
+    assert [zone.distance_fee(d) for d in (0, 1, 1000, 1001)] == [300, 500, 500, 700]
+
+
+@pytest.mark.parametrize("side", [None, 1, 7])
+def test_index_agrees_with_naive_scan(side):
+    generated = star_zones(60, seed=3)
+    index = ZoneIndex(generated, side=side)
+    rng = random.Random(4)
+    min_x, min_y, max_x, max_y = AREA
+    for _ in range(3000):
+        x, y = rng.uniform(min_x, max_x), rng.uniform(min_y, max_y)
+        assert index.lookup(x, y) is naive_lookup(generated, x, y)
+
+
+def test_from_file_rejects_malformed_files(tmp_path):
+    path = tmp_path / "zones.geojson"
+    path.write_text(json.dumps({"features": [{"geometry": {"type": "Polygon", "coordinates": [SQUARE]}}]}))
+    with pytest.raises(ValueError, match="Malformed"):
+        ZoneIndex.from_file(str(path))
+    path.write_text(json.dumps({"features": [feature([10, 10], 0, 0, geometry="Point")]}))
+    with pytest.raises(ValueError, match="polygons"):
+        ZoneIndex.from_file(str(path))
+    with pytest.raises(ValueError, match="fewer than 3 points"):
+        Zone("a", [[[0, 0], [1, 1]]], 0, 0)
+
+
+def test_from_file_reads_multipolygons(tmp_path):
+    path = tmp_path / "zones.geojson"
+    path.write_text(
+        json.dumps({"features": [feature([[SQUARE], [[[20, 0], [30, 0], [25, 5]]]], 1, 2, geometry="MultiPolygon")]})
+    )
+    index = ZoneIndex.from_file(str(path))
+    assert [zone.id for zone in index.zones] == ["0"]
+    assert index.lookup(25, 1) is index.lookup(5, 5) is index.zones[0]
+
+
+def test_customer_zone_prices_the_distance(client, city_zones):
+    inside = {"venue_location": VENUE, "customer_location": {"lat": 60.18, "lon": 24.95}}
+    outside = {"venue_location": VENUE, "customer_location": {"lat": 60.5, "lon": 24.95}}
+    cart = {key: value for key, value in payload.items() if key != "delivery_distance"}
+
+    center = client.post(ENDPOINT, json={**cart, **inside})
+    # About 1570 m started two 1000 m intervals.
+    assert center.json() == {"delivery_fee": 700}
+    batch = client.post(f"{ENDPOINT}batch", json=[{**cart, **inside}, {**cart, **outside}]).json()
+    assert [result["delivery_fee"] for result in batch["results"]] == [
+        700,
+        client.post(ENDPOINT, json={**cart, **outside}).json()["delivery_fee"],
+    ]
+    # Quotes sent with a distance keep the default pricing.
+    assert client.post(ENDPOINT, json=payload).json() == {"delivery_fee": 300}
+
+
+def test_benchmark_index_beats_naive_scan():
+    result = lookups(200, 2000)
+    assert result["indexed"] < result["naive"]